@@ -0,0 +1,2 @@
+# Keep in sync with the version in setup.py
+__version__ = "0.1"
@@ -0,0 +1,33 @@
+from typing import Tuple
+
+from bal.context_ioc import AbstractAnalyzer
+from bal_xilinx.analyzers.frame_address_analyzer import XilinxFrameAddressAnalyzer
+from bal_xilinx.compression import XilinxCompressionReport, XilinxFrameCompressor
+from bal_xilinx.context import XilinxContext
+
+
+class XilinxCompressionAnalyzer(AbstractAnalyzer):
+    """
+    An analyzer used to create a compressed version of a Xilinx bitstream, where the duplicate
+    logic frames are written once and repeated with multiple frame writes.
+
+    :param XilinxContext context: The configured xilinx context
+    """
+    def __init__(self, context):
+        super(XilinxCompressionAnalyzer, self).__init__(context)
+        self.context = context
+
+    def analyze(self, min_count=2, **kwargs):
+        """
+        Returns the compressed bitstream and the compression report. The bitstream is
+        synchronized first, the modifications are included.
+
+        :param int min_count: The minimum number of identical frames to write them once.
+        :rtype: Tuple[bytes, XilinxCompressionReport]
+        """
+        address_index = self.context.create_analyzer(XilinxFrameAddressAnalyzer).analyze()
+        return XilinxFrameCompressor(self.context.format).compress(
+            self.context.get_data().pack(),
+            address_index,
+            min_count
+        )
@@ -0,0 +1,26 @@
+from bal.context_ioc import AbstractAnalyzer
+from bal_xilinx.context import XilinxContext
+from bal_xilinx.crc import XilinxCrcCalculator, XilinxCrcCheck
+
+
+class XilinxCrcAnalyzer(AbstractAnalyzer):
+    """
+    An analyzer used to verify the CRC values stored in a Xilinx bitstream.
+
+    :param XilinxContext context: The configured xilinx context
+    """
+    def __init__(self, context):
+        super(XilinxCrcAnalyzer, self).__init__(context)
+        self.context = context
+
+    def analyze(self, **kwargs):
+        """
+        Returns the CRC values stored in the bitstream along with the values computed over the
+        configuration data. The bitstream is synchronized first.
+
+        :rtype: List[XilinxCrcCheck]
+        """
+        bitstream_object = self.context.get_data()
+        bitstream_object.synchronize()
+        packets_data = bitstream_object.unpack().get_packets().pack()
+        return XilinxCrcCalculator(self.context.format).get_checks(packets_data)
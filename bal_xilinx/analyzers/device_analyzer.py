@@ -21,6 +21,9 @@ class XilinxDeviceAnalyzer(AbstractAnalyzer):
             return self.context.id_code
         config_packets = self.context.get_data().unpack()\
             .get_packets_by_register_name("Idcode")
+        # The packets converter sets the device when it unpacks the packets
+        if self.context.id_code is not None:
+            return self.context.id_code
         if len(config_packets) != 1:
             raise ValueError("A single Idcode register packet is expected in the bitstream")
         config_packet = config_packets[0]
@@ -0,0 +1,73 @@
+from bal.context_ioc import AbstractAnalyzer
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+from bal_xilinx.context import XilinxContext
+from bal_xilinx.converters.bitstream_packets_scanner import WRITE_OPCODE, XilinxPacketScanner
+from bal_xilinx.frames import XilinxFrameAddressIndex, get_frame_address
+
+# The registers holding the frame address
+FAR_REGISTER_NAMES = ["FarMaj", "FarMajExtended", "FarMin"]
+
+
+class XilinxFrameAddressAnalyzer(AbstractAnalyzer):
+    """
+    An analyzer used to index the frames written by the FDRI packet of a Xilinx bitstream by
+    frame address. The start address is decoded from the FAR register writes preceding the FDRI
+    packet. When the bitstream holds several FDRI packets (ie the second, small FDRI packet of
+    the LX45T bitstreams), the one writing the whole device is indexed.
+
+    :param XilinxContext context: The configured xilinx context
+    """
+    def __init__(self, context):
+        super(XilinxFrameAddressAnalyzer, self).__init__(context)
+        self.context = context
+
+    def analyze(self, **kwargs):
+        """
+        Returns the frame address index of the FDRI payload. The offsets of the index are
+        relative to the FDRI payload, its `payload_offset` is the offset of the payload within
+        the packets data. The bitstream is synchronized first.
+
+        :rtype: XilinxFrameAddressIndex
+        """
+        device_name = self.context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+        fdri_format = self.context.format.get_fdri_format(device_name)
+        if fdri_format is None:
+            raise ValueError("No FDRI format for the device {}".format(device_name))
+        bitstream_object = self.context.get_data()
+        bitstream_object.synchronize()
+        packets_data = bitstream_object.unpack().get_packets().pack()
+        table = XilinxPacketScanner(self.context.format).scan(packets_data)
+
+        far_values = {}
+        fdri_writes = []
+        for index in range(len(table)):
+            if table.opcodes[index] != WRITE_OPCODE or table.payload_sizes[index] == 0:
+                continue
+            register_format = table.register_formats[index]
+            payload_start, payload_end = table.get_payload_span(index)
+            if register_format.name in FAR_REGISTER_NAMES and \
+                    payload_end - payload_start == register_format.size:
+                values = register_format.codec.decode(packets_data[payload_start:payload_end])
+                for attribute_format, value in zip(register_format.attributes, values):
+                    far_values[attribute_format.name.lower()] = value
+            elif register_format.name == "Fdri":
+                fdri_writes.append((payload_start, payload_end, get_frame_address(far_values)))
+        if len(fdri_writes) > 1:
+            payload_size = fdri_format.get_payload_size()
+            fdri_writes = [
+                fdri_write for fdri_write in fdri_writes
+                if fdri_write[1] - fdri_write[0] == payload_size
+            ]
+        if len(fdri_writes) != 1:
+            raise ValueError(
+                "A single Fdri register packet writing the device is expected in the bitstream"
+            )
+
+        payload_start, payload_end, start_address = fdri_writes[0]
+        address_index = XilinxFrameAddressIndex(
+            fdri_format,
+            start_address,
+            payload_end - payload_start
+        )
+        address_index.payload_offset = payload_start
+        return address_index
@@ -0,0 +1,40 @@
+from bal.context_ioc import AbstractAnalyzer
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+from bal_xilinx.context import XilinxContext
+from bal_xilinx.diff import XilinxBitstreamDiff, XilinxBitstreamDiffer
+
+
+class XilinxFrameDiffAnalyzer(AbstractAnalyzer):
+    """
+    An analyzer used to compare the configuration frames and the register writes of a Xilinx
+    bitstream with another bitstream targeting the same device (ie a golden image).
+
+    :param XilinxContext context: The configured xilinx context
+    """
+    def __init__(self, context):
+        super(XilinxFrameDiffAnalyzer, self).__init__(context)
+        self.context = context
+
+    def analyze(self, other_context, **kwargs):
+        """
+        Returns the differences between the bitstream of the context (the old one) and the
+        bitstream of the other context (the new one). Both bitstreams are synchronized first.
+
+        :param XilinxContext other_context: The context of the new bitstream.
+        :rtype: XilinxBitstreamDiff
+        """
+        device_name = self.context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+        other_device_name = other_context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+        if device_name != other_device_name:
+            raise ValueError("Cannot compare a bitstream targeting the {} with one targeting "
+                             "the {}".format(device_name, other_device_name))
+        packets_data = []
+        for bitstream_context in (self.context, other_context):
+            bitstream_object = bitstream_context.get_data()
+            bitstream_object.synchronize()
+            packets_data.append(bitstream_object.unpack().get_packets().pack())
+        return XilinxBitstreamDiffer(self.context.format).diff(
+            device_name,
+            packets_data[0],
+            packets_data[1]
+        )
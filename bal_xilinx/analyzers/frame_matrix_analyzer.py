@@ -0,0 +1,48 @@
+from bal.context_ioc import AbstractAnalyzer
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+from bal_xilinx.context import XilinxContext
+from bal_xilinx.data_model import XilinxFdriPayload
+from bal_xilinx.frames import XilinxFdriFrameMatrix
+
+
+class XilinxFrameMatrixAnalyzer(AbstractAnalyzer):
+    """
+    An analyzer used to view the FDRI logic block of a Xilinx bitstream as a matrix of frames.
+
+    :param XilinxContext context: The configured xilinx context
+    """
+    def __init__(self, context):
+        super(XilinxFrameMatrixAnalyzer, self).__init__(context)
+        self.context = context
+
+    def analyze(self, **kwargs):
+        """
+        Returns a frame matrix view of the logic block. Writing to the view modifies the
+        bitstream.
+
+        :rtype: XilinxFdriFrameMatrix
+        """
+        device_name = self.context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+        fdri_format = self.context.format.get_fdri_format(device_name)
+        if fdri_format is None or fdri_format.frame_table is None:
+            raise ValueError("No logic block format for the device {}".format(device_name))
+
+        # Only the payload of the Fdri packet writing the whole device unpacks to an
+        # XilinxFdriPayload, the other Fdri packets, ie the small one of the LX45T bitstreams,
+        # hold raw frames.
+        fdri_payload_objects = [
+            fdri_packet.get_payload()
+            for fdri_packet in self.context.get_data().unpack()
+            .get_packets_by_register_name("Fdri")
+        ]
+        fdri_payload_objects = [
+            fdri_payload_object for fdri_payload_object in fdri_payload_objects
+            if fdri_payload_object.get_model_type() == XilinxFdriPayload.__name__
+        ]
+        if len(fdri_payload_objects) != 1:
+            raise ValueError(
+                "A single Fdri register packet writing the device is expected in the bitstream"
+            )
+        fdri_packet_payload = fdri_payload_objects[0].unpack()
+        assert isinstance(fdri_packet_payload, XilinxFdriPayload)
+        return XilinxFdriFrameMatrix(self.context, fdri_packet_payload, fdri_format.frame_table)
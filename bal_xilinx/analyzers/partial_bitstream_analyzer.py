@@ -0,0 +1,64 @@
+from typing import Optional
+
+from bal.context_ioc import AbstractAnalyzer
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+from bal_xilinx.analyzers.frame_address_analyzer import XilinxFrameAddressAnalyzer
+from bal_xilinx.analyzers.frame_diff_analyzer import XilinxFrameDiffAnalyzer
+from bal_xilinx.context import XilinxContext
+from bal_xilinx.converters import find_bytes
+from bal_xilinx.partial import XilinxPartialBitstreamEmitter, get_payload_ranges
+
+
+class XilinxPartialBitstreamAnalyzer(AbstractAnalyzer):
+    """
+    An analyzer used to create a partial bitstream holding the frames of a modified Xilinx
+    bitstream that changed.
+
+    :param XilinxContext context: The configured xilinx context
+    """
+    def __init__(self, context):
+        super(XilinxPartialBitstreamAnalyzer, self).__init__(context)
+        self.context = context
+
+    def analyze(self, base_context=None, **kwargs):
+        """
+        Returns a partial bitstream writing the frames that differ from the base bitstream. When
+        no base bitstream is provided, the frames patched in place through the patch buffer of
+        the context are written (see :py:class:`~bal_xilinx.buffer.XilinxPatchBuffer`).
+
+        :param Optional[XilinxContext] base_context: The context of the base bitstream.
+        :rtype: bytes
+        """
+        device_name = self.context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+        address_index = self.context.create_analyzer(XilinxFrameAddressAnalyzer).analyze()
+        packets_data = self.context.get_data().unpack().get_packets().pack()
+        fdri_payload = memoryview(packets_data)[
+            address_index.payload_offset:address_index.payload_offset + address_index.size
+        ]
+
+        if base_context is not None:
+            bitstream_diff = base_context.create_analyzer(XilinxFrameDiffAnalyzer)\
+                .analyze(self.context)
+            payload_ranges = get_payload_ranges(
+                self.context.format.get_fdri_format(device_name),
+                bitstream_diff
+            )
+        elif self.context.patch_buffer is not None:
+            sync_word = self.context.format.sync_word
+            payload_offset = find_bytes(self.context.patch_buffer.get_bytes(), sync_word) + \
+                len(sync_word) + address_index.payload_offset
+            payload_ranges = [
+                (max(start - payload_offset, 0), end - payload_offset)
+                for start, end in self.context.patch_buffer.get_dirty_ranges()
+                if end > payload_offset
+            ]
+        else:
+            raise ValueError(
+                "A base bitstream is required when the context does not have a patch buffer"
+            )
+        return XilinxPartialBitstreamEmitter(self.context.format).emit(
+            device_name,
+            fdri_payload,
+            address_index,
+            payload_ranges
+        )
@@ -1,7 +1,55 @@
 import base64
+import json
+
+from typing import Any, Dict, List, Optional, TextIO, Tuple
 
 from bal.analyzers.visualizer_analyzer import VisualizerAnalyzer
+from bal.data_model import ArrayModel, ClassModel, DictModel, ValueModel
+from bal.data_object import DataObject
 from bal_xilinx.context import XilinxContext
+from bal_xilinx.converters import pack_into
+
+# The size of the chunks encoded in base64, a multiple of 3 bytes so that the encoded chunks can
+# be concatenated
+BASE64_CHUNK_SIZE = 3 * 16 * 1024
+
+
+class Base64Writer(object):
+    """
+    A binary writer that encodes the bytes written in base64, in chunks, to a text writer.
+    :py:meth:`close` must be called once all the bytes are written.
+
+    :param TextIO writer: The text writer receiving the base64 string.
+    """
+    def __init__(self, writer):
+        self._writer = writer
+        self._remainder = b""
+
+    def write(self, data_bytes):
+        """
+        :param bytes data_bytes:
+        """
+        data_bytes = memoryview(data_bytes)
+        if len(self._remainder) > 0:
+            missing_size = 3 - len(self._remainder)
+            self._remainder += bytes(data_bytes[:missing_size])
+            data_bytes = data_bytes[missing_size:]
+            if len(self._remainder) < 3:
+                return
+            self._writer.write(base64.b64encode(self._remainder).decode('ascii'))
+            self._remainder = b""
+        encoded_size = len(data_bytes) - len(data_bytes) % 3
+        for start in range(0, encoded_size, BASE64_CHUNK_SIZE):
+            chunk = data_bytes[start:min(start + BASE64_CHUNK_SIZE, encoded_size)]
+            self._writer.write(base64.b64encode(bytes(chunk)).decode('ascii'))
+        self._remainder = bytes(data_bytes[encoded_size:])
+
+    def close(self):
+        """
+        Encode the remaining bytes, with the base64 padding.
+        """
+        self._writer.write(base64.b64encode(self._remainder).decode('ascii'))
+        self._remainder = b""
 
 
 class XilinxVisualizerAnalyzer(VisualizerAnalyzer):
@@ -9,24 +57,166 @@ class XilinxVisualizerAnalyzer(VisualizerAnalyzer):
     Generate nested native objects (ie can be fed to serialization libraries) that are used by
     the visualizer to display the data within the provided data object.
 
+    The depth of the nodes can be capped: the nodes at the maximum depth are collapsed, they are
+    not unpacked and hold their `path` (the index of each node from the bitstream node) instead
+    of their children. A collapsed node is expanded on demand by analyzing its path.
+
     :param XilinxContext context: The configured xilinx context
     """
     def __init__(self, context):
         super(XilinxVisualizerAnalyzer, self).__init__(context)
         self.context = context
 
-    def analyze(self):
+    def analyze(self, max_depth=None, path=None, writer=None, **kwargs):
         """
-        Build a visualizer config object for the bitstream.
-        :rtype: Dict[str, Any]
+        Build a visualizer config object for the bitstream, or the node of a data object.
+
+        :param Optional[int] max_depth: The depth of the collapsed nodes, relative to the first
+            node. The nodes are not collapsed by default.
+        :param Optional[List[int]] path: The path of the first node, ie the path of a collapsed
+            node to expand it. Only the node is built (no style or bytes) when it is provided.
+        :param Optional[TextIO] writer: If provided, the config is written to it as JSON
+            incrementally, the nodes and the bytes are not held in memory. None is returned.
+        :rtype: Optional[Dict[str, Any]]
         """
         bitstream = self.context.get_data()
         bitstream.synchronize()
-        bitstream_data = bitstream.pack()
-        return {
-            "style": self.context.format.visualizer_style,
-            "data": self._traverse(bitstream),
-            "bytes": base64.b64encode(bitstream_data).decode('ascii')
+        if path is not None:
+            data_object = self._get_data_object(path)
+            if writer is None:
+                return self._traverse_node(data_object, max_depth, 0, list(path))
+            self._write_node(writer, data_object, max_depth, 0, list(path))
+            return None
+
+        if writer is None:
+            bitstream_data = bitstream.pack()
+            return {
+                "style": self.context.format.visualizer_style,
+                "data": self._traverse_node(bitstream, max_depth, 0, []),
+                "bytes": base64.b64encode(bitstream_data).decode('ascii')
+            }
+        writer.write('{"style": ')
+        writer.write(json.dumps(self.context.format.visualizer_style))
+        writer.write(', "data": ')
+        self._write_node(writer, bitstream, max_depth, 0, [])
+        writer.write(', "bytes": "')
+        base64_writer = Base64Writer(writer)
+        pack_into(bitstream, base64_writer)
+        base64_writer.close()
+        writer.write('"}')
+        return None
+
+    def _get_children(self, data_model):
+        """
+        :param ArrayModel|DictModel|ClassModel data_model:
+        :rtype: List[DataObject]
+        """
+        return [child for _, child in data_model.iterate() if child is not None]
+
+    def _get_data_object(self, path):
+        """
+        :param List[int] path:
+        :rtype: DataObject
+        """
+        data_object = self.context.get_data()
+        for depth, index in enumerate(path):
+            data_model = data_object.unpack()
+            if not isinstance(data_model, (ArrayModel, DictModel, ClassModel)):
+                raise ValueError("The node at {} does not have children".format(path[:depth]))
+            children = self._get_children(data_model)
+            if index < 0 or index >= len(children):
+                raise ValueError("No node found at {}".format(path[:depth + 1]))
+            data_object = children[index]
+        return data_object
+
+    def _get_node(self, data_object, is_collapsed, path):
+        """
+        Build the visualizer config node of a data object, without its children.
+
+        :param DataObject data_object:
+        :param bool is_collapsed: If True, the data object is not unpacked.
+        :param List[int] path:
+        :rtype: Tuple[Dict[str, Any], Optional[List[DataObject]]]
+        :return: The node and the children data objects, None for the leaves. The `is_empty`
+            value of a node with children is set from the children.
+        """
+        node = {
+            "type": data_object.get_model_type(),
+            "implementation": data_object.get_model_implementation(),
+            "description": data_object.get_model_description(),
+            "bit_size": data_object.get_bit_size(),
+            "unpacked": data_object.is_convertible() or data_object.is_unpacked(),
         }
+        if not data_object.is_convertible() and not data_object.is_unpacked():
+            node["is_empty"] = self._is_data_object_empty(data_object)
+            return node, None
+        if is_collapsed and not (
+                data_object.is_unpacked() and isinstance(data_object.get_model(), ValueModel)
+        ):
+            node["collapsed"] = True
+            node["path"] = path
+            node["is_empty"] = data_object.is_packed() and \
+                self._is_data_object_empty(data_object)
+            return node, None
 
+        data_model = data_object.unpack()
+        if isinstance(data_model, ValueModel):
+            node["value_name"] = data_model.value_name
+            node["value_description"] = data_model.value_description
+            node["value"] = data_model.get_value()
+            node["is_empty"] = data_model.get_value() == "" or data_model.get_value() == 0
+            return node, None
+        if isinstance(data_model, (ArrayModel, DictModel, ClassModel)):
+            return node, self._get_children(data_model)
+        raise ValueError("Unknown data object model")
+
+    def _traverse_node(self, data_object, max_depth, depth, path):
+        """
+        :param DataObject data_object:
+        :param Optional[int] max_depth:
+        :param int depth:
+        :param List[int] path:
+        :rtype: Dict[str, Any]
+        """
+        node, children = self._get_node(
+            data_object,
+            max_depth is not None and depth >= max_depth,
+            path
+        )
+        if children is not None:
+            node["children"] = [
+                self._traverse_node(child, max_depth, depth + 1, path + [index])
+                for index, child in enumerate(children)
+            ]
+            node["is_empty"] = all([item["is_empty"] is True for item in node["children"]])
+        return node
 
+    def _write_node(self, writer, data_object, max_depth, depth, path):
+        """
+        :param TextIO writer:
+        :param DataObject data_object:
+        :param Optional[int] max_depth:
+        :param int depth:
+        :param List[int] path:
+        :rtype: bool
+        :return: True if the node is empty.
+        """
+        node, children = self._get_node(
+            data_object,
+            max_depth is not None and depth >= max_depth,
+            path
+        )
+        if children is None:
+            writer.write(json.dumps(node))
+            return node["is_empty"] is True
+        # The node is left open, the children and is_empty follow
+        writer.write(json.dumps(node)[:-1])
+        writer.write(', "children": [')
+        is_empty = True
+        for index, child in enumerate(children):
+            if index > 0:
+                writer.write(", ")
+            is_child_empty = self._write_node(writer, child, max_depth, depth + 1, path + [index])
+            is_empty = is_empty and is_child_empty
+        writer.write('], "is_empty": {}}}'.format(json.dumps(is_empty)))
+        return is_empty
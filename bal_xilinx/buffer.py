@@ -0,0 +1,150 @@
+import bisect
+import ctypes
+
+from typing import Dict, List, Optional, Tuple
+
+
+def get_buffer_address(data_bytes):
+    """
+    Get the memory address of the first byte of a writable buffer.
+
+    :param memoryview data_bytes: A writable buffer of at least one byte.
+    :rtype: int
+    """
+    return ctypes.addressof(ctypes.c_char.from_buffer(data_bytes))
+
+
+class XilinxPatchBuffer(object):
+    """
+    A mutable buffer holding the bytes of a bitstream. In zero copy mode, the data objects hold
+    memoryview slices of the buffer, so patching the buffer updates the bytes of every data
+    object covering the patched range without repacking them. The patched byte ranges are
+    recorded so that the consumers of the bitstream know which parts of it changed. Each patch
+    is also recorded as the XOR of the original and the patched bytes, which is what the
+    incremental CRC update needs. The patches at the same offset are merged into a single XOR, so
+    that patching the same bytes over and over does not grow the record.
+
+    :param memoryview data_bytes: A writable view of the bitstream bytes (ie of a bytearray or a
+        private memory map).
+    """
+    def __init__(self, data_bytes):
+        if data_bytes.readonly:
+            raise ValueError("The bytes of a patch buffer must be writable")
+        self._view = data_bytes
+        self._address = get_buffer_address(data_bytes) if len(data_bytes) > 0 else None
+        self._dirty_starts = []  # type: List[int]
+        self._dirty_ends = []  # type: List[int]
+        self._patches = {}  # type: Dict[int, bytearray]
+
+    def __len__(self):
+        return len(self._view)
+
+    def get_bytes(self):
+        """
+        Get the bytes of the bitstream, patches included.
+
+        :rtype: memoryview
+        """
+        return self._view
+
+    def get_offset(self, data_bytes):
+        """
+        Get the offset of a slice of the buffer.
+
+        :param bytes data_bytes: The bytes of a data object.
+        :rtype: Optional[int]
+        :return: The offset of the bytes in the buffer or None if the bytes are not a slice of the
+            buffer (ie the data object was modified and holds a copy).
+        """
+        if self._address is None or not isinstance(data_bytes, memoryview) or \
+                data_bytes.readonly or len(data_bytes) == 0:
+            return None
+        offset = get_buffer_address(data_bytes) - self._address
+        if offset < 0 or offset + len(data_bytes) > len(self._view):
+            return None
+        return offset
+
+    def patch(self, offset, data_bytes):
+        """
+        Overwrite bytes of the bitstream in place. The range is only marked as dirty if the bytes
+        are actually modified.
+
+        :param int offset: The offset of the first byte to overwrite.
+        :param bytes data_bytes: The new bytes.
+        :rtype: bool
+        :return: True if the bitstream was modified.
+        """
+        end = offset + len(data_bytes)
+        if offset < 0 or end > len(self._view):
+            raise ValueError(
+                "Cannot patch {} bytes at offset {}, the buffer size is {}".format(
+                    len(data_bytes),
+                    offset,
+                    len(self._view)
+                )
+            )
+        original_bytes = self._view[offset:end].tobytes()
+        if original_bytes == data_bytes:
+            return False
+        self._view[offset:end] = data_bytes
+        self._add_dirty_range(offset, end)
+        patch_xor = self._patches.setdefault(offset, bytearray())
+        if len(patch_xor) < len(data_bytes):
+            patch_xor.extend(bytearray(len(data_bytes) - len(patch_xor)))
+        for index, (original_byte, patched_byte) in enumerate(
+                zip(bytearray(original_bytes), bytearray(data_bytes))
+        ):
+            patch_xor[index] ^= original_byte ^ patched_byte
+        return True
+
+    def _add_dirty_range(self, start, end):
+        # The ranges are kept sorted, overlapping and adjacent ranges are merged
+        starts = self._dirty_starts
+        ends = self._dirty_ends
+        index = bisect.bisect_left(ends, start)
+        last_index = index
+        while last_index < len(starts) and starts[last_index] <= end:
+            start = min(start, starts[last_index])
+            end = max(end, ends[last_index])
+            last_index += 1
+        starts[index:last_index] = [start]
+        ends[index:last_index] = [end]
+
+    def is_dirty(self):
+        """
+        :rtype: bool
+        :return: True if the bitstream was patched.
+        """
+        return len(self._dirty_starts) > 0
+
+    def get_dirty_ranges(self):
+        """
+        Get the ranges of bytes that were patched, sorted by offset.
+
+        :rtype: List[Tuple[int, int]]
+        :return: The start and end offsets of each range.
+        """
+        return list(zip(self._dirty_starts, self._dirty_ends))
+
+    def clear_dirty_ranges(self):
+        """
+        Forget about the patched ranges, ie once the bitstream was written.
+        """
+        self._dirty_starts = []
+        self._dirty_ends = []
+
+    def pop_patches(self):
+        """
+        Get and forget the patches applied since the last call.
+
+        :rtype: List[Tuple[int, bytes]]
+        :return: The offset of each patch and the XOR of the original and the patched bytes,
+            sorted by offset. The patches that were reverted are left out.
+        """
+        patches = [
+            (offset, bytes(patch_xor))
+            for offset, patch_xor in sorted(self._patches.items())
+            if patch_xor.count(b"\x00") != len(patch_xor)
+        ]
+        self._patches = {}
+        return patches
@@ -0,0 +1,264 @@
+from collections import OrderedDict
+
+from typing import Dict, List, Tuple
+
+from bal_xilinx.converters import find_bytes
+from bal_xilinx.converters.bitstream_packets_scanner import WRITE_OPCODE, XilinxPacketScanner
+from bal_xilinx.crc import XilinxCrcCalculator
+from bal_xilinx.format import XilinxFormat
+from bal_xilinx.frames import BLOCK_TYPE_LOGIC, XilinxFrameAddressIndex
+from bal_xilinx.generator import XilinxPacketBuilder
+
+# The default CCLK frequency of the Spartan-6 (the ConfigRate default of 2 MHz)
+DEFAULT_CCLK_FREQUENCY = 2000000
+# The default bus width, serial modes (ie SPI) load 1 bit per clock cycle
+DEFAULT_BUS_WIDTH = 1
+
+
+class XilinxCompressionReport(object):
+    """
+    The result of the compression of a bitstream.
+
+    :ivar int original_size: The size of the bitstream before compression.
+    :ivar int compressed_size: The size of the compressed bitstream.
+    :ivar int frame_count: The number of logic frames considered for compression.
+    :ivar int group_count: The number of distinct frames written once and repeated.
+    :ivar int repeated_frame_count: The number of frames written with a multiple frame write
+        instead of their data.
+    """
+    def __init__(
+            self,
+            original_size,
+            compressed_size,
+            frame_count,
+            group_count,
+            repeated_frame_count,
+    ):
+        self.original_size = original_size
+        self.compressed_size = compressed_size
+        self.frame_count = frame_count
+        self.group_count = group_count
+        self.repeated_frame_count = repeated_frame_count
+
+    def get_saved_size(self):
+        """
+        :rtype: int
+        :return: The number of bytes saved by the compression.
+        """
+        return self.original_size - self.compressed_size
+
+    def get_compression_ratio(self):
+        """
+        :rtype: float
+        :return: The size of the compressed bitstream relative to the original one.
+        """
+        if self.original_size == 0:
+            return 1.0
+        return float(self.compressed_size) / self.original_size
+
+    def get_load_time_saved(
+            self,
+            cclk_frequency=DEFAULT_CCLK_FREQUENCY,
+            bus_width=DEFAULT_BUS_WIDTH,
+    ):
+        """
+        Estimate the configuration time saved, from the time needed to transfer the saved bytes
+        to the device. The time the device spends on the multiple frame writes is not included.
+
+        :param int cclk_frequency: The configuration clock frequency in Hz.
+        :param int bus_width: The number of bits loaded per clock cycle (1 for serial modes, 8
+            or 16 for SelectMAP).
+        :rtype: float
+        :return: The time saved in seconds.
+        """
+        return self.get_saved_size() * 8.0 / (cclk_frequency * bus_width)
+
+    def to_dict(self):
+        """
+        :rtype: Dict[str,object]
+        """
+        return OrderedDict([
+            ("original_size", self.original_size),
+            ("compressed_size", self.compressed_size),
+            ("saved_size", self.get_saved_size()),
+            ("frame_count", self.frame_count),
+            ("group_count", self.group_count),
+            ("repeated_frame_count", self.repeated_frame_count),
+            ("load_time_saved", self.get_load_time_saved()),
+        ])
+
+
+class XilinxFrameCompressor(object):
+    """
+    Compresses bitstreams by writing the duplicate logic frames of the FDRI payload once. The
+    frames are grouped by content, the frames of a group are written with a FAR write and a FDRI
+    write of the first frame followed by a multiple frame write for each other frame: a FAR write,
+    the MFW command and a Mfwr write. The other frames are grouped in runs of consecutive frames,
+    each run is written with a FAR write and a FDRI write, like a partial bitstream.
+
+    The FDRI packet of the bitstream is replaced, the other packets are kept and the CRC values
+    are computed again.
+
+    :param XilinxFormat bitstream_format: The Xilinx bitstream format configuration.
+    """
+    def __init__(self, bitstream_format):
+        self.format = bitstream_format
+        self._packet_builder = XilinxPacketBuilder(bitstream_format)
+
+    def get_frame_groups(self, fdri_payload, address_index, min_count=2):
+        """
+        Group the logic frames of the payload holding the same data.
+
+        A multiple frame write copies a whole frame, only the full frames aligned on
+        `frame_size` bytes from the start of the payload are grouped: the padding frames and the
+        frames shifted by them are left to the FDRI writes of the surrounding runs. The last
+        logic frame is not grouped either, its run carries the write of the bram and io blocks.
+
+        :param bytes fdri_payload: The FDRI payload, or at least its frames.
+        :param XilinxFrameAddressIndex address_index: The frame address index of the payload.
+        :param int min_count: The minimum number of frames of a group.
+        :rtype: List[List[int]]
+        :return: The indexes of the frames of each group, in the order of their first frame.
+        """
+        frame_size = address_index.frame_size
+        logic_indexes = [
+            index for index in range(len(address_index))
+            if address_index.block_types[index] == BLOCK_TYPE_LOGIC
+        ]
+        groups = OrderedDict()  # type: Dict[bytes, List[int]]
+        for index in logic_indexes[:-1]:
+            offset = address_index.offsets[index]
+            if frame_size == 0 or address_index.sizes[index] != frame_size or \
+                    offset % frame_size != 0:
+                continue
+            groups.setdefault(bytes(fdri_payload[offset:offset + frame_size]), []).append(index)
+        return [indexes for indexes in groups.values() if len(indexes) >= min_count]
+
+    def _create_fdri_write(self, fdri_payload, address_index, first_index, end_index):
+        """
+        :rtype: bytes
+        """
+        builder = self._packet_builder
+        start = address_index.offsets[first_index]
+        end = address_index.offsets[end_index - 1] + address_index.sizes[end_index - 1]
+        return builder.create_far_writes(address_index.get_address(first_index)) + \
+            builder.create_type2_write(
+                "Fdri",
+                # The CRC is computed once the whole bitstream is built
+                bytes(fdri_payload[start:end]) + b"\x00" * XilinxCrcCalculator.CRC_SIZE
+            )
+
+    def compress_payload(self, fdri_payload, address_index, min_count=2):
+        """
+        Build the packets writing the frames of a FDRI payload, the duplicate frames being
+        written once.
+
+        :param bytes fdri_payload: The FDRI payload, or at least its frames.
+        :param XilinxFrameAddressIndex address_index: The frame address index of the payload.
+        :param int min_count: The minimum number of identical frames to write them once.
+        :rtype: Tuple[List[bytes], List[List[int]]]
+        :return: The packets and the indexes of the frames of each group.
+        """
+        builder = self._packet_builder
+        groups = self.get_frame_groups(fdri_payload, address_index, min_count)
+        grouped_indexes = set(index for indexes in groups for index in indexes)
+
+        packets = []
+        run_start = None
+        for index in range(len(address_index) + 1):
+            is_written = index < len(address_index) and index not in grouped_indexes
+            if is_written and run_start is None:
+                run_start = index
+            elif not is_written and run_start is not None:
+                packets.append(self._create_fdri_write(
+                    fdri_payload,
+                    address_index,
+                    run_start,
+                    index
+                ))
+                run_start = None
+
+        for indexes in groups:
+            packets.append(self._create_fdri_write(
+                fdri_payload,
+                address_index,
+                indexes[0],
+                indexes[0] + 1
+            ))
+            for index in indexes[1:]:
+                packets.extend([
+                    builder.create_far_writes(address_index.get_address(index)),
+                    builder.create_command("MFW"),
+                    builder.create_write("Mfwr", []),
+                ])
+        return packets, groups
+
+    def compress(self, data, address_index, min_count=2):
+        """
+        Compress a bitstream.
+
+        :param bytes data: The bitstream. Its FDRI packets but the one of the address index are
+            left unchanged.
+        :param XilinxFrameAddressIndex address_index: The frame address index of the FDRI
+            payload, see :py:class:`~bal_xilinx.analyzers.frame_address_analyzer
+            .XilinxFrameAddressAnalyzer`.
+        :param int min_count: The minimum number of identical frames to write them once.
+        :rtype: Tuple[bytes, XilinxCompressionReport]
+        :return: The compressed bitstream and the compression report.
+        """
+        sync_word = self.format.sync_word
+        sync_word_index = find_bytes(data, sync_word)
+        if sync_word_index < 0:
+            raise ValueError("The sync marker is not present in the provided bitstream data")
+        packets_offset = sync_word_index + len(sync_word)
+        packets_data = data[packets_offset:]
+        table = XilinxPacketScanner(self.format).scan(packets_data)
+
+        # Only the FDRI write of the address index is compressed, the other FDRI writes (ie the
+        # small one of the LX45T bitstreams) are carried through unchanged.
+        fdri_indexes = [
+            index for index in table.get_packet_indexes_by_register_name("Fdri")
+            if table.packet_types[index] == 2 and
+            table.get_payload_span(index)[0] == address_index.payload_offset
+        ]
+        if len(fdri_indexes) == 0:
+            raise ValueError("The FDRI packet of the address index is not in the bitstream")
+        fdri_index = fdri_indexes[0]
+        payload_start, payload_end = table.get_payload_span(fdri_index)
+        if payload_end - payload_start < address_index.size:
+            raise ValueError(
+                "The FDRI packet of the address index writes {} bytes, {} are expected".format(
+                    payload_end - payload_start,
+                    address_index.size
+                )
+            )
+        replaced_offset = table.offsets[fdri_index]
+        # Drop the empty type 1 write preceding the type 2 packet
+        if fdri_index > 0 and table.packet_types[fdri_index - 1] == 1 and \
+                table.opcodes[fdri_index - 1] == WRITE_OPCODE and \
+                table.register_formats[fdri_index - 1].name == "Fdri" and \
+                table.payload_sizes[fdri_index - 1] == 0:
+            replaced_offset = table.offsets[fdri_index - 1]
+
+        packets, groups = self.compress_payload(
+            memoryview(packets_data)[payload_start:payload_end],
+            address_index,
+            min_count
+        )
+        compressed_packets_data = bytearray(packets_data[:replaced_offset])
+        for packet in packets:
+            compressed_packets_data.extend(packet)
+        compressed_packets_data.extend(packets_data[payload_end:])
+        self._packet_builder.fix_crc_values(compressed_packets_data)
+
+        compressed_data = bytes(data[:packets_offset]) + bytes(compressed_packets_data)
+        return compressed_data, XilinxCompressionReport(
+            len(data),
+            len(compressed_data),
+            sum(
+                1 for index in range(len(address_index))
+                if address_index.block_types[index] == BLOCK_TYPE_LOGIC
+            ),
+            len(groups),
+            sum(len(indexes) - 1 for indexes in groups),
+        )
@@ -1,9 +1,66 @@
+import importlib
+import mmap
+import os
+
+from typing import Dict
+
 from bal.data_object import DataObject
 from bal.context import BALContextFactory, BALContext
+from bal_xilinx.buffer import XilinxPatchBuffer
 from bal_xilinx.data_model import XilinxBitstream
 from bal_xilinx.format import XilinxFormat
 
 
+def import_by_name(name):
+    """
+    Import a module attribute from its fully qualified name.
+
+    :param str name: The module path and attribute name, ie
+        `bal_xilinx.analyzers.device_analyzer.XilinxDeviceAnalyzer`.
+    :rtype: Any
+    """
+    module_name, _, attribute_name = name.rpartition(".")
+    return getattr(importlib.import_module(module_name), attribute_name)
+
+
+def get_class_name(cls):
+    """
+    :param type cls:
+    :rtype: str
+    :return: The fully qualified name of a class, see :py:func:`import_by_name`.
+    """
+    return "{}.{}".format(cls.__module__, cls.__name__)
+
+
+class XilinxLazyRegistry(dict):
+    """
+    The interfaces mapped to their implementation, as used by the BAL context. In addition to
+    the classes registered as usual, implementations can be registered by name so that their
+    module is only imported once an implementation of their interface is requested.
+    """
+    def __init__(self):
+        super(XilinxLazyRegistry, self).__init__()
+        self._implementation_names = {}  # type: Dict[str, str]
+
+    def register_by_name(self, interface_name, implementation_name):
+        """
+        :param str interface_name: The fully qualified name of the interface.
+        :param str implementation_name: The fully qualified name of the implementation.
+        """
+        self._implementation_names[interface_name] = implementation_name
+
+    def get(self, interface, default=None):
+        implementation = super(XilinxLazyRegistry, self).get(interface)
+        if implementation is not None:
+            return implementation
+        implementation_name = self._implementation_names.get(get_class_name(interface))
+        if implementation_name is None:
+            return default
+        implementation = import_by_name(implementation_name)
+        self[interface] = implementation
+        return implementation
+
+
 class XilinxContext(BALContext):
     """
     See the documentation of :py:class:`~bal.context.BALContext` for an overview of the
@@ -19,6 +76,13 @@ class XilinxContext(BALContext):
         interfaces mapped to their implementation.
     :param XilinxFormat bitstream_format: The Xilinx bitstream format configuration.
     :param bytes bytes: The bytes making up the bitstream.
+    :param bool zero_copy: If True, the data objects hold memoryview slices of `bytes` instead
+        of copies. Their bytes are only copied when they are modified.
+
+    :ivar bool zero_copy: True if the data objects hold memoryview slices of the bitstream.
+    :ivar Optional[XilinxPatchBuffer] patch_buffer: A buffer used by the modifiers to patch the
+        bitstream in place. It is only available in zero copy mode when `bytes` is writable
+        (ie a bytearray or a private memory map).
     """
     def __init__(
             self,
@@ -26,7 +90,8 @@ class XilinxContext(BALContext):
             analyzers_by_type,
             modifiers_by_type,
             bitstream_format,
-            bytes
+            bytes,
+            zero_copy=False,
     ):
         super(XilinxContext, self).__init__(
             converters_by_type,
@@ -35,6 +100,13 @@ class XilinxContext(BALContext):
         )
         self.id_code = None
         self.format = bitstream_format
+        self.zero_copy = zero_copy
+        self.patch_buffer = None
+        if zero_copy:
+            if not isinstance(bytes, memoryview):
+                bytes = memoryview(bytes)
+            if not bytes.readonly:
+                self.patch_buffer = XilinxPatchBuffer(bytes)
         self._bitstream = DataObject.create_packed(self, bytes, XilinxBitstream)
 
     def get_data(self):
@@ -59,12 +131,56 @@ class XilinxContextFactory(BALContextFactory):
     def __init__(self, bitstream_format):
         super(XilinxContextFactory, self).__init__()
         self._format = bitstream_format
+        self._converters_by_type = XilinxLazyRegistry()
+        self._analyzers_by_type = XilinxLazyRegistry()
+        self._modifiers_by_type = XilinxLazyRegistry()
 
-    def create(self, data):
+    @property
+    def format(self):
+        """
+        :rtype: XilinxFormat
+        """
+        return self._format
+
+    def register_converter_by_name(self, data_model_interface_name, converter_name):
+        """
+        Register a converter implementation by name. The converter module is imported when a
+        converter is requested for the data model interface.
+
+        :param str data_model_interface_name: The fully qualified name of the data model
+            interface.
+        :param str converter_name: The fully qualified name of the converter class.
+        """
+        self._converters_by_type.register_by_name(data_model_interface_name, converter_name)
+
+    def register_analyzer_by_name(self, analyzer_interface_name, analyzer_name):
+        """
+        Register an analyzer implementation by name. The analyzer module is imported when an
+        analyzer is requested for the interface.
+
+        :param str analyzer_interface_name: The fully qualified name of the analyzer interface.
+        :param str analyzer_name: The fully qualified name of the analyzer class.
+        """
+        self._analyzers_by_type.register_by_name(analyzer_interface_name, analyzer_name)
+
+    def register_modifier_by_name(self, modifier_interface_name, modifier_name):
+        """
+        Register a modifier implementation by name. The modifier module is imported when a
+        modifier is requested for the interface.
+
+        :param str modifier_interface_name: The fully qualified name of the modifier interface.
+        :param str modifier_name: The fully qualified name of the modifier class.
+        """
+        self._modifiers_by_type.register_by_name(modifier_interface_name, modifier_name)
+
+    def create(self, data, zero_copy=False):
         """
         Create an Xilinx FPGA context from the provided bytes.
 
-        :param bytes bytes: The bytes for the Xilinx FPGA bitstream
+        :param bytes data: The bytes for the Xilinx FPGA bitstream
+        :param bool zero_copy: If True, the data objects hold memoryview slices of `data`
+            instead of copies. `data` must not be modified while the context is in use, except
+            through the patch buffer of the context when `data` is writable.
         :rtype: XilinxContext
         """
         return XilinxContext(
@@ -72,6 +188,25 @@ class XilinxContextFactory(BALContextFactory):
             self._analyzers_by_type,
             self._modifiers_by_type,
             self._format,
-            data
+            data,
+            zero_copy,
         )
 
+    def create_from_path(self, path):
+        """
+        Create an Xilinx FPGA context from a bitstream file. The file is memory-mapped and
+        parsed in zero copy mode so that the pages of the file are shared through the OS page
+        cache. The mapping is private: the file is opened read-only and is never modified,
+        pages that get written to are copied by the OS (copy-on-write). The modifiers patch the
+        mapping in place.
+
+        :param str path: The path to the Xilinx FPGA bitstream
+        :rtype: XilinxContext
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("The bitstream file {} is empty".format(path))
+            # The mapping keeps its own handle on the file. It is released once the context and
+            # its data objects, which hold memoryview slices of it, are garbage collected.
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        return self.create(data, zero_copy=True)
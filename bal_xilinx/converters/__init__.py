@@ -1,4 +1,71 @@
+import re
+
 WORD_SIZE = 2
 PACKET_SIZE = WORD_SIZE
 
 
+def find_bytes(data_bytes, sub):
+    """
+    Find the first occurrence of `sub` in the provided data. Unlike `bytes.find`, it also
+    works on memoryview slices without copying them.
+
+    :param bytes|memoryview data_bytes: The data to search.
+    :param bytes sub: The bytes to look for.
+    :rtype: int
+    :return: The offset of the first occurrence, -1 if `sub` is not found.
+    """
+    if not isinstance(data_bytes, memoryview):
+        return data_bytes.find(sub)
+    match = re.search(re.escape(sub), data_bytes)
+    if match is None:
+        return -1
+    return match.start()
+
+
+def _has_synced_bytes(data_object):
+    """
+    :param DataObject data_object:
+    :rtype: bool
+    :return: True if the bytes of the data object are up to date with its model, ie
+        `DataObject.pack` would return them as is.
+    """
+    # DataObject does not expose whether its bytes are in sync: the private flag is read with
+    # the same condition as the one DataObject.pack uses to skip the packing
+    return not data_object.is_unpacked() or (data_object._synced and data_object.is_packed())
+
+
+def pack_into(data_object, writer):
+    """
+    Write the bytes of a data object. It is the streaming version of `DataObject.pack`: the
+    bytes of a data object that is in sync are written as is, the converters that implement
+    `pack_into` write the parts of their data model directly and the other converters are
+    packed. Unlike `DataObject.pack`, the packed bytes are not stored on the data objects, so
+    that the output is only held by the writer. The data object must be synchronized first.
+
+    :param DataObject data_object:
+    :param BinaryIO writer: Any object with a `write` method, ie a file or an `io.BytesIO`.
+    """
+    if _has_synced_bytes(data_object):
+        writer.write(data_object.get_bytes())
+        return
+    converter_pack_into = getattr(data_object.converter, "pack_into", None)
+    if converter_pack_into is None:
+        writer.write(data_object.pack())
+        return
+    converter_pack_into(data_object.get_model(), writer)
+
+
+def get_packed_size(data_object):
+    """
+    Get the size of the bytes of a data object without packing it, when its converter
+    implements `get_packed_size`. The data object must be synchronized first.
+
+    :param DataObject data_object:
+    :rtype: int
+    """
+    if _has_synced_bytes(data_object):
+        return len(data_object.get_bytes())
+    converter_get_packed_size = getattr(data_object.converter, "get_packed_size", None)
+    if converter_get_packed_size is None:
+        return len(data_object.pack())
+    return converter_get_packed_size(data_object.get_model())
@@ -1,6 +1,6 @@
 from bal.context_ioc import AbstractConverter
 from bal.data_object import DataObject
-from bal_xilinx.converters import WORD_SIZE
+from bal_xilinx.converters import WORD_SIZE, find_bytes, pack_into
 from bal_xilinx.data_model import XilinxBitstream, XilinxBitstreamHeaderInterface, \
     XilinxPackets, XilinxBitstreamSyncMarker
 
@@ -22,7 +22,7 @@ class XilinxBitstreamConverter(AbstractConverter):
         :rtype: XilinxBitstream
         """
         sync_marker = self.context.format.sync_word
-        sync_marker_index = data_bytes.find(sync_marker)
+        sync_marker_index = find_bytes(data_bytes, sync_marker)
         assert sync_marker_index >= 0, \
             "The sync marker is not present in the provided bitstream data"
 
@@ -58,3 +58,13 @@ class XilinxBitstreamConverter(AbstractConverter):
             self.context.format.sync_word,
             data_model.get_packets().pack()
         ])
+
+    def pack_into(self, data_model, writer):
+        """
+        :param XilinxBitstream data_model:
+        :param BinaryIO writer:
+        """
+        assert isinstance(data_model, XilinxBitstream)
+        pack_into(data_model.get_header(), writer)
+        writer.write(self.context.format.sync_word)
+        pack_into(data_model.get_packets(), writer)
@@ -1,14 +1,16 @@
 import ctypes
-import io
+import functools
 import struct
 
 import six
-from typing import Tuple
+from typing import BinaryIO, Optional, Tuple
 
 from bal.context_ioc import AbstractConverter
 from bal.data_model import ValueModel
 from bal.data_object import DataObject
-from bal_xilinx.converters import WORD_SIZE
+from bal_xilinx.converters import WORD_SIZE, get_packed_size, pack_into
+from bal_xilinx.converters.bitstream_packets_scanner import WRITE_OPCODE, \
+    XilinxPacketScanner, XilinxPacketTable, decode_packet_header, encode_packet_header
 from bal_xilinx.data_model import XilinxPacket, XilinxPackets, \
     XilinxPacketHeader, XilinxType1Payload, XilinxType2PayloadInterface, \
     XilinxFdriPayload, XilinxPacketsTail
@@ -139,68 +141,87 @@ class XilinxPacketsConverter(AbstractConverter):
     def __init__(self, context):
         super(XilinxPacketsConverter, self).__init__(context)
         self.context = context
+        self._scanner = XilinxPacketScanner(context.format)
 
     def _get_register_format(self, header):
         """
         :param XilinxCtypePacketHeader header:
         :rtype: XilinxRegisterFormat
         """
-        register_format = self.context.format.get_register_format(header.register_address)
-        # Corner case for a the FAR_MAJ register
-        if register_format is not None and register_format.name == "FarMaj" and \
-                header.word_count > 1:
-            register_format = self.context.format.get_register_format_by_name("FarMajExtended")
-        # Verify that we know how to parse the config for the register
-        if register_format is None:
-            raise ValueError(
-                "No register format found for address {}".format(hex(header.register_address))
-            )
-        return register_format
+        return self._scanner.get_register_format(header.register_address, header.word_count)
 
-    def _create_type1_payload(self, data_stream, header, register_format):
+    def _create_type1_payload(self, payload_data, register_format):
         """
-        Unpack the payload for a type 1 packet
+        Create the payload for a type 1 packet
 
-        :param io.BytesIO data_stream:
-        :param XilinxCtypePacketHeader header:
+        :param bytes payload_data:
         :param XilinxRegisterFormat register_format:
-        :rtype: Tuple[DataObject, bool]
+        :rtype: DataObject
         """
-        if header.word_count == 0:
-            return None, False
-        payload_data = data_stream.read(header.word_count * WORD_SIZE)
-        if header.opcode == 0:
-            raise ValueError("NOOP Xilinx packets are expected to have a 0 length payload")
-
-        payload = DataObject.create_packed(
+        return DataObject.create_packed(
             self.context,
             payload_data,
             XilinxType1Payload,
             converter_args=(register_format, ),
         )
-        if register_format.name == "Cmd":
-            return payload, payload.unpack().get("command").get_model().value_name == "DESYNC"
 
-        return payload, False
+    def _get_fdri_payload_size(self):
+        """
+        :rtype: Optional[int]
+        :return: The size of the FDRI payload of the targeted device, None if the device is not
+            known.
+        """
+        if self.context.id_code is None:
+            return None
+        fdri_format = self.context.format.get_fdri_format(self.context.id_code)
+        if fdri_format is None:
+            return None
+        return fdri_format.logic_block_size + fdri_format.bram_block_size + \
+            fdri_format.io_block_size + fdri_format.crc_size
+
+    def _set_device(self, data_bytes, table):
+        """
+        Set the device targeted by the bitstream on the context from the value of its Idcode
+        write, so that the FDRI payload can be typed while the packets are unpacked. The device
+        is not set if the bitstream does not hold a single Idcode write with a documented value.
 
-    def _create_type2_payload(self, data_stream, header):
+        :param bytes data_bytes:
+        :param XilinxPacketTable table:
         """
-        Unpack the payload for a type 2 packet
-        :param io.BytesIO data_stream:
-        :param XilinxCtypePacketHeader header:
+        id_code_indexes = [
+            index for index in table.get_packet_indexes_by_register_name("Idcode")
+            if table.opcodes[index] == WRITE_OPCODE and table.payload_sizes[index] > 0
+        ]
+        if len(id_code_indexes) != 1:
+            return
+        register_format = table.register_formats[id_code_indexes[0]]
+        payload_start, payload_end = table.get_payload_span(id_code_indexes[0])
+        if payload_end - payload_start != register_format.size:
+            return
+        id_code, = register_format.codec.decode(data_bytes[payload_start:payload_end])
+        value_documentation = register_format.attributes[0].get_value_documentation(id_code)
+        if value_documentation is not None and value_documentation.name is not None:
+            self.context.id_code = value_documentation.name
+
+    def _create_type2_payload(self, word_count_data, payload_data, register_format):
+        """
+        Create the payload size and the payload for a type 2 packet
+
+        :param bytes word_count_data:
+        :param bytes payload_data:
+        :param XilinxRegisterFormat register_format:
         :rtype: Tuple[DataObject,DataObject]
         """
-        register_format = self._get_register_format(header)
-        word_count_data = data_stream.read(4)
         word_count, = struct.unpack(">I", word_count_data)
         payload_size_object = DataObject.create_unpacked(
             self.context,
             WordCountValue(word_count),
             bytes=word_count_data
         )
-        payload_data = data_stream.read((word_count + 2) * WORD_SIZE)
-        # TODO: Remove this hack for the LX45T, it's got 2 FDRI packets, one is waaaaay too small.
-        if register_format.name != "Fdri" or len(payload_data) < 500:
+        # Only the FDRI packet writing the whole configuration of the device holds a FDRI
+        # payload, ie the LX45T bitstreams have a second much smaller FDRI packet.
+        if register_format.name != "Fdri" or \
+                len(payload_data) != self._get_fdri_payload_size():
             return payload_size_object, DataObject.create_packed(
                 self.context,
                 payload_data,
@@ -248,153 +269,325 @@ class XilinxPacketsConverter(AbstractConverter):
                 "Unexpected header opcode {} while parsing the Xilinx config packets".format(opcode)
             )
 
+    def _create_packet_model(self, packet_bytes, table, index):
+        """
+        Create the model for a packet of the packet table.
+
+        :param bytes packet_bytes: The bytes of the packet, starting with its header.
+        :param XilinxPacketTable table:
+        :param int index:
+        :rtype: XilinxPacket
+        """
+        packet_type = table.packet_types[index]
+        opcode = table.opcodes[index]
+        register_address = table.register_addresses[index]
+        register_format = table.register_formats[index]
+        offset = table.offsets[index]
+        payload_offset = table.payload_offsets[index] - offset
+        payload_end_offset = payload_offset + table.payload_sizes[index]
+        header_raw_data = packet_bytes[:WORD_SIZE]
+
+        payload_object = None
+        payload_size_object = None
+        if packet_type == 1:
+            if payload_end_offset > payload_offset:
+                payload_object = self._create_type1_payload(
+                    packet_bytes[payload_offset:payload_end_offset],
+                    register_format,
+                )
+            header_word_count = table.word_counts[index]
+        elif packet_type == 2:
+            payload_size_object, payload_object = self._create_type2_payload(
+                packet_bytes[WORD_SIZE:payload_offset],
+                packet_bytes[payload_offset:payload_end_offset],
+                register_format,
+            )
+            # The word count of a type 2 packet follows the header, the header value is unused
+            header_word_count = decode_packet_header(
+                struct.unpack(">H", header_raw_data)[0]
+            )[3]
+        else:
+            header_word_count = table.word_counts[index]
+
+        header_object = DataObject.create_unpacked(
+            self.context,
+            model=XilinxPacketHeader(
+                DataObject.create_unpacked(
+                    self.context,
+                    TypeValue(packet_type, self._get_type_name(packet_type)),
+                    3,
+                ),
+                DataObject.create_unpacked(
+                    self.context,
+                    OpCodeValue(opcode, self._get_opcode_name(opcode)),
+                    2,
+                ),
+                DataObject.create_unpacked(
+                    self.context,
+                    RegisterAddressValue(register_address, register_format.name),
+                    6,
+                ),
+                DataObject.create_unpacked(
+                    self.context,
+                    WordCountValue(header_word_count),
+                    5,
+                ),
+            ),
+            bytes=header_raw_data,
+        )
+        return XilinxPacket(
+            header_object,
+            payload_size_object,
+            payload_object,
+        )
+
+    def _create_item(self, data_bytes, table, index):
+        """
+        Create the packed data object for an item of the packets array. The last item is the
+        tail when the packets data contains a DESYNC command.
+
+        :param bytes data_bytes:
+        :param XilinxPacketTable table:
+        :param int index:
+        :rtype: DataObject
+        """
+        if index == len(table):
+            return DataObject.create_packed(
+                self.context,
+                data_bytes[table.tail_offset:],
+                XilinxPacketsTail,
+            )
+        offset, end_offset = table.get_packet_span(index)
+        return DataObject(
+            self.context,
+            XilinxIndexedPacketConverter(self.context, self, table, index),
+            XilinxPacket,
+            bytes=data_bytes[offset:end_offset],
+        )
+
     def unpack(self, data_bytes):
         """
         :param bytes data_bytes:
         :rtype: XilinxPackets
         """
-        packets = []
-        data_stream = io.BytesIO(data_bytes)
-        previous_packet_type = 0
-        while data_stream.tell() < len(data_bytes):
-            header_raw_data = data_stream.read(2)
-            header = XilinxCtypePacketHeader.from_buffer_copy(
-                bytearray([
-                    header_raw_data[0],
-                    header_raw_data[1],
-                    0,
-                    0
-                ])
+        table = self._scanner.scan(data_bytes)
+        if self.context.id_code is None:
+            self._set_device(data_bytes, table)
+        item_count = len(table)
+        if table.tail_offset is not None:
+            item_count += 1
+        return XilinxPackets(
+            [None] * item_count,
+            table,
+            functools.partial(self._create_item, data_bytes, table),
+            data_bytes,
+        )
+
+    def _pack_packet_header(self, packet, payload_size):
+        """
+        :param XilinxPacket packet:
+        :param int payload_size: The size of the packed payload.
+        :rtype: Tuple[bytes, bool]
+        :return: The packed header, the type 2 word count included, and whether the payload
+            follows the header.
+        """
+        header = packet.get_header().get_model()
+        packet_type = header.get_packet_type().get_model().get_value()
+        register_address = header.get_register_address().get_model().get_value()
+        opcode = header.get_opcode().get_model().get_value()
+
+        if packet_type == 0 or packet_type == 1:
+            word_count = int(payload_size / WORD_SIZE)
+            header_raw = struct.pack(
+                ">H",
+                encode_packet_header(packet_type, opcode, register_address, word_count)
             )
-            is_done = False
-            register_format = self._get_register_format(header)
-            if header.type == 0:
-                payload_object = None
-                payload_size_object = None
-            elif header.type == 1:
-                payload_object, is_done = self._create_type1_payload(
-                    data_stream,
-                    header,
-                    register_format
-                )
-                payload_size_object = None
-            elif header.type == 2:
-                if previous_packet_type != 1:
-                    raise ValueError(
-                        "Unexpected packet type 2 after a packet type {}".format(
-                            previous_packet_type
-                        )
-                    )
-                payload_size_object, payload_object = self._create_type2_payload(
-                    data_stream,
-                    header
-                )
-            else:
-                raise ValueError(
-                    "Unexpected packet type {} while parsing the Xilinx bitstream".format(
-                        header.type
-                    )
+            if opcode == 0:
+                return header_raw, False
+            register_format = self._scanner.get_register_format(register_address, word_count)
+            assert register_format.size == payload_size, \
+                "The payload size ({}) does not match the expected payload size ({}) for " \
+                "register {}".format(
+                    payload_size,
+                    register_format.size,
+                    register_format.name
                 )
-            previous_packet_type = header.type
-            raw_packet_data = header_raw_data
-            if payload_size_object is not None:
-                raw_packet_data += payload_size_object.get_bytes()
-            if payload_object is not None:
-                raw_packet_data += payload_object.get_bytes()
-
-            header_object = DataObject.create_unpacked(
-                self.context,
-                model=XilinxPacketHeader(
-                    DataObject.create_unpacked(
-                        self.context,
-                        TypeValue(int(header.type), self._get_type_name(header.type)),
-                        3,
-                    ),
-                    DataObject.create_unpacked(
-                        self.context,
-                        OpCodeValue(int(header.opcode), self._get_opcode_name(header.opcode)),
-                        2,
-                    ),
-                    DataObject.create_unpacked(
-                        self.context,
-                        RegisterAddressValue(int(header.register_address), register_format.name),
-                        6,
-                    ),
-                    DataObject.create_unpacked(
-                        self.context,
-                        WordCountValue(int(header.word_count)),
-                        5,
-                    ),
-                ),
-                bytes=header_raw_data,
-            )
-            packets.append(DataObject.create_unpacked(
-                self.context,
-                model=XilinxPacket(
-                    header_object,
-                    payload_size_object,
-                    payload_object,
-                ),
-                bytes=raw_packet_data,
-            ))
-            if is_done is True:
-                packets.append(DataObject.create_packed(
-                    self.context,
-                    data_stream.read(),
-                    XilinxPacketsTail,
-                ))
-                break
-        return XilinxPackets(packets)
+            return header_raw, True
+        if packet_type == 2:
+            return struct.pack(
+                ">HI",
+                encode_packet_header(packet_type, opcode, register_address, 0),
+                int(payload_size / WORD_SIZE) - 2
+            ), True
+        return b"", False
+
+    def _pack_packet(self, packet):
+        """
+        :param XilinxPacket packet:
+        :rtype: bytes
+        """
+        payload = packet.get_payload()
+        payload_raw = payload.pack() if payload is not None else b""
+        header_raw, has_payload = self._pack_packet_header(packet, len(payload_raw))
+        if not has_payload:
+            return header_raw
+        return header_raw + payload_raw
+
+    def _pack_packet_into(self, packet, writer):
+        """
+        Write a packet. The size of the payload is computed without packing it, so that the
+        FDRI payload is written directly.
+
+        :param XilinxPacket packet:
+        :param BinaryIO writer:
+        """
+        payload = packet.get_payload()
+        payload_size = get_packed_size(payload) if payload is not None else 0
+        header_raw, has_payload = self._pack_packet_header(packet, payload_size)
+        writer.write(header_raw)
+        if has_payload and payload is not None:
+            pack_into(payload, writer)
+
+    def _pack_packet_object(self, packet_object):
+        """
+        :param DataObject[XilinxPacket] packet_object:
+        :rtype: bytes
+        """
+        if not packet_object.is_unpacked():
+            return packet_object.get_bytes()
+        if not packet_object.is_convertible():
+            # A packet created by the user
+            return self._pack_packet(packet_object.get_model())
+        # The original bytes are returned as is if the packet is in sync
+        return packet_object.pack()
 
     def pack(self, packets):
         """
+        Pack the packets. The packets that are in sync are not encoded again: their bytes are
+        spliced from the packets data, so the packets data must be synchronized first.
+
         :param XilinxPackets packets:
         :rtype: bytes
         """
         assert isinstance(packets, XilinxPackets)
+        table = packets.get_packet_table()
+        packets_data = packets.get_packets_data()
+        if table is None or packets_data is None:
+            return b"".join([
+                self._pack_packet_object(packet_object)
+                for _, packet_object in packets.iterate()
+            ])
+
+        # The packets whose data object was never created are copied from the packets data
+        # in runs of contiguous packets. The runs are sliced from a memoryview so that they are
+        # only copied once, when the parts are joined.
+        packets_data = memoryview(packets_data)
         parts = []
-        for packet_object in packets:
-            if not packet_object.is_unpacked():
-                parts.append(packet_object.get_bytes())
+        run_offset = None
+        for index in range(len(packets)):
+            packet_object = packets.get_created_item(index)
+            if packet_object is None:
+                if run_offset is None:
+                    run_offset = self._get_item_offset(table, index)
                 continue
-            packet = packet_object.get_model()
-            header = packet.get_header().get_model()
-            packet_type = header.get_packet_type().get_model().get_value()
-            register_address = header.get_register_address().get_model().get_value()
-            opcode = header.get_opcode().get_model().get_value()
-
-            payload = packet.get_payload()
-            payload_raw = payload.pack() if payload is not None else b""
-            if packet_type == 0 or packet_type == 1:
-                header = XilinxCtypePacketHeader(
-                    packet_type,
-                    opcode,
-                    register_address,
-                    int(len(payload_raw) / WORD_SIZE),
-                )
-                header_raw = header.get_bytes()
-                parts.append(header_raw[:2])
-                if opcode != 0:
-                    register_format = self._get_register_format(header)
-                    assert register_format.size == len(payload_raw), \
-                        "The payload size ({}) does not match the expected payload size ({}) for " \
-                        "register {}".format(
-                            len(payload_raw),
-                            register_format.size,
-                            register_format.name
-                        )
-                    parts.append(payload_raw)
-            elif packet_type == 2:
-                header = XilinxCtypePacketHeader(
-                    packet_type,
-                    opcode,
-                    register_address,
-                    0,
-                )
-                header_raw = header.get_bytes()
-                parts.append(header_raw[:2])
-                parts.append(struct.pack(">I", int(len(payload_raw) / WORD_SIZE) - 2))
-                parts.append(payload_raw)
+            if run_offset is not None:
+                parts.append(packets_data[run_offset:self._get_item_offset(table, index)])
+                run_offset = None
+            parts.append(self._pack_packet_object(packet_object))
+        if run_offset is not None:
+            parts.append(packets_data[run_offset:])
         return b"".join(parts)
 
+    def _pack_packet_object_into(self, packet_object, writer):
+        """
+        :param DataObject[XilinxPacket] packet_object:
+        :param BinaryIO writer:
+        """
+        if packet_object.is_unpacked() and not packet_object.is_convertible():
+            # A packet created by the user
+            self._pack_packet_into(packet_object.get_model(), writer)
+            return
+        pack_into(packet_object, writer)
+
+    def pack_into(self, packets, writer):
+        """
+        Write the packets, see :py:meth:`pack`. The runs of packets whose data object was never
+        created are written from the packets data without copying them.
+
+        :param XilinxPackets packets:
+        :param BinaryIO writer:
+        """
+        assert isinstance(packets, XilinxPackets)
+        table = packets.get_packet_table()
+        packets_data = packets.get_packets_data()
+        if table is None or packets_data is None:
+            for _, packet_object in packets.iterate():
+                self._pack_packet_object_into(packet_object, writer)
+            return
+
+        packets_data = memoryview(packets_data)
+        run_offset = None
+        for index in range(len(packets)):
+            packet_object = packets.get_created_item(index)
+            if packet_object is None:
+                if run_offset is None:
+                    run_offset = self._get_item_offset(table, index)
+                continue
+            if run_offset is not None:
+                writer.write(packets_data[run_offset:self._get_item_offset(table, index)])
+                run_offset = None
+            self._pack_packet_object_into(packet_object, writer)
+        if run_offset is not None:
+            writer.write(packets_data[run_offset:])
+
+    def _get_item_offset(self, table, index):
+        """
+        :param XilinxPacketTable table:
+        :param int index:
+        :rtype: int
+        """
+        if index < len(table):
+            return table.offsets[index]
+        return table.tail_offset
+
+
+class XilinxIndexedPacketConverter(AbstractConverter):
+    """
+    Converter for a single packet indexed in a packet table. It is created by the
+    :py:class:`XilinxPacketsConverter` for each packet so that a packet is only unpacked when
+    it is accessed.
+
+    :param XilinxContext context: A factory used to create data objects/converters.
+    :param XilinxPacketsConverter packets_converter: The converter that scanned the packets.
+    :param XilinxPacketTable table: The table indexing the packet.
+    :param int index: The index of the packet in the table.
+    """
+    def __init__(self, context, packets_converter, table, index):
+        super(XilinxIndexedPacketConverter, self).__init__(context)
+        self.context = context
+        self._packets_converter = packets_converter
+        self._table = table
+        self._index = index
+
+    def unpack(self, data_bytes):
+        """
+        :param bytes data_bytes:
+        :rtype: XilinxPacket
+        """
+        return self._packets_converter._create_packet_model(data_bytes, self._table, self._index)
 
+    def pack(self, data_model):
+        """
+        :param XilinxPacket data_model:
+        :rtype: bytes
+        """
+        assert isinstance(data_model, XilinxPacket)
+        return self._packets_converter._pack_packet(data_model)
+
+    def pack_into(self, data_model, writer):
+        """
+        :param XilinxPacket data_model:
+        :param BinaryIO writer:
+        """
+        assert isinstance(data_model, XilinxPacket)
+        self._packets_converter._pack_packet_into(data_model, writer)
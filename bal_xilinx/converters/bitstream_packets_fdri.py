@@ -1,14 +1,13 @@
-import io
-
-from typing import List
+from typing import BinaryIO, List
 
 from bal.context_ioc import AbstractConverter
 from bal.data_model import ArrayModel
 from bal.data_object import DataObject
 from bal_xilinx.context import XilinxContext
+from bal_xilinx.converters import get_packed_size, pack_into
 from bal_xilinx.data_model import XilinxFdriPayload, XilinxFdriLogicBlock, \
     XilinxFdriRAMBlockInterface, XilinxFdriIOBlockInterface, XilinxFdriCRCInterface, \
-    XilinxFdriLogicRow, XilinxFdriLogicMajor, XilinxFdriLogicFrame
+    XilinxFdriLogicRow, XilinxFdriLogicMajor
 from bal_xilinx.format import XilinxFdriMajorFormat
 
 
@@ -28,25 +27,15 @@ class XilinxFdriLogicMajorConverter(AbstractConverter):
         :rtype: ArrayModel
         """
         frames = []
-        data_stream = io.BytesIO(data_bytes)
         expected_size = 0
         for frame_index in range(self._major_format.frame_count):
-            frame_data = data_stream.read(self._major_format.frame_size)
+            frame_data = data_bytes[expected_size:expected_size + self._major_format.frame_size]
             expected_size += self._major_format.frame_size
-            frame_description = None
-            if len(self._major_format.frame_descriptions) > frame_index:
-                frame_description = self._major_format.frame_descriptions[frame_index]
-            FrameInterface = type(
-                "XilinxFdriLogicFrame",
-                (XilinxFdriLogicFrame,),
-                {}
-            )
-            FrameInterface.__doc__ = frame_description
             frames.append(
                 DataObject.create_packed(
                     self.context,
                     frame_data,
-                    FrameInterface
+                    self._major_format.frame_models[frame_index]
                 )
             )
 
@@ -56,11 +45,7 @@ class XilinxFdriLogicMajorConverter(AbstractConverter):
                 expected_size
 
         )
-        major_name = "".join([p.title() for p in self._major_format.name.split("_")])
-        class_name = "{}".format(major_name)
-        MajorModel = type(class_name, (XilinxFdriLogicMajor,), {})
-        MajorModel.__doc__ = "The config data for a {} major".format(self._major_format.name)
-        return MajorModel(frames)
+        return self._major_format.major_model(frames)
 
     def pack(self, data_model):
         """
@@ -69,6 +54,21 @@ class XilinxFdriLogicMajorConverter(AbstractConverter):
         """
         return b"".join([c.pack() for c in data_model])
 
+    def pack_into(self, data_model, writer):
+        """
+        :param ArrayModel data_model:
+        :param BinaryIO writer:
+        """
+        for c in data_model:
+            pack_into(c, writer)
+
+    def get_packed_size(self, data_model):
+        """
+        :param ArrayModel data_model:
+        :rtype: int
+        """
+        return sum([get_packed_size(c) for c in data_model])
+
 
 class XilinxFdriLogicBlockRowConverter(AbstractConverter):
     """
@@ -86,14 +86,14 @@ class XilinxFdriLogicBlockRowConverter(AbstractConverter):
         :rtype: ArrayModel
         """
         majors = []
-        data_stream = io.BytesIO(data_bytes)
         expected_size = 0
         for major_format in self._row_format:
             major_size = major_format.frame_count * major_format.frame_size
+            major_data = data_bytes[expected_size:expected_size + major_size]
             expected_size += major_size
             majors.append(DataObject.create_packed(
                 self.context,
-                data_stream.read(major_size),
+                major_data,
                 XilinxFdriLogicMajor,
                 converter_args=(major_format, )
             ))
@@ -112,6 +112,21 @@ class XilinxFdriLogicBlockRowConverter(AbstractConverter):
         """
         return b"".join([c.pack() for c in data_model])
 
+    def pack_into(self, data_model, writer):
+        """
+        :param ArrayModel data_model:
+        :param BinaryIO writer:
+        """
+        for c in data_model:
+            pack_into(c, writer)
+
+    def get_packed_size(self, data_model):
+        """
+        :param ArrayModel data_model:
+        :rtype: int
+        """
+        return sum([get_packed_size(c) for c in data_model])
+
 
 class XilinxFdriLogicConverter(AbstractConverter):
     """
@@ -133,17 +148,17 @@ class XilinxFdriLogicConverter(AbstractConverter):
 
         rows = []
         expected_size = 0
-        data_stream = io.BytesIO(data_bytes)
         fdri_format = self.context.format.get_fdri_format(self.context.id_code)
         for row_format in fdri_format.logic_block_format:
             row_size = sum([
                 major_format.frame_size * major_format.frame_count
                 for major_format in row_format
             ])
+            row_data = data_bytes[expected_size:expected_size + row_size]
             expected_size += row_size
             rows.append(DataObject.create_packed(
                 self.context,
-                data_stream.read(row_size),
+                row_data,
                 XilinxFdriLogicRow,
                 converter_args=(row_format, ),
             ))
@@ -162,6 +177,21 @@ class XilinxFdriLogicConverter(AbstractConverter):
         """
         return b"".join([c.pack() for c in data_object])
 
+    def pack_into(self, data_object, writer):
+        """
+        :param ArrayModel data_object:
+        :param BinaryIO writer:
+        """
+        for c in data_object:
+            pack_into(c, writer)
+
+    def get_packed_size(self, data_object):
+        """
+        :param ArrayModel data_object:
+        :rtype: int
+        """
+        return sum([get_packed_size(c) for c in data_object])
+
 
 class XilinxFdriRAMBlockConverter(AbstractConverter):
     pass
@@ -200,26 +230,28 @@ class XilinxFdriPayloadConverter(AbstractConverter):
                 len(data_bytes),
                 expected_size
             )
-        data_stream = io.BytesIO(data_bytes)
+        bram_block_offset = fdri_format.logic_block_size
+        io_block_offset = bram_block_offset + fdri_format.bram_block_size
+        crc_offset = io_block_offset + fdri_format.io_block_size
         return XilinxFdriPayload(
             DataObject.create_packed(
                 self.context,
-                data_stream.read(fdri_format.logic_block_size),
+                data_bytes[:bram_block_offset],
                 XilinxFdriLogicBlock,
             ),
             DataObject.create_packed(
                 self.context,
-                data_stream.read(fdri_format.bram_block_size),
+                data_bytes[bram_block_offset:io_block_offset],
                 XilinxFdriRAMBlockInterface,
             ),
             DataObject.create_packed(
                 self.context,
-                data_stream.read(fdri_format.io_block_size),
+                data_bytes[io_block_offset:crc_offset],
                 XilinxFdriIOBlockInterface
             ),
             DataObject.create_packed(
                 self.context,
-                data_stream.read(fdri_format.crc_size),
+                data_bytes[crc_offset:],
                 XilinxFdriCRCInterface,
             ),
         )
@@ -235,4 +267,26 @@ class XilinxFdriPayloadConverter(AbstractConverter):
             data_object.get_ram_block().pack(),
             data_object.get_io_block().pack(),
             data_object.get_crc().pack()
-        ])
\ No newline at end of file
+        ])
+
+    def pack_into(self, data_object, writer):
+        """
+        :param XilinxFdriPayload data_object:
+        :param BinaryIO writer:
+        """
+        assert isinstance(data_object, XilinxFdriPayload)
+        pack_into(data_object.get_logic_block(), writer)
+        pack_into(data_object.get_ram_block(), writer)
+        pack_into(data_object.get_io_block(), writer)
+        pack_into(data_object.get_crc(), writer)
+
+    def get_packed_size(self, data_object):
+        """
+        :param XilinxFdriPayload data_object:
+        :rtype: int
+        """
+        assert isinstance(data_object, XilinxFdriPayload)
+        return get_packed_size(data_object.get_logic_block()) + \
+            get_packed_size(data_object.get_ram_block()) + \
+            get_packed_size(data_object.get_io_block()) + \
+            get_packed_size(data_object.get_crc())
@@ -0,0 +1,285 @@
+import struct
+from array import array
+
+from typing import Dict, List, Optional, Tuple
+
+from bal_xilinx.converters import WORD_SIZE
+from bal_xilinx.format import XilinxFormat, XilinxRegisterFormat
+
+HEADER_TYPE_SHIFT = 13
+HEADER_OPCODE_SHIFT = 11
+HEADER_REGISTER_ADDRESS_SHIFT = 5
+HEADER_TYPE_MASK = 0x7
+HEADER_OPCODE_MASK = 0x3
+HEADER_REGISTER_ADDRESS_MASK = 0x3F
+HEADER_WORD_COUNT_MASK = 0x1F
+
+# The opcode of a write packet
+WRITE_OPCODE = 2
+
+# The size of the word count that follows the header of a type 2 packet
+TYPE2_WORD_COUNT_SIZE = 4
+
+
+def decode_packet_header(header_word):
+    """
+    Split a 16 bits packet header word into its fields.
+
+    :param int header_word: The header word, decoded as a big endian integer.
+    :rtype: Tuple[int, int, int, int]
+    :return: The type, opcode, register address and word count of the packet.
+    """
+    return (
+        (header_word >> HEADER_TYPE_SHIFT) & HEADER_TYPE_MASK,
+        (header_word >> HEADER_OPCODE_SHIFT) & HEADER_OPCODE_MASK,
+        (header_word >> HEADER_REGISTER_ADDRESS_SHIFT) & HEADER_REGISTER_ADDRESS_MASK,
+        header_word & HEADER_WORD_COUNT_MASK,
+    )
+
+
+def encode_packet_header(packet_type, opcode, register_address, word_count):
+    """
+    Build a 16 bits packet header word from its fields.
+
+    :param int packet_type:
+    :param int opcode:
+    :param int register_address:
+    :param int word_count: The word count, it is expected to be 0 for a type 2 packet.
+    :rtype: int
+    """
+    return ((packet_type & HEADER_TYPE_MASK) << HEADER_TYPE_SHIFT) | \
+        ((opcode & HEADER_OPCODE_MASK) << HEADER_OPCODE_SHIFT) | \
+        ((register_address & HEADER_REGISTER_ADDRESS_MASK) << HEADER_REGISTER_ADDRESS_SHIFT) | \
+        (word_count & HEADER_WORD_COUNT_MASK)
+
+
+class XilinxPacketTable(object):
+    """
+    A compact index of the configuration packets of a Xilinx bitstream. Each packet is a row
+    spread across arrays of native integers, which is much cheaper to build and to keep around
+    than the data objects describing the same packets.
+
+    All the offsets are relative to the start of the packets data (ie right after the sync word).
+
+    :ivar array offsets: The offset of each packet header.
+    :ivar array packet_types: The type (0, 1 or 2) of each packet.
+    :ivar array opcodes: The opcode of each packet.
+    :ivar array register_addresses: The register address found in each packet header.
+    :ivar array word_counts: The word count of each packet. For type 2 packets, it is the
+        value of the 32 bits word count that follows the header.
+    :ivar array payload_offsets: The offset of the payload of each packet.
+    :ivar array payload_sizes: The size of the payload of each packet in bytes. A packet with a
+        payload size of 0 does not have a payload.
+    :ivar List[XilinxRegisterFormat] register_formats: The register format for each packet.
+    :ivar Optional[int] tail_offset: The offset of the data following the DESYNC command, None
+        if the packets data does not contain a DESYNC command.
+    """
+    def __init__(self):
+        self.offsets = array("L")
+        self.packet_types = array("B")
+        self.opcodes = array("B")
+        self.register_addresses = array("B")
+        self.word_counts = array("L")
+        self.payload_offsets = array("L")
+        self.payload_sizes = array("L")
+        self.register_formats = []  # type: List[XilinxRegisterFormat]
+        self.tail_offset = None  # type: Optional[int]
+        self._indexes_by_register_name = None  # type: Optional[Dict[str, List[int]]]
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def get_packet_indexes_by_register_name(self, register):
+        """
+        Get the indexes of the packets targeting a register.
+
+        :param str register: The name of the register.
+        :rtype: List[int]
+        """
+        if self._indexes_by_register_name is None:
+            indexes_by_register_name = {}
+            for index, register_format in enumerate(self.register_formats):
+                register_indexes = indexes_by_register_name.get(register_format.name)
+                if register_indexes is None:
+                    register_indexes = []
+                    indexes_by_register_name[register_format.name] = register_indexes
+                register_indexes.append(index)
+            self._indexes_by_register_name = indexes_by_register_name
+        return self._indexes_by_register_name.get(register) or []
+
+    def get_packet_span(self, index):
+        """
+        Get the start and end offsets of a packet, the header included.
+
+        :param int index: The index of the packet in the table.
+        :rtype: Tuple[int, int]
+        """
+        return self.offsets[index], self.payload_offsets[index] + self.payload_sizes[index]
+
+    def get_fdri_packet_index(self, payload_size):
+        """
+        Get the index of the FDRI packet writing the whole device, ie the one whose payload has
+        the size of the FDRI payload of the device. The other FDRI packets are ignored (ie the
+        second, much smaller FDRI packet of the LX45T bitstreams).
+
+        :param int payload_size: The size of the FDRI payload of the device, see
+            :py:meth:`~bal_xilinx.format.XilinxFdriFormat.get_payload_size`.
+        :rtype: int
+        :raises ValueError: If the bitstream does not hold a single FDRI packet of that size.
+        """
+        fdri_indexes = [
+            index for index in self.get_packet_indexes_by_register_name("Fdri")
+            if self.payload_sizes[index] == payload_size
+        ]
+        if len(fdri_indexes) != 1:
+            raise ValueError(
+                "A single Fdri register packet of {} bytes is expected in the bitstream".format(
+                    payload_size
+                )
+            )
+        return fdri_indexes[0]
+
+    def get_payload_span(self, index):
+        """
+        Get the start and end offsets of the payload of a packet.
+
+        :param int index: The index of the packet in the table.
+        :rtype: Tuple[int, int]
+        """
+        payload_offset = self.payload_offsets[index]
+        return payload_offset, payload_offset + self.payload_sizes[index]
+
+
+class XilinxPacketScanner(object):
+    """
+    Scan the configuration packets of a Xilinx bitstream in a single pass over the header
+    words, building a :py:class:`XilinxPacketTable`. No data object is created while scanning.
+
+    :param XilinxFormat bitstream_format: The Xilinx bitstream format configuration.
+    """
+    def __init__(self, bitstream_format):
+        self._format = bitstream_format
+        self._far_maj_extended_format = bitstream_format.get_register_format_by_name(
+            "FarMajExtended"
+        )
+        self._desync_command = None
+        cmd_format = bitstream_format.get_register_format_by_name("Cmd")
+        if cmd_format is not None:
+            for attribute_format in cmd_format.attributes:
+                if attribute_format.name.lower() == "command":
+                    self._desync_command = attribute_format.get_value_by_name("DESYNC")
+
+    def get_register_format(self, register_address, word_count):
+        """
+        Lookup the format of the register targeted by a packet.
+
+        :param int register_address: The register address found in the packet header.
+        :param int word_count: The word count found in the packet header.
+        :rtype: XilinxRegisterFormat
+        """
+        register_format = self._format.get_register_format(register_address)
+        # Corner case for a the FAR_MAJ register
+        if register_format is not None and register_format.name == "FarMaj" and \
+                word_count > 1:
+            register_format = self._far_maj_extended_format
+        # Verify that we know how to parse the config for the register
+        if register_format is None:
+            raise ValueError(
+                "No register format found for address {}".format(hex(register_address))
+            )
+        return register_format
+
+    def scan(self, data_bytes):
+        """
+        Build the packet table for the packets data of a bitstream.
+
+        :param bytes data_bytes: The packets data, starting right after the sync word.
+        :rtype: XilinxPacketTable
+        """
+        table = XilinxPacketTable()
+        offsets = table.offsets
+        packet_types = table.packet_types
+        opcodes = table.opcodes
+        register_addresses = table.register_addresses
+        word_counts = table.word_counts
+        payload_offsets = table.payload_offsets
+        payload_sizes = table.payload_sizes
+        register_formats = table.register_formats
+        unpack_from = struct.unpack_from
+        desync_command = self._desync_command
+
+        data_size = len(data_bytes)
+        offset = 0
+        previous_packet_type = 0
+        while offset < data_size:
+            if offset + WORD_SIZE > data_size:
+                raise ValueError(
+                    "Truncated packet header at offset {} while parsing the Xilinx config "
+                    "packets".format(offset)
+                )
+            header_word, = unpack_from(">H", data_bytes, offset)
+            packet_type = (header_word >> HEADER_TYPE_SHIFT) & HEADER_TYPE_MASK
+            opcode = (header_word >> HEADER_OPCODE_SHIFT) & HEADER_OPCODE_MASK
+            register_address = \
+                (header_word >> HEADER_REGISTER_ADDRESS_SHIFT) & HEADER_REGISTER_ADDRESS_MASK
+            word_count = header_word & HEADER_WORD_COUNT_MASK
+            register_format = self.get_register_format(register_address, word_count)
+            if opcode == 3:
+                raise ValueError(
+                    "Unexpected header opcode {} while parsing the Xilinx config packets".format(
+                        opcode
+                    )
+                )
+
+            is_done = False
+            payload_offset = offset + WORD_SIZE
+            if packet_type == 0:
+                payload_size = 0
+            elif packet_type == 1:
+                payload_size = word_count * WORD_SIZE
+                if payload_size != 0 and opcode == 0:
+                    raise ValueError("NOOP Xilinx packets are expected to have a 0 length payload")
+                if desync_command is not None and payload_size != 0 and \
+                        register_format.name == "Cmd" and \
+                        payload_offset + WORD_SIZE <= data_size and \
+                        unpack_from(">H", data_bytes, payload_offset)[0] == desync_command:
+                    is_done = True
+            elif packet_type == 2:
+                if previous_packet_type != 1:
+                    raise ValueError(
+                        "Unexpected packet type 2 after a packet type {}".format(
+                            previous_packet_type
+                        )
+                    )
+                if payload_offset + TYPE2_WORD_COUNT_SIZE > data_size:
+                    raise ValueError(
+                        "Truncated type 2 word count at offset {} while parsing the Xilinx "
+                        "config packets".format(payload_offset)
+                    )
+                word_count, = unpack_from(">I", data_bytes, payload_offset)
+                payload_offset += TYPE2_WORD_COUNT_SIZE
+                payload_size = (word_count + 2) * WORD_SIZE
+            else:
+                raise ValueError(
+                    "Unexpected packet type {} while parsing the Xilinx bitstream".format(
+                        packet_type
+                    )
+                )
+            # A truncated payload is kept as is, like the rest of the bitstream data
+            payload_size = min(payload_size, data_size - payload_offset)
+
+            offsets.append(offset)
+            packet_types.append(packet_type)
+            opcodes.append(opcode)
+            register_addresses.append(register_address)
+            word_counts.append(word_count)
+            payload_offsets.append(payload_offset)
+            payload_sizes.append(payload_size)
+            register_formats.append(register_format)
+
+            previous_packet_type = packet_type
+            offset = payload_offset + payload_size
+            if is_done:
+                table.tail_offset = offset
+                break
+        return table
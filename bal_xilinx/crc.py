@@ -0,0 +1,368 @@
+import bisect
+import struct
+import sys
+from array import array
+
+from typing import List, Optional, Tuple
+
+from bal_xilinx.converters import WORD_SIZE
+from bal_xilinx.converters.bitstream_packets_scanner import WRITE_OPCODE, \
+    XilinxPacketScanner, XilinxPacketTable
+from bal_xilinx.format import XilinxFormat
+
+# The bit reflected Castagnoli polynomial
+CRC32C_POLYNOMIAL = 0x82F63B78
+
+
+def words_from_bytes(data_bytes):
+    """
+    Convert big endian configuration data to an array of 16 bits words.
+
+    :param bytes data_bytes: The configuration data, its size is expected to be a multiple of the
+        word size.
+    :rtype: array
+    """
+    words = array("H", bytes(data_bytes))
+    if sys.byteorder == "little":
+        words.byteswap()
+    return words
+
+
+class XilinxCrcEngine(object):
+    """
+    A table driven, bit reflected CRC over the words written to the configuration registers.
+    Each word feeds the data bits followed by the register address bits into the CRC, least
+    significant bit first. The defaults compute the CRC-32C of the 6 bits register address and
+    16 bits data of the Spartan-6 configuration words.
+
+    The CRC is linear, so the engine can also update a CRC value from the words that changed
+    since it was computed (see :py:meth:`get_word_delta` and :py:meth:`shift`).
+
+    :param int polynomial: The bit reflected polynomial.
+    :param int address_bits: The number of register address bits fed for each word.
+    :param int data_bits: The number of data bits in a word. Up to 16 bits are supported.
+    """
+    def __init__(self, polynomial=CRC32C_POLYNOMIAL, address_bits=6, data_bits=16):
+        if data_bits > 16:
+            raise ValueError("Words of up to 16 bits are supported, got {}".format(data_bits))
+        self.polynomial = polynomial
+        self.address_bits = address_bits
+        self.data_bits = data_bits
+        self._address_mask = (1 << address_bits) - 1
+        self._data_mask = (1 << data_bits) - 1
+        self._address_table = self._create_table(address_bits)
+        self._data_table = None  # type: Optional[List[int]]
+        # The operators shifting a CRC by 2^n zero words, see shift
+        self._shift_operators = [self._create_shift_operator(address_bits + data_bits)]
+
+    def _update_bits(self, crc, value, bit_count):
+        for _ in range(bit_count):
+            if (crc ^ value) & 1:
+                crc = (crc >> 1) ^ self.polynomial
+            else:
+                crc >>= 1
+            value >>= 1
+        return crc
+
+    def _create_table(self, bit_count):
+        return [self._update_bits(value, 0, bit_count) for value in range(1 << bit_count)]
+
+    def _get_data_table(self):
+        # The table for a whole data word is built from a byte table, it is only built when it
+        # is first used as it holds 2^16 entries for 16 bits words.
+        if self._data_table is None:
+            if self.data_bits <= 8:
+                self._data_table = self._create_table(self.data_bits)
+            else:
+                byte_table = self._create_table(8)
+                high_bit_count = self.data_bits - 8
+                high_table = self._create_table(high_bit_count)
+                data_table = []
+                for value in range(1 << self.data_bits):
+                    crc = byte_table[value & 0xFF] ^ (value >> 8)
+                    data_table.append(
+                        high_table[crc & ((1 << high_bit_count) - 1)] ^ (crc >> high_bit_count)
+                    )
+                self._data_table = data_table
+        return self._data_table
+
+    def _create_shift_operator(self, bit_count):
+        # Column n of the operator is the CRC of the value 1 << n shifted by bit_count zero bits
+        return [self._update_bits(1 << n, 0, bit_count) for n in range(32)]
+
+    @staticmethod
+    def _apply_operator(operator, crc):
+        result = 0
+        index = 0
+        while crc:
+            if crc & 1:
+                result ^= operator[index]
+            crc >>= 1
+            index += 1
+        return result
+
+    def update(self, crc, register_address, words):
+        """
+        Feed words written to a register into a CRC.
+
+        :param int crc: The current CRC value.
+        :param int register_address: The address of the register the words are written to.
+        :param Iterable[int] words: The data words.
+        :rtype: int
+        """
+        data_table = self._get_data_table()
+        address_table = self._address_table
+        data_bits = self.data_bits
+        data_mask = self._data_mask
+        address_bits = self.address_bits
+        address_mask = self._address_mask
+        for word in words:
+            crc = data_table[(crc ^ word) & data_mask] ^ (crc >> data_bits)
+            crc = address_table[(crc ^ register_address) & address_mask] ^ (crc >> address_bits)
+        return crc
+
+    def update_bytes(self, crc, register_address, data_bytes):
+        """
+        Feed big endian configuration data written to a register into a CRC.
+
+        :param int crc: The current CRC value.
+        :param int register_address: The address of the register the data is written to.
+        :param bytes data_bytes: The configuration data.
+        :rtype: int
+        """
+        return self.update(crc, register_address, words_from_bytes(data_bytes))
+
+    def shift(self, crc, word_count):
+        """
+        Feed zero words with a zero register address into a CRC. It runs in a logarithmic time
+        of `word_count`.
+
+        :param int crc:
+        :param int word_count:
+        :rtype: int
+        """
+        power = 0
+        while word_count:
+            if power == len(self._shift_operators):
+                previous_operator = self._shift_operators[-1]
+                self._shift_operators.append([
+                    self._apply_operator(previous_operator, column)
+                    for column in previous_operator
+                ])
+            if word_count & 1:
+                crc = self._apply_operator(self._shift_operators[power], crc)
+            word_count >>= 1
+            power += 1
+        return crc
+
+    def get_word_delta(self, word_xor, word_count_after):
+        """
+        Get the change of a CRC caused by a change of a single data word. XOR-ing the delta with
+        the CRC computed over the original words gives the CRC over the modified words.
+
+        :param int word_xor: The XOR of the original and the modified data word.
+        :param int word_count_after: The number of words fed into the CRC after the modified one.
+        :rtype: int
+        """
+        return self.shift(self.update(0, 0, (word_xor, )), word_count_after)
+
+
+_default_crc_engine = None  # type: Optional[XilinxCrcEngine]
+
+
+def get_default_crc_engine():
+    """
+    Get the CRC-32C engine shared by the calculators, its tables are only built once.
+
+    :rtype: XilinxCrcEngine
+    """
+    global _default_crc_engine
+    if _default_crc_engine is None:
+        _default_crc_engine = XilinxCrcEngine()
+    return _default_crc_engine
+
+
+class XilinxCrcCheck(object):
+    """
+    A CRC value stored in the bitstream: the payload of a write to the Crc register or the tail
+    of an FDRI payload.
+
+    :ivar str name: "Crc" for the Crc register, "FdriTail" for the tail of an FDRI payload.
+    :ivar int packet_index: The index of the packet holding the value.
+    :ivar int offset: The offset of the value in the packets data.
+    :ivar int stored_value: The value stored in the bitstream.
+    :ivar int computed_value: The CRC computed over the configuration words.
+    :ivar int epoch: The number of CRC resets before the value.
+    :ivar int word_position: The number of words fed into the CRC since the last reset.
+    """
+    def __init__(self, name, packet_index, offset, stored_value, computed_value, epoch,
+                 word_position):
+        self.name = name
+        self.packet_index = packet_index
+        self.offset = offset
+        self.stored_value = stored_value
+        self.computed_value = computed_value
+        self.epoch = epoch
+        self.word_position = word_position
+
+    def is_valid(self):
+        """
+        :rtype: bool
+        """
+        return self.stored_value == self.computed_value
+
+
+class XilinxCrcCalculator(object):
+    """
+    Compute the configuration CRC of the packets of a bitstream and locate the CRC values stored
+    in them.
+
+    All the data written to the configuration registers is fed into the CRC, except for the
+    CRC values themselves. Writing the RCRC command resets the CRC. A write to the Crc register
+    and the 2 words ending the payload of a type 2 FDRI write are checked against the CRC.
+
+    :param XilinxFormat bitstream_format: The Xilinx bitstream format configuration.
+    :param Optional[XilinxCrcEngine] engine: The CRC engine, CRC-32C by default.
+    """
+    CRC_SIZE = 4
+
+    def __init__(self, bitstream_format, engine=None):
+        self._scanner = XilinxPacketScanner(bitstream_format)
+        self.engine = engine if engine is not None else get_default_crc_engine()
+        self._reset_command = None
+        cmd_format = bitstream_format.get_register_format_by_name("Cmd")
+        if cmd_format is not None:
+            for attribute_format in cmd_format.attributes:
+                if attribute_format.name.lower() == "command":
+                    self._reset_command = attribute_format.get_value_by_name("RCRC")
+
+    def _iterate_crc_data(self, table):
+        """
+        Iterate over the writes of the packets.
+
+        :rtype: Iterator[Tuple[int, str, int, int, int]]
+        :return: The index of the packet, the CRC value name or None if it is configuration
+            data, the register address, the start and the end offsets of the data.
+        """
+        for index in range(len(table)):
+            if table.opcodes[index] != WRITE_OPCODE:
+                continue
+            payload_offset, payload_end_offset = table.get_payload_span(index)
+            if payload_end_offset == payload_offset:
+                continue
+            register_name = table.register_formats[index].name
+            register_address = table.register_addresses[index]
+            if register_name == "Crc":
+                yield index, "Crc", register_address, payload_offset, payload_end_offset
+            elif register_name == "Fdri" and table.packet_types[index] == 2 and \
+                    payload_end_offset - payload_offset >= self.CRC_SIZE:
+                tail_offset = payload_end_offset - self.CRC_SIZE
+                yield index, None, register_address, payload_offset, tail_offset
+                yield index, "FdriTail", register_address, tail_offset, payload_end_offset
+            else:
+                yield index, None, register_address, payload_offset, payload_end_offset
+
+    def get_checks(self, packets_data, table=None):
+        """
+        Compute the CRC values expected in the packets.
+
+        :param bytes packets_data: The packets data, starting right after the sync word.
+        :param Optional[XilinxPacketTable] table: The packet table for the packets data. It is
+            scanned if not provided.
+        :rtype: List[XilinxCrcCheck]
+        """
+        if table is None:
+            table = self._scanner.scan(packets_data)
+        checks = []
+        crc = 0
+        epoch = 0
+        word_position = 0
+        for index, name, register_address, offset, end_offset in \
+                self._iterate_crc_data(table):
+            if name is not None:
+                stored_value, = struct.unpack(">I", bytes(packets_data[offset:end_offset]))
+                checks.append(XilinxCrcCheck(
+                    name, index, offset, stored_value, crc, epoch, word_position
+                ))
+                continue
+            words = words_from_bytes(packets_data[offset:end_offset])
+            crc = self.engine.update(crc, register_address, words)
+            word_position += len(words)
+            if table.register_formats[index].name == "Cmd" and len(words) > 0 and \
+                    words[0] == self._reset_command:
+                crc = 0
+                epoch += 1
+                word_position = 0
+        return checks
+
+    def update_checks(self, packets_data, patches, table=None):
+        """
+        Update the CRC values stored in the packets from the words that were patched since the
+        values were valid, without computing the CRC over the rest of the data.
+
+        :param bytes packets_data: The patched packets data.
+        :param List[Tuple[int, bytes]] patches: The offset in the packets data and the XOR of the
+            original and the patched bytes for each patch.
+        :param Optional[XilinxPacketTable] table: The packet table for the packets data.
+        :rtype: List[XilinxCrcCheck]
+        :raises ValueError: If a patch modified the structure of the packets (ie a header).
+        """
+        if table is None:
+            table = self._scanner.scan(packets_data)
+        # Locate the configuration data and the CRC values in the CRC words stream
+        segment_offsets = []
+        segments = []
+        checks = []
+        epoch = 0
+        word_position = 0
+        for index, name, register_address, offset, end_offset in \
+                self._iterate_crc_data(table):
+            if name is not None:
+                stored_value, = struct.unpack(">I", bytes(packets_data[offset:end_offset]))
+                checks.append(XilinxCrcCheck(
+                    name, index, offset, stored_value, stored_value, epoch, word_position
+                ))
+                continue
+            segment_offsets.append(offset)
+            segments.append((offset, end_offset, epoch, word_position))
+            word_position += (end_offset - offset) // WORD_SIZE
+            if table.register_formats[index].name == "Cmd" and \
+                    words_from_bytes(packets_data[offset:offset + WORD_SIZE])[0] == \
+                    self._reset_command:
+                epoch += 1
+                word_position = 0
+        check_offsets = [check.offset for check in checks]
+
+        for patch_offset, patch_xor in patches:
+            # The patches are aligned on words, the bytes around the patch did not change
+            aligned_offset = patch_offset - patch_offset % WORD_SIZE
+            aligned_xor = bytearray(patch_offset - aligned_offset) + bytearray(patch_xor)
+            aligned_xor += bytearray(-len(aligned_xor) % WORD_SIZE)
+            word_xors = words_from_bytes(aligned_xor)
+            for word_index, word_xor in enumerate(word_xors):
+                if word_xor == 0:
+                    continue
+                word_offset = aligned_offset + word_index * WORD_SIZE
+                segment_index = bisect.bisect_right(segment_offsets, word_offset) - 1
+                if segment_index >= 0 and word_offset < segments[segment_index][1]:
+                    segment_offset, _, segment_epoch, segment_word_position = \
+                        segments[segment_index]
+                    position = segment_word_position + \
+                        (word_offset - segment_offset) // WORD_SIZE
+                    for check in checks:
+                        if check.epoch == segment_epoch and check.word_position > position:
+                            check.computed_value ^= self.engine.get_word_delta(
+                                word_xor,
+                                check.word_position - position - 1
+                            )
+                    continue
+                check_index = bisect.bisect_right(check_offsets, word_offset) - 1
+                if check_index < 0 or \
+                        word_offset >= check_offsets[check_index] + self.CRC_SIZE:
+                    raise ValueError(
+                        "The patch at offset {} modifies the packets structure".format(
+                            patch_offset
+                        )
+                    )
+                # The CRC values are not fed into the CRC
+        return checks
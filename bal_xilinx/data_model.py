@@ -264,10 +264,157 @@ class XilinxPacketsTail(DataModel):
 class XilinxPackets(ArrayModel[DataObject[XilinxPacket]]):
     """
     An array of Xilinx register configuration packet.
+
+    When it is backed by a packet table, the data object for a packet is only created the
+    first time the packet is reached and the packet is only unpacked when it is indexed,
+    iterated over or looked up by register name. Modifying the array creates the data objects
+    for all the packets.
+
+    :param List[Optional[DataObject[XilinxPacket]]] items: The packets. A None item is created
+        on first access using `create_item`.
+    :param Optional[XilinxPacketTable] packet_table: The table indexing the packets.
+    :param Optional[Callable[[int],DataObject]] create_item: Create the data object for the
+        packet at the provided index.
+    :param Optional[bytes] packets_data: The packets data indexed by the packet table.
     """
 
-    def __init__(self, items):
+    def __init__(self, items, packet_table=None, create_item=None, packets_data=None):
         super(XilinxPackets, self).__init__(items)
+        self._packet_table = packet_table
+        self._create_item = create_item
+        self._packets_data = packets_data
+
+    def _get_item(self, index):
+        """
+        Get the data object at the provided index, creating it if needed. The data object is
+        not unpacked.
+
+        :param int index:
+        :rtype: DataObject[XilinxPacket]
+        """
+        item = self._items[index]
+        if item is None:
+            if index < 0:
+                index += len(self._items)
+            item = self._create_item(index)
+            self._items[index] = item
+        return item
+
+    def _create_items(self):
+        """
+        Create the data objects of all the packets and drop the packet table. It is called
+        before any modification of the array as the table indexes would not match anymore.
+        """
+        if self._packet_table is None:
+            return
+        for index in range(len(self._items)):
+            self._get_item(index)
+        self._packet_table = None
+        self._create_item = None
+        self._packets_data = None
+
+    def get_created_item(self, index):
+        """
+        Get the data object at the provided index if it was created. An item that was never
+        created is still the packet data indexed by the packet table.
+
+        :param int index:
+        :rtype: Optional[DataObject[XilinxPacket]]
+        """
+        return self._items[index]
+
+    def get_packets_data(self):
+        """
+        Get the packets data indexed by the packet table. It is None if the array was not
+        created from a packet table or if it was modified.
+
+        :rtype: Optional[bytes]
+        """
+        return self._packets_data
+
+    def get_packet_table(self):
+        """
+        Get the table indexing the packets. It is None if the array was not created from a
+        packet table or if it was modified.
+
+        :rtype: Optional[XilinxPacketTable]
+        """
+        return self._packet_table
+
+    def get_packets_by_register_name(self, register):
+        """
+        Get the packets targeting a register. Only the matching packets are unpacked when the
+        array is backed by a packet table.
+
+        :param str register:
+        :rtype: List[XilinxPacket]
+        """
+        if self._packet_table is not None:
+            return [
+                self[index].get_model()
+                for index in self._packet_table.get_packet_indexes_by_register_name(register)
+            ]
+        packets = []
+        for packet_object in self:
+            if not packet_object.is_unpacked():
+                continue
+            packet = packet_object.get_model()
+            register_name = packet.get_header().unpack()\
+                .get_register_address().unpack()\
+                .value_name
+            if register_name == register:
+                packets.append(packet)
+        return packets
+
+    def iterate(self):
+        """
+        Create an iterator of the packets data objects. The packets are not unpacked.
+
+        :rtype: Iterator[Tuple[int, DataObject[XilinxPacket]]]
+        """
+        for index in range(len(self._items)):
+            yield index, self._get_item(index)
+
+    def insert(self, index, object):
+        self._create_items()
+        super(XilinxPackets, self).insert(index, object)
+
+    def append(self, object):
+        self._create_items()
+        super(XilinxPackets, self).append(object)
+
+    def pop(self, index=None):
+        self._create_items()
+        if index is None:
+            return super(XilinxPackets, self).pop()
+        return super(XilinxPackets, self).pop(index)
+
+    def __iter__(self):
+        """
+        :rtype: Iterator[DataObject[XilinxPacket]]
+        """
+        for index in range(len(self._items)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        """
+        :param int index:
+        :rtype: DataObject[XilinxPacket]
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        item = self._get_item(index)
+        if not item.is_unpacked() and item.is_convertible():
+            item.unpack()
+        return item
+
+    def __setitem__(self, index, object):
+        self._create_items()
+        super(XilinxPackets, self).__setitem__(index, object)
+
+    def __delitem__(self, index):
+        self._create_items()
+        super(XilinxPackets, self).__delitem__(index)
 
 
 class XilinxBitstreamHeaderInterface(DataModel):
@@ -306,19 +453,6 @@ class XilinxBitstream(ClassModel[DataObject]):
         self._header = header
         self._sync_marker = sync_marker
         self._packets = packets
-        self._packets_by_register = {}
-        for packet_object in self._packets.unpack():
-            if not packet_object.is_unpacked() and not packet_object.is_convertible():
-                continue
-            packet = packet_object.unpack()
-            register_name = packet.get_header().unpack()\
-                .get_register_address().unpack()\
-                .value_name
-            register_packets = self._packets_by_register.get(register_name)
-            if register_packets is None:
-                register_packets = []
-                self._packets_by_register[register_name] = register_packets
-            register_packets.append(packet)
 
     def get_header(self):
         """
@@ -343,7 +477,7 @@ class XilinxBitstream(ClassModel[DataObject]):
         :param str register:
         :rtype: List[XilinxPacket]
         """
-        return self._packets_by_register.get(register) or tuple()
+        return self._packets.unpack().get_packets_by_register_name(register) or tuple()
 
     def set_header(self, header):
         """
@@ -1,45 +1,80 @@
 import os
 
-from bal.analyzers.visualizer_analyzer import VisualizerAnalyzer
-from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
-from bal_xilinx.analyzers.encryption_analyzer import XilinxEncryptionAnalyzer
-from bal_xilinx.analyzers.visualizer_analyzer import XilinxVisualizerAnalyzer
-from bal_xilinx.converters.bitstream import XilinxBitstreamConverter
-from bal_xilinx.converters.bitstream_packets import XilinxPacketsConverter
-from bal_xilinx.converters.bitstream_packets_1 import XilinxType1PayloadConverter
-from bal_xilinx.converters.bitstream_packets_fdri import XilinxFdriPayloadConverter, \
-    XilinxFdriLogicConverter, XilinxFdriLogicBlockRowConverter, XilinxFdriLogicMajorConverter
-from bal_xilinx.data_model import XilinxBitstream, XilinxPackets, \
-    XilinxType1Payload, XilinxFdriPayload, XilinxFdriLogicBlock, \
-    XilinxFdriLogicRow, XilinxFdriLogicMajor
 from bal_xilinx.format import XilinxFormatBuilder
-from bal_xilinx.modifiers.pin_modifier import XilinxPinModifer
+from bal_xilinx.format_cache import XilinxFormatCache, get_default_format_cache_directory
+
+# The default implementations are registered by name, their modules are only imported once they
+# are used
+DEFAULT_XILINX_CONVERTERS = [
+    ("bal_xilinx.data_model.XilinxBitstream",
+     "bal_xilinx.converters.bitstream.XilinxBitstreamConverter"),
+    ("bal_xilinx.data_model.XilinxPackets",
+     "bal_xilinx.converters.bitstream_packets.XilinxPacketsConverter"),
+    ("bal_xilinx.data_model.XilinxType1Payload",
+     "bal_xilinx.converters.bitstream_packets_1.XilinxType1PayloadConverter"),
+    ("bal_xilinx.data_model.XilinxFdriPayload",
+     "bal_xilinx.converters.bitstream_packets_fdri.XilinxFdriPayloadConverter"),
+    ("bal_xilinx.data_model.XilinxFdriLogicBlock",
+     "bal_xilinx.converters.bitstream_packets_fdri.XilinxFdriLogicConverter"),
+    ("bal_xilinx.data_model.XilinxFdriLogicRow",
+     "bal_xilinx.converters.bitstream_packets_fdri.XilinxFdriLogicBlockRowConverter"),
+    ("bal_xilinx.data_model.XilinxFdriLogicMajor",
+     "bal_xilinx.converters.bitstream_packets_fdri.XilinxFdriLogicMajorConverter"),
+]
+DEFAULT_XILINX_ANALYZERS = [
+    ("bal.analyzers.visualizer_analyzer.VisualizerAnalyzer",
+     "bal_xilinx.analyzers.visualizer_analyzer.XilinxVisualizerAnalyzer"),
+    ("bal_xilinx.analyzers.device_analyzer.XilinxDeviceAnalyzer",
+     "bal_xilinx.analyzers.device_analyzer.XilinxDeviceAnalyzer"),
+    ("bal_xilinx.analyzers.encryption_analyzer.XilinxEncryptionAnalyzer",
+     "bal_xilinx.analyzers.encryption_analyzer.XilinxEncryptionAnalyzer"),
+    ("bal_xilinx.analyzers.frame_matrix_analyzer.XilinxFrameMatrixAnalyzer",
+     "bal_xilinx.analyzers.frame_matrix_analyzer.XilinxFrameMatrixAnalyzer"),
+    ("bal_xilinx.analyzers.crc_analyzer.XilinxCrcAnalyzer",
+     "bal_xilinx.analyzers.crc_analyzer.XilinxCrcAnalyzer"),
+    ("bal_xilinx.analyzers.frame_diff_analyzer.XilinxFrameDiffAnalyzer",
+     "bal_xilinx.analyzers.frame_diff_analyzer.XilinxFrameDiffAnalyzer"),
+    ("bal_xilinx.analyzers.frame_address_analyzer.XilinxFrameAddressAnalyzer",
+     "bal_xilinx.analyzers.frame_address_analyzer.XilinxFrameAddressAnalyzer"),
+    ("bal_xilinx.analyzers.partial_bitstream_analyzer.XilinxPartialBitstreamAnalyzer",
+     "bal_xilinx.analyzers.partial_bitstream_analyzer.XilinxPartialBitstreamAnalyzer"),
+    ("bal_xilinx.analyzers.compression_analyzer.XilinxCompressionAnalyzer",
+     "bal_xilinx.analyzers.compression_analyzer.XilinxCompressionAnalyzer"),
+]
+DEFAULT_XILINX_MODIFIERS = [
+    ("bal_xilinx.modifiers.pin_modifier.XilinxPinModifer",
+     "bal_xilinx.modifiers.pin_modifier.XilinxPinModifer"),
+    ("bal_xilinx.modifiers.crc_modifier.XilinxCrcModifier",
+     "bal_xilinx.modifiers.crc_modifier.XilinxCrcModifier"),
+]
 
 
 def register_defaults_context_converters(context):
-    context.register_converter(XilinxBitstream, XilinxBitstreamConverter)
-    context.register_converter(XilinxPackets, XilinxPacketsConverter)
-    context.register_converter(XilinxType1Payload, XilinxType1PayloadConverter)
-    context.register_converter(XilinxFdriPayload, XilinxFdriPayloadConverter)
-    context.register_converter(XilinxFdriLogicBlock, XilinxFdriLogicConverter)
-    context.register_converter(XilinxFdriLogicRow, XilinxFdriLogicBlockRowConverter)
-    context.register_converter(XilinxFdriLogicMajor, XilinxFdriLogicMajorConverter)
+    for data_model_interface_name, converter_name in DEFAULT_XILINX_CONVERTERS:
+        context.register_converter_by_name(data_model_interface_name, converter_name)
     return context
 
 
 def register_defaults_context_analyzers(context):
-    context.register_analyzer(VisualizerAnalyzer, XilinxVisualizerAnalyzer)
-    context.register_analyzer(XilinxDeviceAnalyzer, XilinxDeviceAnalyzer)
-    context.register_analyzer(XilinxEncryptionAnalyzer, XilinxEncryptionAnalyzer)
+    for analyzer_interface_name, analyzer_name in DEFAULT_XILINX_ANALYZERS:
+        context.register_analyzer_by_name(analyzer_interface_name, analyzer_name)
     return context
 
 
 def register_defaults_context_modifiers(context):
-    context.register_modifier(XilinxPinModifer, XilinxPinModifer)
+    for modifier_interface_name, modifier_name in DEFAULT_XILINX_MODIFIERS:
+        context.register_modifier_by_name(modifier_interface_name, modifier_name)
     return context
 
 
 def default_xilinx_context(context):
+    """
+    Register the default converters, analyzers and modifiers. They are registered by name and
+    only imported when they are first used.
+
+    :param XilinxContextFactory context:
+    :rtype: XilinxContextFactory
+    """
     register_defaults_context_converters(context)
     register_defaults_context_analyzers(context)
     register_defaults_context_modifiers(context)
@@ -47,31 +82,56 @@ def default_xilinx_context(context):
     return context
 
 
-def default_xilinx_formats(format_builder):
+def get_default_xilinx_config_path(name):
     """
-    Load the default JSON config files for Xilinx fpgas.
-
-    :rtype: XilinxFormatBuilder
+    :param str name: The name of a default config file.
+    :rtype: str
     """
-    root_path = os.path.join(os.path.dirname(__file__), "configs")
+    return os.path.join(os.path.dirname(__file__), "configs", name)
+
+
+# The default config files and the builder methods loading them
+DEFAULT_XILINX_CONFIGS = [
     # Configure the register formats
-    format_builder.add_register_formats_json(os.path.join(root_path, "xilinx_registers.json"))
+    ("xilinx_registers.json", XilinxFormatBuilder.add_register_formats_json),
     # Configure the FDRI major formats
-    format_builder.add_fdri_major_formats_json(os.path.join(root_path, "xilinx_fdri_majors.json"))
+    ("xilinx_fdri_majors.json", XilinxFormatBuilder.add_fdri_major_formats_json),
     # Configure the style
-    format_builder.set_visualizer_config_json(os.path.join(root_path, "xilinx_visualization.json"))
+    ("xilinx_visualization.json", XilinxFormatBuilder.set_visualizer_config_json),
     # Configure the FDRI formats
     # LX9
-    format_builder.add_fdri_formats_json(os.path.join(root_path, "lx9_fdri.json"))
-    format_builder.add_fdri_logic_block_formats_json(
-        os.path.join(root_path, "lx9_fdri_logic_block.json")
-    )
-    format_builder.add_fdri_io_block_formats_json(
-        os.path.join(root_path, "lx9_fdri_io_block.json")
-    )
+    ("lx9_fdri.json", XilinxFormatBuilder.add_fdri_formats_json),
+    ("lx9_fdri_logic_block.json", XilinxFormatBuilder.add_fdri_logic_block_formats_json),
+    ("lx9_fdri_io_block.json", XilinxFormatBuilder.add_fdri_io_block_formats_json),
     # LX45t
-    format_builder.add_fdri_formats_json(os.path.join(root_path, "lx45t_fdri.json"))
-    format_builder.add_fdri_logic_block_formats_json(
-        os.path.join(root_path, "lx45t_fdri_logic_block.json")
-    )
+    ("lx45t_fdri.json", XilinxFormatBuilder.add_fdri_formats_json),
+    ("lx45t_fdri_logic_block.json", XilinxFormatBuilder.add_fdri_logic_block_formats_json),
+]
+
+
+def default_xilinx_formats(format_builder):
+    """
+    Load the default JSON config files for Xilinx fpgas.
+
+    :rtype: XilinxFormatBuilder
+    """
+    for name, add_config_json in DEFAULT_XILINX_CONFIGS:
+        add_config_json(format_builder, get_default_xilinx_config_path(name))
     return format_builder
+
+
+def default_xilinx_format(format_cache=None):
+    """
+    Get the format built from the default JSON config files. It is loaded from the compiled
+    format cache unless the config files changed since it was stored.
+
+    :param Optional[XilinxFormatCache] format_cache: The cache of compiled formats, the cache in
+        the default directory if None.
+    :rtype: XilinxFormat
+    """
+    if format_cache is None:
+        format_cache = XilinxFormatCache(get_default_format_cache_directory())
+    return format_cache.get_format(
+        [get_default_xilinx_config_path(name) for name, _ in DEFAULT_XILINX_CONFIGS],
+        lambda: default_xilinx_formats(XilinxFormatBuilder()).build()
+    )
@@ -0,0 +1,328 @@
+import binascii
+import re
+from collections import OrderedDict
+
+from typing import Dict, List, Optional, Tuple
+
+from bal_xilinx.converters import WORD_SIZE
+from bal_xilinx.converters.bitstream_packets_scanner import WRITE_OPCODE, \
+    XilinxPacketScanner, XilinxPacketTable
+from bal_xilinx.format import XilinxFdriFormat, XilinxFormat, XilinxRegisterFormat
+
+_NON_ZERO_BYTES_PATTERN = re.compile(b"[^\x00]+")
+
+
+def get_changed_ranges(old_bytes, new_bytes):
+    """
+    Find the words that differ between two buffers of the same size. The buffers are XORed as
+    big integers, the runs of non zero bytes of the result are the changed bytes. Both the XOR
+    and the search run over the whole buffers at once instead of word by word.
+
+    :param bytes old_bytes:
+    :param bytes new_bytes:
+    :rtype: List[Tuple[int, int]]
+    :return: The offset and size of each run of changed words, sorted.
+    """
+    if len(old_bytes) != len(new_bytes):
+        raise ValueError("Cannot compare {} bytes with {} bytes".format(
+            len(old_bytes),
+            len(new_bytes)
+        ))
+    if len(old_bytes) == 0 or old_bytes == new_bytes:
+        return []
+    size = len(old_bytes)
+    xor_value = int(binascii.hexlify(bytes(old_bytes)), 16) ^ \
+        int(binascii.hexlify(bytes(new_bytes)), 16)
+    xor_bytes = binascii.unhexlify("{:0{}x}".format(xor_value, size * 2))
+    ranges = []
+    for match in _NON_ZERO_BYTES_PATTERN.finditer(xor_bytes):
+        # Aligned to the words
+        start = match.start() - match.start() % WORD_SIZE
+        end = min(match.end() + (-match.end()) % WORD_SIZE, size)
+        if len(ranges) > 0 and ranges[-1][0] + ranges[-1][1] >= start:
+            ranges[-1] = (ranges[-1][0], end - ranges[-1][0])
+        else:
+            ranges.append((start, end - start))
+    return ranges
+
+
+class XilinxFrameDiff(object):
+    """
+    A changed frame of the logic block.
+
+    :ivar int index: The index of the frame in the frame table.
+    :ivar int row: The index of the row.
+    :ivar int major: The index of the major within the row.
+    :ivar int minor: The index of the frame within the major.
+    :ivar str major_name: The name of the major format.
+    :ivar Optional[str] description: The description of the frame, if it is documented.
+    :ivar int offset: The offset of the frame within the logic block.
+    :ivar int size: The size of the frame in bytes.
+    """
+    def __init__(self, index, row, major, minor, major_name, description, offset, size):
+        self.index = index
+        self.row = row
+        self.major = major
+        self.minor = minor
+        self.major_name = major_name
+        self.description = description
+        self.offset = offset
+        self.size = size
+
+    def __repr__(self):
+        return "XilinxFrameDiff(row={}, major={}, minor={}, major_name={})".format(
+            self.row,
+            self.major,
+            self.minor,
+            self.major_name
+        )
+
+
+class XilinxRegisterDiff(object):
+    """
+    A register write that differs between two bitstreams. The writes of a register are matched
+    by their order in the bitstreams: the n-th write of a register is compared with the n-th
+    write of the same register.
+
+    :ivar str register_name: The name of the register.
+    :ivar int index: The index of the write among the writes of the register.
+    :ivar Optional[bytes] old_payload: The payload in the old bitstream, None if the old
+        bitstream has fewer writes of the register.
+    :ivar Optional[bytes] new_payload: The payload in the new bitstream, None if the new
+        bitstream has fewer writes of the register.
+    :ivar Optional[Dict[str,int]] old_values: The decoded attributes of the old payload.
+    :ivar Optional[Dict[str,int]] new_values: The decoded attributes of the new payload.
+    """
+    def __init__(self, register_format, index, old_payload, new_payload):
+        self.register_name = register_format.name
+        self.index = index
+        self.old_payload = old_payload
+        self.new_payload = new_payload
+        self.old_values = self._decode(register_format, old_payload)
+        self.new_values = self._decode(register_format, new_payload)
+
+    @staticmethod
+    def _decode(register_format, payload):
+        """
+        :param XilinxRegisterFormat register_format:
+        :param Optional[bytes] payload:
+        :rtype: Optional[Dict[str,int]]
+        """
+        if payload is None or len(payload) != register_format.size:
+            return None
+        values = register_format.codec.decode(payload)
+        return OrderedDict([
+            (attribute.name, value)
+            for attribute, value in zip(register_format.attributes, values)
+        ])
+
+    def __repr__(self):
+        return "XilinxRegisterDiff({}[{}]: {} -> {})".format(
+            self.register_name,
+            self.index,
+            self.old_values if self.old_values is not None else self.old_payload,
+            self.new_values if self.new_values is not None else self.new_payload,
+        )
+
+
+class XilinxBitstreamDiff(object):
+    """
+    The differences between two bitstreams targeting the same device.
+
+    :ivar str device_name: The name of the device.
+    :ivar List[XilinxFrameDiff] frames: The changed frames of the logic block, in the order of
+        the logic block. It is empty if the device does not have a logic block format.
+    :ivar List[Tuple[int,int]] logic_ranges: The offset and size of the changed ranges of the
+        logic block.
+    :ivar List[Tuple[int,int]] bram_ranges: The offset and size of the changed ranges of the
+        bram block.
+    :ivar List[Tuple[int,int]] io_ranges: The offset and size of the changed ranges of the io
+        block.
+    :ivar List[str] pins: The names of the io pins whose bytes changed.
+    :ivar List[XilinxRegisterDiff] registers: The changed register writes, FDRI excluded.
+    """
+    def __init__(self, device_name):
+        self.device_name = device_name
+        self.frames = []  # type: List[XilinxFrameDiff]
+        self.logic_ranges = []  # type: List[Tuple[int, int]]
+        self.bram_ranges = []  # type: List[Tuple[int, int]]
+        self.io_ranges = []  # type: List[Tuple[int, int]]
+        self.pins = []  # type: List[str]
+        self.registers = []  # type: List[XilinxRegisterDiff]
+
+    def is_empty(self):
+        """
+        :rtype: bool
+        :return: True if the configuration data of the bitstreams is the same.
+        """
+        return len(self.logic_ranges) == 0 and len(self.bram_ranges) == 0 and \
+            len(self.io_ranges) == 0 and len(self.registers) == 0
+
+
+class XilinxBitstreamDiffer(object):
+    """
+    Compare the configuration packets of two bitstreams. The packets are scanned into packet
+    tables, no data object is created. The FDRI payloads are split into the logic, bram and io
+    blocks of the device format and each block is compared as a whole, then the changed ranges
+    of the logic block are mapped to frames through the frame table.
+
+    :param XilinxFormat bitstream_format: The Xilinx bitstream format configuration.
+    """
+    def __init__(self, bitstream_format):
+        self.format = bitstream_format
+        self._scanner = XilinxPacketScanner(bitstream_format)
+
+    def diff(self, device_name, old_packets_data, new_packets_data):
+        """
+        :param str device_name: The name of the device targeted by both bitstreams.
+        :param bytes old_packets_data: The packets data of the old bitstream, starting right
+            after the sync word.
+        :param bytes new_packets_data: The packets data of the new bitstream.
+        :rtype: XilinxBitstreamDiff
+        """
+        fdri_format = self.format.get_fdri_format(device_name)
+        if fdri_format is None:
+            raise ValueError("No FDRI format for the device {}".format(device_name))
+        old_table = self._scanner.scan(old_packets_data)
+        new_table = self._scanner.scan(new_packets_data)
+
+        bitstream_diff = XilinxBitstreamDiff(device_name)
+        bitstream_diff.registers = self._diff_registers(
+            old_table,
+            old_packets_data,
+            new_table,
+            new_packets_data
+        )
+        old_payload = self._get_fdri_payload(fdri_format, old_table, old_packets_data)
+        new_payload = self._get_fdri_payload(fdri_format, new_table, new_packets_data)
+
+        bram_block_offset = fdri_format.logic_block_size
+        io_block_offset = bram_block_offset + fdri_format.bram_block_size
+        crc_offset = io_block_offset + fdri_format.io_block_size
+        bitstream_diff.logic_ranges = get_changed_ranges(
+            old_payload[:bram_block_offset],
+            new_payload[:bram_block_offset]
+        )
+        bitstream_diff.bram_ranges = get_changed_ranges(
+            old_payload[bram_block_offset:io_block_offset],
+            new_payload[bram_block_offset:io_block_offset]
+        )
+        bitstream_diff.io_ranges = get_changed_ranges(
+            old_payload[io_block_offset:crc_offset],
+            new_payload[io_block_offset:crc_offset]
+        )
+        bitstream_diff.frames = self._get_changed_frames(fdri_format, bitstream_diff.logic_ranges)
+        bitstream_diff.pins = self._get_changed_pins(fdri_format, bitstream_diff.io_ranges)
+        return bitstream_diff
+
+    def _get_fdri_payload(self, fdri_format, table, packets_data):
+        """
+        :param XilinxFdriFormat fdri_format:
+        :param XilinxPacketTable table:
+        :param bytes packets_data:
+        :rtype: memoryview
+        """
+        fdri_index = table.get_fdri_packet_index(fdri_format.get_payload_size())
+        payload_start, payload_end = table.get_payload_span(fdri_index)
+        return memoryview(packets_data)[payload_start:payload_end]
+
+    def _get_register_writes(self, table, packets_data):
+        """
+        :param XilinxPacketTable table:
+        :param bytes packets_data:
+        :rtype: Dict[str,Tuple[XilinxRegisterFormat,List[bytes]]]
+        :return: The register format and the payloads of the writes of each register, in the
+            order of the first write.
+        """
+        writes = OrderedDict()
+        for index in range(len(table)):
+            register_format = table.register_formats[index]
+            if table.opcodes[index] != WRITE_OPCODE or table.payload_sizes[index] == 0 or \
+                    register_format.name == "Fdri":
+                continue
+            payload_start, payload_end = table.get_payload_span(index)
+            register_writes = writes.get(register_format.name)
+            if register_writes is None:
+                register_writes = (register_format, [])
+                writes[register_format.name] = register_writes
+            register_writes[1].append(bytes(packets_data[payload_start:payload_end]))
+        return writes
+
+    def _diff_registers(self, old_table, old_packets_data, new_table, new_packets_data):
+        """
+        :rtype: List[XilinxRegisterDiff]
+        """
+        old_writes = self._get_register_writes(old_table, old_packets_data)
+        new_writes = self._get_register_writes(new_table, new_packets_data)
+        register_names = list(old_writes) + [name for name in new_writes if name not in old_writes]
+        register_diffs = []
+        for register_name in register_names:
+            register_format, old_payloads = old_writes.get(register_name, (None, []))
+            new_register_format, new_payloads = new_writes.get(register_name, (None, []))
+            register_format = register_format or new_register_format
+            for index in range(max(len(old_payloads), len(new_payloads))):
+                old_payload = old_payloads[index] if index < len(old_payloads) else None
+                new_payload = new_payloads[index] if index < len(new_payloads) else None
+                if old_payload != new_payload:
+                    register_diffs.append(XilinxRegisterDiff(
+                        register_format,
+                        index,
+                        old_payload,
+                        new_payload
+                    ))
+        return register_diffs
+
+    def _get_changed_frames(self, fdri_format, logic_ranges):
+        """
+        :param XilinxFdriFormat fdri_format:
+        :param List[Tuple[int,int]] logic_ranges:
+        :rtype: List[XilinxFrameDiff]
+        """
+        frame_table = fdri_format.frame_table
+        if frame_table is None:
+            return []
+        frame_indexes = []
+        for offset, size in logic_ranges:
+            first_index = frame_table.get_frame_index_by_offset(offset)
+            last_index = frame_table.get_frame_index_by_offset(offset + size - 1)
+            if len(frame_indexes) > 0 and frame_indexes[-1] >= first_index:
+                first_index = frame_indexes[-1] + 1
+            frame_indexes.extend(range(first_index, last_index + 1))
+
+        frames = []
+        for index in frame_indexes:
+            row, major, minor = frame_table.get_frame_coordinates(index)
+            major_format = frame_table.major_formats[index]
+            if minor < len(major_format.frame_descriptions):
+                description = major_format.frame_descriptions[minor]
+            else:
+                description = None
+            frames.append(XilinxFrameDiff(
+                index,
+                row,
+                major,
+                minor,
+                major_format.name,
+                description,
+                frame_table.offsets[index],
+                frame_table.sizes[index],
+            ))
+        return frames
+
+    def _get_changed_pins(self, fdri_format, io_ranges):
+        """
+        :param XilinxFdriFormat fdri_format:
+        :param List[Tuple[int,int]] io_ranges:
+        :rtype: List[str]
+        """
+        if fdri_format.io_block_format is None or len(io_ranges) == 0:
+            return []
+        return [
+            pin_format.name
+            for pin_format in fdri_format.io_block_format
+            if any(
+                offset < pin_format.offset + len(pin_format.on_value) and
+                pin_format.offset < offset + size
+                for offset, size in io_ranges
+            )
+        ]
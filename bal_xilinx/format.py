@@ -1,12 +1,17 @@
+import binascii
+import bisect
 import ctypes
-import json
 import struct
+from array import array
 from collections import OrderedDict
 
-from typing import List
+from typing import List, Optional, Type
 
 import six
 
+from bal_xilinx.data_model import XilinxType1Payload, XilinxType1PayloadAttribute, \
+    XilinxFdriLogicMajor, XilinxFdriLogicFrame
+
 
 def hex_to_bytes(hex):
     """
@@ -21,6 +26,34 @@ def hex_to_bytes(hex):
         return bytes.fromhex(hex)
 
 
+def load_json(path):
+    """
+    Load a JSON config file. The json module is only imported when the format is built from the
+    config files, not when it is loaded from the compiled format cache.
+
+    :param str path:
+    :rtype: Any
+    """
+    import json
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def create_model_class(class_name, BaseModel, description):
+    """
+    Create a model class documented with the provided description. The classes are created
+    once per format, on first use, so that the converters do not create a class per data object.
+
+    :param str class_name: The name of the class.
+    :param Type[DataModel] BaseModel: The class to inherit from.
+    :param Optional[str] description: The docstring of the class.
+    :rtype: Type[DataModel]
+    """
+    Model = type(str(class_name), (BaseModel,), {})
+    Model.__doc__ = description
+    return Model
+
+
 class XilinxAttributeValueDocumentation:
     """
     Defines the documentation for a specific value of a register attribute.
@@ -79,87 +112,180 @@ class XilinxRegisterAttributeFormat:
         """
         return self._value_config_by_value.get(value)
 
+    def get_documented_values(self):
+        """
+        Get the values of the attribute that are documented, sorted.
 
-class XilinxRegisterFormatCtypeLE(ctypes.Union):
-    _fields_ = []
+        :rtype: List[int]
+        """
+        return sorted(self._value_config_by_value)
 
-    def __init__(self, raw_bytes):
-        if len(raw_bytes) == 2:
-            struct_flag = ">H"
-        elif len(raw_bytes) == 4:
-            struct_flag = ">I"
-        else:
-            raise RuntimeError(
-                "XilinxRegisterFormatCtypeLE currently only supports 2 and 4 byte structures"
+    def get_value_by_name(self, name):
+        """
+        Get the value of the attribute documented with the provided name
+
+        :param str name: The name of the value
+        :rtype: Optional[int]
+        """
+        for value_config in self._value_config_by_value.values():
+            if value_config.name == name:
+                return value_config.value
+        return None
+
+
+class XilinxRegisterCodec(object):
+    """
+    Decode and encode the attributes of a register payload. The payload is read as a single
+    big endian integer and each attribute is extracted with a shift and a mask computed once
+    from the attributes bit sizes. The first attribute is made of the most significant bits.
+
+    :param List[int] bit_sizes: The bit size of each attribute, in order.
+
+    :ivar int bit_size: The aggregate bit size of the attributes.
+    :ivar int size: The size of an encoded payload in bytes.
+    """
+    _STRUCT_FORMATS = {
+        1: ">B",
+        2: ">H",
+        4: ">I",
+        8: ">Q",
+    }
+
+    def __init__(self, bit_sizes):
+        self.bit_size = sum(bit_sizes)
+        self.size = int((self.bit_size + 7) / 8)
+        self._struct_format = self._STRUCT_FORMATS.get(self.size)
+        self._shifts = []
+        self._masks = []
+        shift = self.size * 8
+        for bit_size in bit_sizes:
+            shift -= bit_size
+            self._shifts.append(shift)
+            self._masks.append((1 << bit_size) - 1)
+        self._fields = list(zip(self._shifts, self._masks))
+
+    def _to_int(self, data_bytes):
+        if self._struct_format is not None:
+            return struct.unpack_from(self._struct_format, data_bytes)[0]
+        return int(binascii.hexlify(bytes(data_bytes[:self.size])) or b"0", 16)
+
+    def _from_int(self, value):
+        if self._struct_format is not None:
+            return struct.pack(self._struct_format, value)
+        return binascii.unhexlify("{:0{}x}".format(value, self.size * 2))
+
+    def decode(self, data_bytes):
+        """
+        Decode the attributes of a single payload. Extra bytes after the payload are ignored.
+
+        :param bytes data_bytes: The payload.
+        :rtype: Tuple[int, ...]
+        """
+        if len(data_bytes) < self.size:
+            raise ValueError(
+                "The payload size ({}) is smaller than the register size ({})".format(
+                    len(data_bytes),
+                    self.size
+                )
             )
-        self.binary_data = struct.unpack(struct_flag, raw_bytes)[0]
+        if self.size == 0:
+            return tuple()
+        value = self._to_int(data_bytes)
+        return tuple([(value >> shift) & mask for shift, mask in self._fields])
+
+    def encode(self, *values):
+        """
+        Encode the attributes values of a single payload.
+
+        :param int values: The value of each attribute, in order.
+        :rtype: bytes
+        """
+        if len(values) != len(self._fields):
+            raise ValueError(
+                "Expected {} attribute values, got {}".format(len(self._fields), len(values))
+            )
+        value = 0
+        for attribute_value, (shift, mask) in zip(values, self._fields):
+            if attribute_value < 0 or attribute_value > mask:
+                raise ValueError(
+                    "The attribute value {} does not fit in {} bits".format(
+                        attribute_value,
+                        mask.bit_length()
+                    )
+                )
+            value |= attribute_value << shift
+        if self.size == 0:
+            return b""
+        return self._from_int(value)
+
+    def decode_many(self, data_bytes):
+        """
+        Decode the attributes of many payloads of the same register at once.
+
+        :param bytes|List[bytes] data_bytes: The payloads, either concatenated in a single
+            buffer or as a list.
+        :rtype: List[array]
+        :return: An array of values for each attribute. The n-th item of an array is the value
+            of the attribute for the n-th payload.
+        """
+        if isinstance(data_bytes, (list, tuple)):
+            data_bytes = b"".join(data_bytes)
+        if self.size == 0:
+            return [array("L") for _ in self._fields]
+        if len(data_bytes) % self.size != 0:
+            raise ValueError(
+                "The data size ({}) is not a multiple of the register size ({})".format(
+                    len(data_bytes),
+                    self.size
+                )
+            )
+        count = int(len(data_bytes) / self.size)
+        if self._struct_format is not None:
+            values = struct.unpack(
+                ">{}{}".format(count, self._struct_format[1]),
+                data_bytes
+            )
+        else:
+            values = [
+                self._to_int(data_bytes[i * self.size:(i + 1) * self.size])
+                for i in range(count)
+            ]
+        return [
+            array("L", [(value >> shift) & mask for value in values])
+            for shift, mask in self._fields
+        ]
 
 
 class XilinxRegisterFormatCtype(object):
-    def __init__(self, class_name, fields, values=None):
+    """
+    Kept for backward compatibility, use :py:class:`XilinxRegisterCodec` instead. The
+    encoded bytes are padded to a multiple of 4 bytes like the ctypes structure it replaces.
+
+    :param str class_name: The name of the register.
+    :param List[Tuple[str,Any,int]] fields: The name, ctype and bit size of each attribute.
+    :param Optional[List[int]] values: The decoded attribute values.
+    """
+    def __init__(self, class_name, fields, values=None, codec=None):
         self.class_name = class_name
         self.fields = fields
         self.values = values
-        if six.PY2:
-            bit_size = sum([bit_size for _, _, bit_size in fields])
-            if bit_size <= 16:
-                binary_data_type = ctypes.c_uint16
-            elif bit_size == 32:
-                binary_data_type = ctypes.c_uint32
-            else:
-                raise RuntimeError("XilinxRegisterFormatCtype bit size not supported")
-            self.bits = type("{}Bits".format(str(class_name)), (ctypes.LittleEndianStructure, ), {
-                "_pack_": 1,
-                "_fields_": fields[::-1]
-            })
-
-            self.ctype = type(str(class_name), (XilinxRegisterFormatCtypeLE, ), {
-                "_fields_": [
-                    ("bits", self.bits),
-                    ("binary_data", binary_data_type)
-                ]
-            })
-        if six.PY3:
-            self.ctype = type(str(class_name), (ctypes.BigEndianStructure, ), {
-                "_pack_": 1,
-                "_fields_": fields
-            })
+        if codec is None:
+            codec = XilinxRegisterCodec([bit_size for _, _, bit_size in fields])
+        self.codec = codec
 
     def get_bytes(self, *values):
         # type: (*int) -> bytes
-
-        if six.PY3:
-            ctype_instance = self.ctype(*values)
-            return bytearray(bytes(ctype_instance))
-        elif six.PY2:
-            reversed_values = values[::-1]
-            ctype_instance = self.bits(*reversed_values)
-            num_packed_bytes = sum([bit_size for _, _, bit_size in self.fields]) / 8
-            out_of_order_bytes = bytes(bytearray(ctype_instance))
-            bytes_to_reverse = out_of_order_bytes[:num_packed_bytes]
-            reversed_bytes = b"".join(
-                [byte_to_reverse for byte_to_reverse in bytes_to_reverse][::-1]
-            )
-            return b"".join([reversed_bytes, out_of_order_bytes[num_packed_bytes:]])
-        else:
-            raise RuntimeError
+        raw_bytes = self.codec.encode(*values)
+        return raw_bytes + b"\x00" * (-len(raw_bytes) % 4)
 
     def from_buffer_copy(self, raw_bytes):
         # type: (bytes) -> XilinxRegisterFormatCtype
-        if six.PY3:
-            ctype_instance = self.ctype.from_buffer_copy(raw_bytes)
-            values = []
-            for field_name, _, _ in self.fields:
-                values.append(ctype_instance.__getattribute__(field_name))
-        elif six.PY2:
-            num_packed_bytes = sum([bit_size for _, _, bit_size in self.fields]) / 8
-            ctype_instance = self.ctype(raw_bytes[:num_packed_bytes])
-            values = []
-            for field_name, _, _ in self.fields:
-                values.append(ctype_instance.bits.__getattribute__(field_name))
-        else:
-            raise RuntimeError
-        return XilinxRegisterFormatCtype(self.class_name, self.fields, values)
+        return XilinxRegisterFormatCtype(
+            self.class_name,
+            self.fields,
+            list(self.codec.decode(raw_bytes)),
+            self.codec
+        )
 
 
 class XilinxRegisterFormat:
@@ -178,8 +304,12 @@ class XilinxRegisterFormat:
     :ivar List[XilinxRegisterAttributeFormat] attributes: The attributes to parse in
         a packet's data.
     :ivar int size: Ths aggregate bit size of the register payload attributes.
-    :ivar ctype ctype: A ctype class definition configured to match the register payload
-        attributes.
+    :ivar XilinxRegisterCodec codec: The codec for the register payload attributes.
+    :ivar XilinxRegisterFormatCtype ctype: Kept for backward compatibility, use `codec`
+        instead.
+    :ivar Type[XilinxType1Payload] payload_model: The model class for the register payload.
+    :ivar List[Type[XilinxType1PayloadAttribute]] attribute_models: The model class for each
+        attribute of the register payload.
     """
     def __init__(
         self,
@@ -198,12 +328,49 @@ class XilinxRegisterFormat:
             raise ValueError("The bit size of the register config should be a multiple of 8")
         self.size = int(bit_size / 8)
 
+        self.codec = XilinxRegisterCodec([attr.bit_size for attr in self.attributes])
         class_name = "".join([p.title() for p in self.name.split("_")])
         fields = [
             (attr.name.lower(), ctypes.c_uint32, attr.bit_size)
             for attr in self.attributes
         ]
-        self.ctype = XilinxRegisterFormatCtype(str(class_name), fields)
+        self.ctype = XilinxRegisterFormatCtype(str(class_name), fields, codec=self.codec)
+        self._payload_model = None  # type: Optional[Type[XilinxType1Payload]]
+        self._attribute_models = None  # type: Optional[List[Type[XilinxType1PayloadAttribute]]]
+
+    def __getstate__(self):
+        # The model classes are created at runtime and cannot be pickled
+        state = self.__dict__.copy()
+        state["_payload_model"] = None
+        state["_attribute_models"] = None
+        return state
+
+    @property
+    def payload_model(self):
+        if self._payload_model is None:
+            self._create_models()
+        return self._payload_model
+
+    @property
+    def attribute_models(self):
+        if self._attribute_models is None:
+            self._create_models()
+        return self._attribute_models
+
+    def _create_models(self):
+        self._payload_model = create_model_class(
+            "Xilinx{}Payload".format(self.name),
+            XilinxType1Payload,
+            self.description,
+        )
+        self._attribute_models = [
+            create_model_class(
+                "".join([p.title() for p in attr.name.lower().split("_")]) + "Value",
+                XilinxType1PayloadAttribute,
+                attr.description,
+            )
+            for attr in self.attributes
+        ]
 
 
 class XilinxFdriMajorFormat:
@@ -221,6 +388,9 @@ class XilinxFdriMajorFormat:
     :ivar int frame_count: The number of frames making up the major.
     :ivar List[str] frame_descriptions: A description of each frame. The length of the list is
         expected to match the `frame_count` property.
+    :ivar Type[XilinxFdriLogicMajor] major_model: The model class for the major.
+    :ivar List[Type[XilinxFdriLogicFrame]] frame_models: The model class for each frame of
+        the major.
     """
     def __init__(
             self,
@@ -233,6 +403,53 @@ class XilinxFdriMajorFormat:
         self.frame_size = frame_size
         self.frame_count = frame_count
         self.frame_descriptions = frame_descriptions
+        self._major_model = None  # type: Optional[Type[XilinxFdriLogicMajor]]
+        self._frame_models = None  # type: Optional[List[Type[XilinxFdriLogicFrame]]]
+
+    def __getstate__(self):
+        # The model classes are created at runtime and cannot be pickled
+        state = self.__dict__.copy()
+        state["_major_model"] = None
+        state["_frame_models"] = None
+        return state
+
+    @property
+    def major_model(self):
+        if self._major_model is None:
+            self._create_models()
+        return self._major_model
+
+    @property
+    def frame_models(self):
+        if self._frame_models is None:
+            self._create_models()
+        return self._frame_models
+
+    def _create_models(self):
+        self._major_model = create_model_class(
+            "".join([p.title() for p in self.name.split("_")]),
+            XilinxFdriLogicMajor,
+            "The config data for a {} major".format(self.name),
+        )
+        undocumented_frame_model = None
+        frame_models = []
+        for frame_index in range(self.frame_count):
+            if frame_index < len(self.frame_descriptions):
+                frame_model = create_model_class(
+                    "XilinxFdriLogicFrame",
+                    XilinxFdriLogicFrame,
+                    self.frame_descriptions[frame_index],
+                )
+            else:
+                if undocumented_frame_model is None:
+                    undocumented_frame_model = create_model_class(
+                        "XilinxFdriLogicFrame",
+                        XilinxFdriLogicFrame,
+                        None,
+                    )
+                frame_model = undocumented_frame_model
+            frame_models.append(frame_model)
+        self._frame_models = frame_models
 
 
 class XilinxFdriPinFormat:
@@ -262,6 +479,88 @@ class XilinxFdriPinFormat:
         self.off_value = hex_to_bytes(off_value)
 
 
+class XilinxFdriFrameTable(object):
+    """
+    A flat index of the frames of an FDRI logic block. The frames are listed in the order in
+    which they appear in the logic block, each frame is a row spread across arrays of native
+    integers.
+
+    :param List[List[XilinxFdriMajorFormat]] logic_block_format: A matrix of Major formats.
+
+    :ivar array rows: The row index of each frame.
+    :ivar array majors: The index of the major of each frame within its row.
+    :ivar array minors: The index of each frame within its major (ie the minor address).
+    :ivar array offsets: The offset of each frame within the logic block.
+    :ivar array sizes: The size of each frame in bytes.
+    :ivar List[XilinxFdriMajorFormat] major_formats: The major format of each frame.
+    :ivar int frame_size: The size of the largest frame in bytes.
+    :ivar int size: The size of the logic block in bytes.
+    """
+    def __init__(self, logic_block_format):
+        self.rows = array("H")
+        self.majors = array("H")
+        self.minors = array("H")
+        self.offsets = array("L")
+        self.sizes = array("L")
+        self.major_formats = []  # type: List[XilinxFdriMajorFormat]
+        self._indexes_by_major = {}
+
+        offset = 0
+        for row_index, row_format in enumerate(logic_block_format):
+            for major_index, major_format in enumerate(row_format):
+                self._indexes_by_major[(row_index, major_index)] = len(self.offsets)
+                for minor_index in range(major_format.frame_count):
+                    self.rows.append(row_index)
+                    self.majors.append(major_index)
+                    self.minors.append(minor_index)
+                    self.offsets.append(offset)
+                    self.sizes.append(major_format.frame_size)
+                    self.major_formats.append(major_format)
+                    offset += major_format.frame_size
+        self.frame_size = max(self.sizes) if len(self.sizes) > 0 else 0
+        self.size = offset
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def get_frame_index(self, row, major, minor):
+        """
+        Get the index of a frame from its coordinates.
+
+        :param int row: The index of the row.
+        :param int major: The index of the major within the row.
+        :param int minor: The index of the frame within the major.
+        :rtype: int
+        :raises ValueError: If no frame exists at the provided coordinates.
+        """
+        first_index = self._indexes_by_major.get((row, major))
+        if first_index is None or not \
+                0 <= minor < self.major_formats[first_index].frame_count:
+            raise ValueError("No frame at row {}, major {}, minor {}".format(row, major, minor))
+        return first_index + minor
+
+    def get_frame_coordinates(self, index):
+        """
+        Get the row, major and minor coordinates of a frame.
+
+        :param int index: The index of the frame.
+        :rtype: Tuple[int, int, int]
+        """
+        return self.rows[index], self.majors[index], self.minors[index]
+
+    def get_frame_index_by_offset(self, offset):
+        """
+        Get the index of the frame containing a byte of the logic block.
+
+        :param int offset: The offset of the byte within the logic block.
+        :rtype: int
+        :raises ValueError: If the offset is outside of the logic block.
+        """
+        if not 0 <= offset < self.size:
+            raise ValueError("The offset {} is outside of the logic block".format(offset))
+        return bisect.bisect_right(self.offsets, offset) - 1
+
+
 class XilinxFdriFormat:
     """
     Defines the format of an FDRI register payload for a specific type of FPGA.
@@ -283,6 +582,8 @@ class XilinxFdriFormat:
     :ivar int crc_size: The size of the CRC checksum in bytes.
     :ivar Optional[List[List[XilinxFdriMajorFormat]]Optional[ logic_block_format: A matrix of Major
         formats.
+    :ivar Optional[List[XilinxFdriPinFormat]] io_block_format: The pin formats of the io block.
+    :ivar Optional[XilinxFdriFrameTable] frame_table: The frames of the logic block.
     """
     def __init__(
             self,
@@ -300,6 +601,11 @@ class XilinxFdriFormat:
         self.io_block_size = io_block_size
         self.crc_size = crc_size
         self.logic_block_format = logic_block_format
+        self.io_block_format = io_block_format
+        if logic_block_format is None:
+            self.frame_table = None
+        else:
+            self.frame_table = XilinxFdriFrameTable(logic_block_format)
         if io_block_format is None:
             self._io_pin_by_name = {}
         else:
@@ -314,6 +620,15 @@ class XilinxFdriFormat:
         """
         return self._io_pin_by_name.get(name)
 
+    def get_payload_size(self):
+        """
+        Get the size of the FDRI payload writing the whole device: the logic, bram and io blocks
+        and the CRC.
+
+        :rtype: int
+        """
+        return self.logic_block_size + self.bram_block_size + self.io_block_size + self.crc_size
+
 
 class XilinxFormat:
     """
@@ -336,6 +651,14 @@ class XilinxFormat:
         self.visualizer_style = visualizer_style
         self.sync_word = hex_to_bytes(sync_word)
 
+    def get_device_names(self):
+        """
+        Get the names of the devices that have an FDRI format, sorted.
+
+        :rtype: List[str]
+        """
+        return sorted(self._fdri_format_by_device)
+
     def get_fdri_format(self, device_name):
         """
         Lookup the FDRI format for the provided device name
@@ -399,28 +722,22 @@ class XilinxFormatBuilder:
         self._fdri_major_formats.extend(major_formats)
 
     def set_visualizer_config_json(self, path):
-        with open(path, "r") as f:
-            return self.set_visualizer_config(json.load(f))
+        return self.set_visualizer_config(load_json(path))
 
     def add_fdri_logic_block_formats_json(self, path):
-        with open(path, "r") as f:
-            return self.add_fdri_logic_block_formats(json.load(f))
+        return self.add_fdri_logic_block_formats(load_json(path))
 
     def add_fdri_io_block_formats_json(self, path):
-        with open(path, "r") as f:
-            return self.add_fdri_io_block_formats(json.load(f))
+        return self.add_fdri_io_block_formats(load_json(path))
 
     def add_register_formats_json(self, path):
-        with open(path, "r") as f:
-            return self.add_register_formats(json.load(f))
+        return self.add_register_formats(load_json(path))
 
     def add_fdri_formats_json(self, path):
-        with open(path, "r") as f:
-            return self.add_fdri_formats(json.load(f))
+        return self.add_fdri_formats(load_json(path))
 
     def add_fdri_major_formats_json(self, path):
-        with open(path, "r") as f:
-            return self.add_fdri_major_formats(json.load(f))
+        return self.add_fdri_major_formats(load_json(path))
 
     def _create_register_attribute_value_format(self, value_format):
         if not isinstance(value_format, dict):
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import sys
+
+from six.moves import cPickle as pickle
+from typing import Callable, List, Optional
+
+from bal_xilinx import __version__
+from bal_xilinx.format import XilinxFormat
+
+# Bump when the pickled layout of the format classes changes
+FORMAT_CACHE_VERSION = 2
+FORMAT_CACHE_DIRECTORY_ENV = "BAL_XILINX_CACHE_DIR"
+FORMAT_CACHE_FILE_PREFIX = "xilinx_format_"
+FORMAT_CACHE_FILE_SUFFIX = ".pickle"
+
+
+def get_default_format_cache_directory():
+    """
+    Get the directory of the compiled format cache. It is set by the `BAL_XILINX_CACHE_DIR`
+    environment variable, an empty value disables the cache. It defaults to
+    `~/.cache/bal_xilinx`.
+
+    :rtype: Optional[str]
+    """
+    directory = os.environ.get(FORMAT_CACHE_DIRECTORY_ENV)
+    if directory is None:
+        return os.path.join(os.path.expanduser("~"), ".cache", "bal_xilinx")
+    if directory == "":
+        return None
+    return directory
+
+
+class XilinxFormatCache(object):
+    """
+    A cache of compiled Xilinx formats. A compiled format is a pickled snapshot of a built
+    :py:class:`XilinxFormat`, keyed by a hash of the JSON config files it was built from and of
+    the package version. It is loaded with a single read instead of parsing the config files and
+    building the format again. A snapshot is rebuilt as soon as one of the config files or the
+    package changes, the outdated snapshots are removed when the new one is stored.
+
+    :param Optional[str] directory: The directory holding the compiled formats. The cache is
+        disabled if None.
+    """
+    def __init__(self, directory=None):
+        self.directory = directory
+
+    def get_key(self, config_paths):
+        """
+        Compute the key of the format built from the provided config files.
+
+        :param List[str] config_paths: The paths of the JSON config files.
+        :rtype: str
+        """
+        key_hash = hashlib.sha1()
+        key_hash.update("{}:{}:{}:{}".format(
+            FORMAT_CACHE_VERSION,
+            __version__,
+            sys.version_info[0],
+            sys.version_info[1],
+        ).encode("ascii"))
+        for config_path in config_paths:
+            with open(config_path, "rb") as f:
+                config_data = f.read()
+            key_hash.update(os.path.basename(config_path).encode("utf-8"))
+            key_hash.update(hashlib.sha1(config_data).digest())
+        return key_hash.hexdigest()
+
+    def get_path(self, key):
+        """
+        :param str key: See :py:meth:`get_key`
+        :rtype: str
+        :return: The path of the compiled format.
+        """
+        return os.path.join(
+            self.directory,
+            "{}{}{}".format(FORMAT_CACHE_FILE_PREFIX, key, FORMAT_CACHE_FILE_SUFFIX)
+        )
+
+    def load(self, key):
+        """
+        Load a compiled format.
+
+        :param str key: See :py:meth:`get_key`
+        :rtype: Optional[XilinxFormat]
+        :return: The format or None if it is not in the cache or it cannot be loaded.
+        """
+        if self.directory is None:
+            return None
+        try:
+            with open(self.get_path(key), "rb") as f:
+                xilinx_format = pickle.loads(f.read())
+        except Exception:
+            return None
+        if not isinstance(xilinx_format, XilinxFormat):
+            return None
+        return xilinx_format
+
+    def store(self, key, xilinx_format):
+        """
+        Store a compiled format. The file is replaced atomically so that concurrent processes
+        never load a partial format. The other compiled formats of the directory are removed,
+        they were built from outdated config files or by another version of the package. Failing
+        to write the cache is not an error.
+
+        :param str key: See :py:meth:`get_key`
+        :param XilinxFormat xilinx_format: The built format.
+        :rtype: bool
+        :return: True if the format was stored.
+        """
+        if self.directory is None:
+            return False
+        # Only imported when the cache is written
+        import tempfile
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "wb") as f:
+                    f.write(pickle.dumps(xilinx_format, pickle.HIGHEST_PROTOCOL))
+                os.rename(temp_path, self.get_path(key))
+            except Exception:
+                os.remove(temp_path)
+                raise
+        except (IOError, OSError):
+            return False
+        self._remove_outdated(key)
+        return True
+
+    def _remove_outdated(self, key):
+        """
+        :param str key: The key of the compiled format to keep.
+        """
+        path = self.get_path(key)
+        try:
+            file_names = os.listdir(self.directory)
+        except OSError:
+            return
+        for file_name in file_names:
+            file_path = os.path.join(self.directory, file_name)
+            if not file_name.startswith(FORMAT_CACHE_FILE_PREFIX) or \
+                    not file_name.endswith(FORMAT_CACHE_FILE_SUFFIX) or file_path == path:
+                continue
+            try:
+                os.remove(file_path)
+            except OSError:
+                # Another process may have removed it already
+                pass
+
+    def get_format(self, config_paths, build_format):
+        """
+        Load the compiled format of the provided config files, building and storing it if it is
+        not in the cache.
+
+        :param List[str] config_paths: The paths of the JSON config files.
+        :param Callable[[],XilinxFormat] build_format: Builds the format from the config files.
+        :rtype: XilinxFormat
+        """
+        if self.directory is None:
+            return build_format()
+        key = self.get_key(config_paths)
+        xilinx_format = self.load(key)
+        if xilinx_format is None:
+            xilinx_format = build_format()
+            self.store(key, xilinx_format)
+        return xilinx_format
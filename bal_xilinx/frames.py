@@ -0,0 +1,403 @@
+import itertools
+from array import array
+from collections import namedtuple
+
+from typing import Dict, Iterator, Optional, Tuple
+
+from bal.data_object import DataObject
+from bal_xilinx.context import XilinxContext
+from bal_xilinx.data_model import XilinxFdriPayload, XilinxFdriLogicBlock
+from bal_xilinx.format import XilinxFdriFormat, XilinxFdriFrameTable
+
+# The block types of the frame addresses
+BLOCK_TYPE_LOGIC = 0
+BLOCK_TYPE_BRAM = 1
+BLOCK_TYPE_IO = 2
+BLOCK_TYPE_NAMES = {
+    BLOCK_TYPE_LOGIC: "logic",
+    BLOCK_TYPE_BRAM: "bram",
+    BLOCK_TYPE_IO: "io",
+}
+
+XilinxFrameAddress = namedtuple("XilinxFrameAddress", ["block_type", "row", "major", "minor"])
+
+
+def get_frame_address(far_values):
+    """
+    Build a frame address from the decoded attributes of the FAR register writes.
+
+    :param Dict[str,int] far_values: The attribute values of the FarMaj and FarMin writes (or of
+        a FarMajExtended write) by lower case attribute name. The missing attributes are 0.
+    :rtype: XilinxFrameAddress
+    """
+    return XilinxFrameAddress(
+        far_values.get("blk", 0),
+        far_values.get("row", 0),
+        far_values.get("major", 0),
+        far_values.get("minor", 0),
+    )
+
+
+class XilinxFdriFrameMatrix(object):
+    """
+    A view of an FDRI logic block as a matrix of bytes. Each row of the matrix is a frame of the
+    frame table, so that the rows stay aligned with the frames. The rows are `frame_size` bytes
+    long: the padding frames, which are shorter, are read as padded with zero bytes and only
+    their own bytes are written.
+
+    The logic block bytes are only copied on the first write. The copy is then installed as the
+    bytes of the logic block data object, which marks the FDRI payload as out of sync. Further
+    writes are applied to the copy in place.
+
+    :param XilinxContext context: The configured xilinx context.
+    :param XilinxFdriPayload fdri_payload: The unpacked FDRI payload holding the logic block.
+    :param XilinxFdriFrameTable frame_table: The frames of the logic block.
+
+    :ivar XilinxFdriFrameTable frame_table: The frames of the logic block.
+    :ivar int frame_size: The size of a row of the matrix in bytes, ie the size of the largest
+        frame.
+    """
+    def __init__(self, context, fdri_payload, frame_table):
+        self.context = context
+        self.frame_table = frame_table
+        self.frame_size = frame_table.frame_size
+        self._fdri_payload = fdri_payload
+        self._buffer = None  # type: Optional[bytearray]
+
+        logic_block_object = fdri_payload.get_logic_block()
+        logic_block_object.synchronize()
+        self._data = logic_block_object.pack()
+        if len(self._data) != frame_table.size:
+            raise ValueError(
+                "The logic block size ({}) does not match the size of its frames ({})".format(
+                    len(self._data),
+                    frame_table.size
+                )
+            )
+
+    def __len__(self):
+        return len(self.frame_table)
+
+    def get_bytes(self):
+        """
+        Get the bytes of the whole logic block, modifications included.
+
+        :rtype: bytes
+        """
+        return self._data
+
+    def get_row(self, index):
+        """
+        Get a row of the matrix.
+
+        :param int index: The index of the row.
+        :rtype: bytes
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("The matrix row index {} is out of range".format(index))
+        frame = self.get_frame(index)
+        if len(frame) == self.frame_size:
+            return frame
+        return bytes(frame) + b"\x00" * (self.frame_size - len(frame))
+
+    def get_column(self, index):
+        """
+        Get a column of the matrix, ie the byte at the same position in every row. The rows of
+        the padding frames that are too short hold a zero byte.
+
+        :param int index: The index of the column.
+        :rtype: bytes
+        """
+        if not 0 <= index < self.frame_size:
+            raise IndexError("The matrix column index {} is out of range".format(index))
+        column = bytearray(len(self))
+        sizes = self.frame_table.sizes
+        offsets = self.frame_table.offsets
+        for row_index in range(len(self)):
+            if index < sizes[row_index]:
+                column[row_index] = self._data[offsets[row_index] + index]
+        return bytes(column)
+
+    def get_frame(self, index):
+        """
+        Get the bytes of a frame.
+
+        :param int index: The index of the frame in the frame table.
+        :rtype: bytes
+        """
+        offset = self.frame_table.offsets[index]
+        return self._data[offset:offset + self.frame_table.sizes[index]]
+
+    def set_row(self, index, data_bytes):
+        """
+        Overwrite a row of the matrix. The bytes past the end of a padding frame must be zero.
+
+        :param int index: The index of the row.
+        :param bytes data_bytes: The new bytes of the row.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("The matrix row index {} is out of range".format(index))
+        if len(data_bytes) != self.frame_size:
+            raise ValueError(
+                "Expected {} bytes for a matrix row, got {}".format(
+                    self.frame_size,
+                    len(data_bytes)
+                )
+            )
+        frame_size = self.frame_table.sizes[index]
+        if data_bytes[frame_size:].count(b"\x00") != self.frame_size - frame_size:
+            raise ValueError(
+                "The bytes of row {} past the end of its frame ({}) must be zero".format(
+                    index,
+                    frame_size
+                )
+            )
+        self.write(self.frame_table.offsets[index], data_bytes[:frame_size])
+
+    def set_column(self, index, data_bytes):
+        """
+        Overwrite a column of the matrix. The bytes of the rows of the padding frames that are
+        too short are ignored.
+
+        :param int index: The index of the column.
+        :param bytes data_bytes: The new bytes of the column, one per row.
+        """
+        if not 0 <= index < self.frame_size:
+            raise IndexError("The matrix column index {} is out of range".format(index))
+        if len(data_bytes) != len(self):
+            raise ValueError(
+                "Expected {} bytes for a matrix column, got {}".format(len(self), len(data_bytes))
+            )
+        data_bytes = bytearray(data_bytes)
+        buffer = self._get_buffer()
+        sizes = self.frame_table.sizes
+        offsets = self.frame_table.offsets
+        for row_index in range(len(self)):
+            if index < sizes[row_index]:
+                buffer[offsets[row_index] + index] = data_bytes[row_index]
+
+    def set_frame(self, index, data_bytes):
+        """
+        Overwrite a frame.
+
+        :param int index: The index of the frame in the frame table.
+        :param bytes data_bytes: The new bytes of the frame.
+        """
+        if len(data_bytes) != self.frame_table.sizes[index]:
+            raise ValueError(
+                "Expected {} bytes for frame {}, got {}".format(
+                    self.frame_table.sizes[index],
+                    index,
+                    len(data_bytes)
+                )
+            )
+        self.write(self.frame_table.offsets[index], data_bytes)
+
+    def write(self, offset, data_bytes):
+        """
+        Overwrite bytes of the logic block.
+
+        :param int offset: The offset of the first byte to overwrite in the logic block.
+        :param bytes data_bytes: The new bytes.
+        """
+        if offset < 0 or offset + len(data_bytes) > len(self._data):
+            raise ValueError(
+                "Cannot write {} bytes at offset {}, the logic block size is {}".format(
+                    len(data_bytes),
+                    offset,
+                    len(self._data)
+                )
+            )
+        self._get_buffer()[offset:offset + len(data_bytes)] = data_bytes
+
+    def _get_buffer(self):
+        """
+        Get the writable copy of the logic block bytes, creating it on the first write.
+
+        :rtype: bytearray
+        """
+        if self._buffer is not None:
+            return self._buffer
+        self._buffer = bytearray(self._data)
+        self._data = self._buffer
+        logic_block_object = self._fdri_payload.get_logic_block()
+        if logic_block_object.is_unpacked():
+            # The unpacked rows are replaced by the matrix
+            self._fdri_payload.set_logic_block(DataObject.create_packed(
+                self.context,
+                self._buffer,
+                XilinxFdriLogicBlock,
+            ))
+        else:
+            logic_block_object.set_bytes(self._buffer)
+        return self._buffer
+
+
+class XilinxFrameAddressIndex(object):
+    """
+    An index of the frames written by an FDRI payload, by frame address. The frames of the
+    device are ordered as in the FDRI payload of a full bitstream: the frames of the logic block
+    first, then the frames of the bram block and of the io block. The logic frames are addressed
+    by the row, major and minor of the frame table. The format does not describe the layout of
+    the bram and io blocks, each of them is indexed as a single span without a frame address:
+    it can be looked up by offset but not by address.
+
+    The payload is written from a start address (ie the value of the FAR registers before the
+    FDRI packet), each frame follows the previous one. Looking up a frame by address or by offset
+    are constant time operations.
+
+    :param XilinxFdriFormat fdri_format: The FDRI format of the device.
+    :param Optional[XilinxFrameAddress] start_address: The address of the first frame of the
+        payload, a logic frame. The first frame of the device if None.
+    :param Optional[int] payload_size: The size of the payload, the frames past it are not part
+        of the index. The frames up to the end of the io block are indexed if None.
+
+    :ivar array block_types: The block type of each frame (or span of the bram and io blocks).
+    :ivar array rows: The row of each frame.
+    :ivar array majors: The major of each frame.
+    :ivar array minors: The minor of each frame.
+    :ivar array offsets: The offset of each frame within the payload.
+    :ivar array sizes: The size of each frame in bytes.
+    :ivar int frame_size: The size of the largest frame in bytes.
+    :ivar Optional[int] payload_offset: The offset of the payload within the packets data, if it
+        is known.
+    """
+    def __init__(self, fdri_format, start_address=None, payload_size=None):
+        frame_table = fdri_format.frame_table
+        if frame_table is None:
+            raise ValueError("No logic block format for the device {}".format(
+                fdri_format.device_name
+            ))
+        self.block_types = array("B")
+        self.rows = array("H")
+        self.majors = array("H")
+        self.minors = array("H")
+        self.offsets = array("L")
+        self.sizes = array("L")
+        self.frame_size = frame_table.frame_size
+        self.payload_offset = None  # type: Optional[int]
+        self._indexes_by_address = {}  # type: Dict[XilinxFrameAddress, int]
+
+        frames = self._iterate_device_frames(fdri_format)
+        if start_address is not None:
+            for address, size in frames:
+                if address == start_address and address.block_type == BLOCK_TYPE_LOGIC:
+                    frames = itertools.chain([(address, size)], frames)
+                    break
+            else:
+                raise ValueError("No frame at the address {}".format(start_address))
+        offset = 0
+        for address, size in frames:
+            if payload_size is not None and offset + size > payload_size:
+                break
+            if address.block_type == BLOCK_TYPE_LOGIC:
+                self._indexes_by_address[address] = len(self.offsets)
+            self.block_types.append(address.block_type)
+            self.rows.append(address.row)
+            self.majors.append(address.major)
+            self.minors.append(address.minor)
+            self.offsets.append(offset)
+            self.sizes.append(size)
+            offset += size
+        self.size = offset
+
+        # The frame containing the first byte of each bucket of frame_size bytes. The frames
+        # are at most frame_size bytes, a bucket holds the start of a few frames at most.
+        self._bucket_size = max(frame_table.frame_size, 1)
+        self._frame_indexes_by_bucket = array("L")
+        frame_index = 0
+        for bucket_offset in range(0, self.size, self._bucket_size):
+            while self.offsets[frame_index] + self.sizes[frame_index] <= bucket_offset:
+                frame_index += 1
+            self._frame_indexes_by_bucket.append(frame_index)
+
+    @staticmethod
+    def _iterate_device_frames(fdri_format):
+        """
+        :param XilinxFdriFormat fdri_format:
+        :rtype: Iterator[Tuple[XilinxFrameAddress, int]]
+        """
+        frame_table = fdri_format.frame_table
+        for index in range(len(frame_table)):
+            row, major, minor = frame_table.get_frame_coordinates(index)
+            yield XilinxFrameAddress(BLOCK_TYPE_LOGIC, row, major, minor), \
+                frame_table.sizes[index]
+        # The bram and io blocks are spans without a known address
+        for block_type, size in [
+            (BLOCK_TYPE_BRAM, fdri_format.bram_block_size),
+            (BLOCK_TYPE_IO, fdri_format.io_block_size),
+        ]:
+            if size > 0:
+                yield XilinxFrameAddress(block_type, 0, 0, 0), size
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, address):
+        return address in self._indexes_by_address
+
+    def get_address(self, index):
+        """
+        :param int index: The index of the frame.
+        :rtype: XilinxFrameAddress
+        :raises ValueError: If the frame is the span of the bram or io block, whose frame
+            addresses are not described by the format.
+        """
+        if self.block_types[index] != BLOCK_TYPE_LOGIC:
+            raise ValueError(
+                "The frame addresses of the {} block are not described by the format".format(
+                    BLOCK_TYPE_NAMES[self.block_types[index]]
+                )
+            )
+        return XilinxFrameAddress(
+            self.block_types[index],
+            self.rows[index],
+            self.majors[index],
+            self.minors[index],
+        )
+
+    def get_index(self, address):
+        """
+        :param XilinxFrameAddress address:
+        :rtype: int
+        :raises ValueError: If the payload does not hold the frame.
+        """
+        index = self._indexes_by_address.get(address)
+        if index is None:
+            raise ValueError("The payload does not hold the frame at {}".format(address))
+        return index
+
+    def get_frame_span(self, address):
+        """
+        Get the offset and size of a frame within the payload.
+
+        :param XilinxFrameAddress address:
+        :rtype: Tuple[int, int]
+        """
+        index = self.get_index(address)
+        return self.offsets[index], self.sizes[index]
+
+    def get_index_by_offset(self, offset):
+        """
+        Get the index of the frame containing a byte of the payload.
+
+        :param int offset: The offset of the byte within the payload.
+        :rtype: int
+        :raises ValueError: If the offset is not part of an indexed frame.
+        """
+        if not 0 <= offset < self.size:
+            raise ValueError("The offset {} is outside of the indexed frames".format(offset))
+        index = self._frame_indexes_by_bucket[offset // self._bucket_size]
+        while self.offsets[index] + self.sizes[index] <= offset:
+            index += 1
+        return index
+
+    def get_address_by_offset(self, offset):
+        """
+        Get the address of the frame containing a byte of the payload.
+
+        :param int offset: The offset of the byte within the payload.
+        :rtype: XilinxFrameAddress
+        """
+        return self.get_address(self.get_index_by_offset(offset))
+
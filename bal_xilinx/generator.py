@@ -0,0 +1,396 @@
+import binascii
+import random
+import struct
+from collections import OrderedDict
+
+from typing import Dict, List, Optional
+
+from bal_xilinx.converters.bitstream_packets_scanner import WRITE_OPCODE, encode_packet_header
+from bal_xilinx.crc import XilinxCrcCalculator
+from bal_xilinx.format import XilinxFdriFormat, XilinxFormat, XilinxRegisterFormat
+from bal_xilinx.frames import BLOCK_TYPE_LOGIC, XilinxFrameAddress
+
+NOOP_NAME = "NOOP"
+FILL_ZEROS = "zeros"
+FILL_ONES = "ones"
+FILL_RANDOM = "random"
+FILL_SPARSE = "sparse"
+FILL_PATTERN = "pattern"
+FILL_MODES = [FILL_ZEROS, FILL_ONES, FILL_RANDOM, FILL_SPARSE, FILL_PATTERN]
+
+# The configuration registers written before the FDRI packet by default, with the number of
+# writes. NOOP is the number of NOOP packets.
+DEFAULT_PACKET_MIX = OrderedDict([
+    (NOOP_NAME, 4),
+    ("Cor1", 1),
+    ("Cor2", 1),
+    ("CclkFreq", 1),
+    ("PwrdnReg", 1),
+    ("HcOptReg", 1),
+    ("Cwdt", 1),
+    ("Mode", 1),
+    ("General1", 1),
+    ("General2", 1),
+    ("SeuOpt", 1),
+    ("Mask", 1),
+])
+
+# The devices whose bitstreams hold a second, small FDRI packet after the frames by default
+SMALL_FDRI_WRITE_DEVICE_NAMES = ["LX45T"]
+
+# The registers written by the generator itself, their value is not random
+RESERVED_REGISTER_NAMES = ["Cmd", "Crc", "Ctl", "Fdri", "Idcode", "FarMaj", "FarMin"]
+
+
+def get_random_bytes(rng, size):
+    """
+    :param random.Random rng:
+    :param int size:
+    :rtype: bytes
+    """
+    if size == 0:
+        return b""
+    return binascii.unhexlify("{:0{}x}".format(rng.getrandbits(size * 8), size * 2))
+
+
+class XilinxPacketBuilder(object):
+    """
+    Builds configuration packets from the register formats.
+
+    :param XilinxFormat bitstream_format: The format of the bitstreams.
+    """
+    def __init__(self, bitstream_format):
+        self.format = bitstream_format
+        self._command_format = bitstream_format.get_register_format_by_name("Cmd").attributes[0]
+
+    def create_noop(self):
+        """
+        :rtype: bytes
+        """
+        return struct.pack(">H", encode_packet_header(1, 0, 0, 0))
+
+    def create_write(self, register_name, values):
+        """
+        Build a type 1 write packet.
+
+        :param str register_name:
+        :param List[int] values: The value of each attribute of the register.
+        :rtype: bytes
+        """
+        register_format = self.format.get_register_format_by_name(register_name)
+        if register_format is None:
+            raise ValueError("Unknown register {}".format(register_name))
+        payload = register_format.codec.encode(*values)
+        header = encode_packet_header(1, WRITE_OPCODE, register_format.address, len(payload) // 2)
+        return struct.pack(">H", header) + payload
+
+    def create_far_writes(self, address):
+        """
+        Build the FarMaj and FarMin writes of a frame address.
+
+        :param XilinxFrameAddress address:
+        :rtype: bytes
+        """
+        address_values = {
+            "blk": address.block_type,
+            "row": address.row,
+            "major": address.major,
+            "minor": address.minor,
+        }
+        return b"".join([
+            self.create_write(register_name, [
+                address_values.get(attribute_format.name.lower(), 0)
+                for attribute_format in
+                self.format.get_register_format_by_name(register_name).attributes
+            ])
+            for register_name in ["FarMaj", "FarMin"]
+        ])
+
+    def create_command(self, command_name):
+        """
+        Build a write of the Cmd register.
+
+        :param str command_name: The name of the command, ie DESYNC.
+        :rtype: bytes
+        """
+        command = self._command_format.get_value_by_name(command_name)
+        if command is None:
+            raise ValueError("Unknown command {}".format(command_name))
+        return self.create_write("Cmd", [command])
+
+    def create_type2_write(self, register_name, payload):
+        """
+        Build a type 2 write packet. It is expected to follow a type 1 packet.
+
+        :param str register_name:
+        :param bytes payload: The payload, its size is expected to be a multiple of 2 bytes.
+        :rtype: bytes
+        """
+        if len(payload) % 2 != 0:
+            raise ValueError("The payload size is expected to be a multiple of 2 bytes")
+        address = self.format.get_register_format_by_name(register_name).address
+        return struct.pack(
+            ">HI",
+            encode_packet_header(2, WRITE_OPCODE, address, 0),
+            len(payload) // 2 - 2
+        ) + payload
+
+    def create_bitstream(self, packets):
+        """
+        Build a bitstream from its packets: the header, the sync word, the packets with valid
+        CRC values and a tail of NOOP packets after the DESYNC command.
+
+        :param List[bytes] packets: The packets, the DESYNC command included.
+        :rtype: bytes
+        """
+        packets_data = bytearray(b"".join(packets))
+        self.fix_crc_values(packets_data)
+        return b"".join([
+            b"\xff" * 16,
+            self.format.sync_word,
+            bytes(packets_data),
+            self.create_noop() * 4,
+        ])
+
+    def fix_crc_values(self, packets_data):
+        """
+        :param bytearray packets_data: The packets data, updated in place.
+        """
+        for check in XilinxCrcCalculator(self.format).get_checks(packets_data):
+            packets_data[check.offset:check.offset + 4] = struct.pack(">I", check.computed_value)
+
+
+class XilinxBitstreamGenerator(object):
+    """
+    Generates synthetic bitstreams from a :py:class:`~bal_xilinx.format.XilinxFormat`. The
+    bitstreams are valid for the converters and the analyzers: they hold the Idcode of the
+    targeted device, a mix of configuration register writes, a type 2 FDRI packet of the size of
+    the FDRI payload of the device and valid CRC values. The same seed always generates the same
+    bitstream.
+
+    The bitstream is made of the header and the sync word, a CRC reset, the packet mix, the Ctl
+    and Idcode writes, the frame address, the FDRI packet, the Crc write, the start commands and
+    the DESYNC command. Like the real LX45T bitstreams, it may also hold a second FDRI packet
+    writing a single empty frame, with its frame address, after the Crc write.
+
+    :param XilinxFormat bitstream_format: The format of the bitstreams.
+    :param Optional[int] seed: The seed of the random generator.
+    """
+    def __init__(self, bitstream_format, seed=None):
+        self.format = bitstream_format
+        self._rng = random.Random(seed)
+        self._packet_builder = XilinxPacketBuilder(bitstream_format)
+
+    def generate(
+            self,
+            device_name,
+            packet_mix=None,
+            fill=FILL_SPARSE,
+            density=0.1,
+            pattern=b"\xa5",
+            pin_states=None,
+            encrypted=False,
+            small_fdri_write=None,
+    ):
+        """
+        Generate a bitstream.
+
+        :param str device_name: The name of the targeted device, ie LX9.
+        :param Optional[Dict[str,int]] packet_mix: The names of the registers written before
+            the FDRI packet mapped to the number of writes, with random attribute values. The
+            `NOOP` name is the number of NOOP packets. The packets are shuffled. It defaults
+            to :py:data:`DEFAULT_PACKET_MIX`. Larger counts generate larger bitstreams.
+        :param str fill: How the logic and the bram blocks of the FDRI payload are filled, one
+            of :py:data:`FILL_MODES`. `sparse` fills a `density` fraction of the frames with
+            random bytes and leaves the others empty. `pattern` repeats the `pattern` bytes.
+        :param float density: The fraction of frames filled in `sparse` mode.
+        :param bytes pattern: The bytes repeated in `pattern` mode.
+        :param Optional[Dict[str,bool]] pin_states: The state of the io pins by pin name. The
+            pins that are not listed get a random state.
+        :param bool encrypted: If True, the decryption bit of the Ctl register is set. The FDRI
+            payload is not actually encrypted.
+        :param Optional[bool] small_fdri_write: If True, a second FDRI packet writing a single
+            empty frame follows the Crc write. It defaults to True for the devices of
+            :py:data:`SMALL_FDRI_WRITE_DEVICE_NAMES`.
+        :rtype: bytes
+        """
+        fdri_format = self.format.get_fdri_format(device_name)
+        if fdri_format is None:
+            raise ValueError("No FDRI format for the device {}".format(device_name))
+        if fill not in FILL_MODES:
+            raise ValueError("Unknown fill mode {}, expected one of {}".format(
+                fill,
+                ", ".join(FILL_MODES)
+            ))
+        if packet_mix is None:
+            packet_mix = DEFAULT_PACKET_MIX
+        if small_fdri_write is None:
+            small_fdri_write = device_name in SMALL_FDRI_WRITE_DEVICE_NAMES
+        id_code = self.format.get_register_format_by_name("Idcode").attributes[0]\
+            .get_value_by_name(device_name)
+        if id_code is None:
+            raise ValueError("No Idcode value for the device {}".format(device_name))
+
+        builder = self._packet_builder
+        packets = [
+            builder.create_noop(),
+            builder.create_command("RCRC"),
+            builder.create_noop(),
+        ]
+        packets.extend(self._create_packet_mix(packet_mix))
+        packets.extend([
+            builder.create_write("Ctl", self._get_ctl_values(encrypted)),
+            builder.create_write("Idcode", [id_code]),
+            builder.create_command("WCFG"),
+            builder.create_write("FarMaj", [0, 0, 0]),
+            builder.create_write("FarMin", [0, 0, 0]),
+            self._create_fdri_packet(fdri_format, fill, density, pattern, pin_states or {}),
+            builder.create_write("Crc", [0]),
+        ])
+        if small_fdri_write:
+            packets.extend([
+                builder.create_far_writes(XilinxFrameAddress(BLOCK_TYPE_LOGIC, 0, 0, 0)),
+                builder.create_type2_write(
+                    "Fdri",
+                    # The CRC is computed once the whole bitstream is generated
+                    b"\x00" * (fdri_format.frame_table.frame_size + fdri_format.crc_size)
+                ),
+            ])
+        packets.extend([
+            builder.create_command("GRESTORE"),
+            builder.create_command("START"),
+            builder.create_noop(),
+            builder.create_command("DESYNC"),
+        ])
+        return builder.create_bitstream(packets)
+
+    def _get_random_values(self, register_format):
+        """
+        Pick random attribute values, among the documented values of each attribute if any. The
+        reserved attributes are left at 0. The documented values that do not fit in the
+        attribute are ignored.
+
+        :param XilinxRegisterFormat register_format:
+        :rtype: List[int]
+        """
+        values = []
+        for attribute in register_format.attributes:
+            documented_values = [
+                value
+                for value in attribute.get_documented_values()
+                if value >> attribute.bit_size == 0
+            ]
+            if attribute.name.startswith("reserved"):
+                values.append(0)
+            elif len(documented_values) > 0:
+                values.append(self._rng.choice(documented_values))
+            else:
+                values.append(self._rng.getrandbits(attribute.bit_size))
+        return values
+
+    def _get_ctl_values(self, encrypted):
+        ctl_format = self.format.get_register_format_by_name("Ctl")
+        return [
+            int(encrypted) if attribute.name == "dec" else 0
+            for attribute in ctl_format.attributes
+        ]
+
+    def _create_packet_mix(self, packet_mix):
+        """
+        :param Dict[str,int] packet_mix:
+        :rtype: List[bytes]
+        """
+        packets = []
+        for register_name, count in packet_mix.items():
+            if register_name == NOOP_NAME:
+                packets.extend([self._packet_builder.create_noop()] * count)
+                continue
+            register_format = self.format.get_register_format_by_name(register_name)
+            if register_format is None:
+                raise ValueError("Unknown register {}".format(register_name))
+            if register_name in RESERVED_REGISTER_NAMES or register_format.size == 0:
+                raise ValueError("The register {} cannot be part of the packet mix".format(
+                    register_name
+                ))
+            for _ in range(count):
+                packets.append(self._packet_builder.create_write(
+                    register_name,
+                    self._get_random_values(register_format)
+                ))
+        self._rng.shuffle(packets)
+        return packets
+
+    def _create_block(self, size, frame_size, fill, density, pattern):
+        """
+        Create the bytes of the logic or the bram block.
+
+        :param int size: The size of the block.
+        :param Optional[int] frame_size: The size of the frames filled in sparse mode.
+        :rtype: bytearray
+        """
+        if fill == FILL_ZEROS:
+            return bytearray(size)
+        if fill == FILL_ONES:
+            return bytearray(b"\xff" * size)
+        if fill == FILL_RANDOM:
+            return bytearray(get_random_bytes(self._rng, size))
+        if fill == FILL_PATTERN:
+            if len(pattern) == 0:
+                raise ValueError("The fill pattern cannot be empty")
+            return bytearray((pattern * (size // len(pattern) + 1))[:size])
+        block = bytearray(size)
+        if frame_size is None:
+            frame_size = max(size, 1)
+        for offset in range(0, size, frame_size):
+            if self._rng.random() < density:
+                frame_end = min(offset + frame_size, size)
+                block[offset:frame_end] = get_random_bytes(self._rng, frame_end - offset)
+        return block
+
+    def _create_io_block(self, fdri_format, pin_states):
+        """
+        :param XilinxFdriFormat fdri_format:
+        :param Dict[str,bool] pin_states:
+        :rtype: bytearray
+        """
+        io_block = bytearray(fdri_format.io_block_size)
+        for pin_format in fdri_format.io_block_format or []:
+            if pin_format.offset + len(pin_format.on_value) > len(io_block):
+                # Some pins of the table are past the end of the io block
+                continue
+            is_on = pin_states.get(pin_format.name)
+            if is_on is None:
+                is_on = self._rng.random() < 0.5
+            value = pin_format.on_value if is_on else pin_format.off_value
+            io_block[pin_format.offset:pin_format.offset + len(value)] = value
+        return io_block
+
+    def _create_fdri_packet(self, fdri_format, fill, density, pattern, pin_states):
+        """
+        :param XilinxFdriFormat fdri_format:
+        :rtype: bytes
+        """
+        # Without a frame table, the sparse blocks are either empty or entirely filled
+        frame_size = None
+        if fdri_format.frame_table is not None:
+            frame_size = fdri_format.frame_table.frame_size
+        payload = b"".join([
+            bytes(self._create_block(
+                fdri_format.logic_block_size,
+                frame_size,
+                fill,
+                density,
+                pattern
+            )),
+            bytes(self._create_block(
+                fdri_format.bram_block_size,
+                frame_size,
+                fill,
+                density,
+                pattern
+            )),
+            bytes(self._create_io_block(fdri_format, pin_states)),
+            # The CRC is computed once the whole bitstream is generated
+            b"\x00" * fdri_format.crc_size,
+        ])
+        return self._packet_builder.create_type2_write("Fdri", payload)
@@ -0,0 +1,92 @@
+import struct
+
+from bal.context_ioc import AbstractModifier
+from bal.data_object import DataObject
+from bal_xilinx.context import XilinxContext
+from bal_xilinx.crc import XilinxCrcCalculator, XilinxCrcCheck
+from bal_xilinx.data_model import XilinxFdriPayload, XilinxPackets
+
+
+class XilinxCrcModifier(AbstractModifier):
+    """
+    A modifier used to recompute the CRC values stored in a Xilinx bitstream: the Crc register
+    writes and the tails of the FDRI payloads.
+
+    :param XilinxContext context: The configured xilinx context
+    """
+
+    def __init__(self, context):
+        super(XilinxCrcModifier, self).__init__(context)
+        self.context = context
+
+    def modify(self, incremental=False, **kwargs):
+        """
+        Recompute the CRC values stored in the bitstream. The bitstream is synchronized first.
+
+        In the incremental mode, the CRC values are updated from the patches applied to the
+        patch buffer of the context since the last call, the rest of the configuration data is
+        not read. It assumes the CRC values were valid before the patches. It falls back to
+        computing the CRC values over the whole configuration data when the packets are not a
+        slice of the patch buffer (ie a packet was modified through its model).
+
+        :param bool incremental: If True, update the CRC values from the patched words only.
+        :param Any kwargs:
+        :rtype: List[XilinxCrcCheck]
+        :return: The CRC values of the bitstream. The stored values are the values before the
+            update.
+        """
+        bitstream_object = self.context.get_data()
+        bitstream_object.synchronize()
+        packets_object = bitstream_object.unpack().get_packets()
+        packets_data = packets_object.pack()
+
+        patch_buffer = self.context.patch_buffer
+        packets_offset = None
+        patches = []
+        if patch_buffer is not None:
+            packets_offset = patch_buffer.get_offset(packets_data)
+            patches = patch_buffer.pop_patches()
+
+        calculator = XilinxCrcCalculator(self.context.format)
+        if incremental and packets_offset is not None:
+            checks = calculator.update_checks(packets_data, [
+                (offset - packets_offset, patch_xor)
+                for offset, patch_xor in patches
+                if packets_offset <= offset < packets_offset + len(packets_data)
+            ])
+        else:
+            checks = calculator.get_checks(packets_data)
+
+        for check in checks:
+            if check.is_valid():
+                continue
+            crc_bytes = struct.pack(">I", check.computed_value)
+            if packets_offset is not None:
+                patch_buffer.patch(packets_offset + check.offset, crc_bytes)
+            else:
+                self._set_crc_value(packets_object, check, crc_bytes)
+        if patch_buffer is not None:
+            # The CRC values are up to date with the patches
+            patch_buffer.pop_patches()
+        return checks
+
+    def _set_crc_value(self, packets_object, check, crc_bytes):
+        """
+        :param DataObject[XilinxPackets] packets_object:
+        :param XilinxCrcCheck check:
+        :param bytes crc_bytes:
+        """
+        packet = packets_object.unpack()[check.packet_index].get_model()
+        payload_object = packet.get_payload()
+        if check.name == "Crc":
+            payload_object.unpack().get("checksum").unpack()\
+                .set_value(check.computed_value)
+        elif payload_object.is_unpacked():
+            fdri_payload = payload_object.get_model()
+            assert isinstance(fdri_payload, XilinxFdriPayload)
+            fdri_payload.get_crc().set_bytes(crc_bytes)
+        else:
+            payload_bytes = payload_object.get_bytes()
+            payload_object.set_bytes(
+                bytes(payload_bytes[:len(payload_bytes) - len(crc_bytes)]) + crc_bytes
+            )
@@ -1,4 +1,5 @@
 from bal.context_ioc import AbstractModifier
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
 from bal_xilinx.context import XilinxContext
 from bal_xilinx.data_model import XilinxFdriPayload
 
@@ -16,50 +17,89 @@ class XilinxPinModifer(AbstractModifier):
 
     def modify(self, pin_name, on, **kwargs):
         """
-        Modify an FDRI IOB pin config.
+        Modify an FDRI IOB pin config. When the context has a patch buffer, the pin config is
+        patched in place in the bitstream bytes. Otherwise the IO block bytes are replaced.
 
         :param str pin_name: The name of the pin to modify.
         :param bool on: If True, the pin will be pulled high. Otherwise it will be pulled low.
         :param Any kwargs:
         """
-        if self.context.id_code is None:
-            raise ValueError(
-                "The ID code for the targeted device has not been set on the bitstream context."
-            )
-        io_pin_format = self.context.format.get_fdri_format(self.context.id_code)\
-            .get_io_pin_by_name(pin_name)
+        self.modify_many({pin_name: on})
+
+    def modify_many(self, pin_states, **kwargs):
+        """
+        Modify the config of many FDRI IOB pins at once. The pin formats are all resolved and
+        validated before the IO block is modified, then the IO block is modified in a single
+        pass.
+
+        :param Dict[str,bool] pin_states: The name of each pin to modify mapped to its state. If
+            a state is True, the pin will be pulled high. Otherwise it will be pulled low.
+        :param Any kwargs:
+        """
+        device_name = self.context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+        fdri_format = self.context.format.get_fdri_format(device_name)
+        if fdri_format is None:
+            raise ValueError("No FDRI format for the device {}".format(device_name))
+        io_pin_patches = []
+        for pin_name, on in pin_states.items():
+            io_pin_format = fdri_format.get_io_pin_by_name(pin_name)
+            if io_pin_format is None:
+                raise ValueError("No format information for the IO pin {}".format(pin_name))
 
-        if io_pin_format is None:
-            raise ValueError("No format information for the IO pin {}".format(pin_name))
+            if on is True:
+                io_pin_value = io_pin_format.on_value
+            else:
+                io_pin_value = io_pin_format.off_value
 
-        if on is True:
-            io_pin_value = io_pin_format.on_value
-        else:
-            io_pin_value = io_pin_format.off_value
+            if io_pin_value is None:
+                raise ValueError("No value configured for pin {}, on={}".format(pin_name, on))
 
-        if io_pin_value is None:
-            raise ValueError("No value configured for pin {}, on={}".format(pin_name, on))
+            if io_pin_format.offset + len(io_pin_value) > fdri_format.io_block_size:
+                raise ValueError(
+                    "Invalid format definition for IO pin {}. The last byte would "
+                    "be written at offset {} but the IO block data size is only {}".format(
+                        pin_name,
+                        hex(io_pin_format.offset + len(io_pin_value) - 1),
+                        fdri_format.io_block_size
+                    )
+                )
+            io_pin_patches.append((io_pin_format.offset, io_pin_value))
+        if len(io_pin_patches) == 0:
+            return
 
-        fdri_packets = self.context.get_data().unpack()\
+        # The io block is in the payload of the Fdri packet writing the whole device, the only
+        # one unpacking to an XilinxFdriPayload.
+        fdri_payload_objects = [
+            fdri_packet.get_payload()
+            for fdri_packet in self.context.get_data().unpack()
             .get_packets_by_register_name("Fdri")
-        if len(fdri_packets) != 1:
-            raise ValueError("A single Fdri register packet is expected in the bitstream")
-        fdri_packet = fdri_packets[0]
-        fdri_packet_payload = fdri_packet.get_payload().unpack()
+        ]
+        fdri_payload_objects = [
+            fdri_payload_object for fdri_payload_object in fdri_payload_objects
+            if fdri_payload_object.get_model_type() == XilinxFdriPayload.__name__
+        ]
+        if len(fdri_payload_objects) != 1:
+            raise ValueError(
+                "A single Fdri register packet writing the device is expected in the bitstream"
+            )
+        fdri_packet_payload = fdri_payload_objects[0].unpack()
         assert isinstance(fdri_packet_payload, XilinxFdriPayload)
         io_block_object = fdri_packet_payload.get_io_block()
         io_block_bytes = io_block_object.get_bytes()
-        if io_pin_format.offset + len(io_pin_value) > len(io_block_bytes):
-            raise ValueError(
-                "Invalid format definition for IO pin {}. The last byte would "
-                "be written at offset {} but the IO block data size is only {}".format(
-                    pin_name,
-                    hex(io_pin_format.offset + len(io_pin_value) - 1),
-                    len(io_block_bytes)
-                )
-            )
-        io_block_object.set_bytes(
-            io_block_bytes[:io_pin_format.offset] + \
-                io_pin_value + \
-                io_block_bytes[io_pin_format.offset + len(io_pin_value):]
-        )
+        assert len(io_block_bytes) == fdri_format.io_block_size
+
+        patch_buffer = self.context.patch_buffer
+        io_block_offset = None
+        if patch_buffer is not None and not io_block_object.is_unpacked():
+            io_block_offset = patch_buffer.get_offset(io_block_bytes)
+        if io_block_offset is not None:
+            # The IO block bytes are a slice of the bitstream buffer, the pins are patched in
+            # place and none of the data objects need to be repacked.
+            for offset, io_pin_value in io_pin_patches:
+                patch_buffer.patch(io_block_offset + offset, io_pin_value)
+            return
+        # The IO block bytes may be a memoryview of the bitstream, they are copied once here
+        io_block_bytes = bytearray(io_block_bytes)
+        for offset, io_pin_value in io_pin_patches:
+            io_block_bytes[offset:offset + len(io_pin_value)] = io_pin_value
+        io_block_object.set_bytes(bytes(io_block_bytes))
@@ -0,0 +1,143 @@
+from typing import List, Tuple
+
+from bal_xilinx.crc import XilinxCrcCalculator
+from bal_xilinx.diff import XilinxBitstreamDiff
+from bal_xilinx.format import XilinxFdriFormat, XilinxFormat
+from bal_xilinx.frames import BLOCK_TYPE_LOGIC, BLOCK_TYPE_NAMES, XilinxFrameAddressIndex
+from bal_xilinx.generator import XilinxPacketBuilder
+
+
+def get_payload_ranges(fdri_format, bitstream_diff):
+    """
+    Get the changed ranges of a bitstream diff as ranges of the FDRI payload.
+
+    :param XilinxFdriFormat fdri_format: The FDRI format of the device.
+    :param XilinxBitstreamDiff bitstream_diff:
+    :rtype: List[Tuple[int, int]]
+    :return: The start and end offsets of each changed range within the FDRI payload.
+    """
+    bram_block_offset = fdri_format.logic_block_size
+    io_block_offset = bram_block_offset + fdri_format.bram_block_size
+    payload_ranges = []
+    for block_offset, block_ranges in [
+        (0, bitstream_diff.logic_ranges),
+        (bram_block_offset, bitstream_diff.bram_ranges),
+        (io_block_offset, bitstream_diff.io_ranges),
+    ]:
+        for offset, size in block_ranges:
+            payload_ranges.append((block_offset + offset, block_offset + offset + size))
+    return payload_ranges
+
+
+class XilinxPartialBitstreamEmitter(object):
+    """
+    Emits partial bitstreams that only write the frames holding changes. The changed frames are
+    grouped in runs of consecutive frames, each run is written with a FAR write of its first
+    frame address followed by a type 2 FDRI write of its frames. The FDRI writes and the Crc write
+    hold valid CRC values. Only the logic frames can be written: the format does not describe the
+    frame addresses of the bram and io blocks.
+
+    The partial bitstream is made of the header and the sync word, a CRC reset, the Idcode write,
+    the WCFG command, the FAR and FDRI writes of each run, the Crc write and the DESYNC command.
+
+    :param XilinxFormat bitstream_format: The Xilinx bitstream format configuration.
+    """
+    def __init__(self, bitstream_format):
+        self.format = bitstream_format
+        self._packet_builder = XilinxPacketBuilder(bitstream_format)
+
+    def get_frame_runs(self, address_index, payload_ranges):
+        """
+        Group the frames holding changes in runs of consecutive frames.
+
+        :param XilinxFrameAddressIndex address_index: The frame address index of the payload.
+        :param List[Tuple[int,int]] payload_ranges: The start and end offsets of the changed
+            ranges of the payload, sorted. The ranges past the indexed frames (ie the CRC) are
+            ignored.
+        :rtype: List[Tuple[int, int]]
+        :return: The index of the first frame and the index after the last frame of each run.
+        :raises ValueError: If a range changes the bram or io block.
+        """
+        runs = []
+        for start, end in payload_ranges:
+            end = min(end, address_index.size)
+            if start >= end:
+                continue
+            first_index = address_index.get_index_by_offset(start)
+            end_index = address_index.get_index_by_offset(end - 1) + 1
+            block_type = address_index.block_types[end_index - 1]
+            if block_type != BLOCK_TYPE_LOGIC:
+                raise ValueError(
+                    "The payload range {}-{} changes the {} block, its frame addresses are not "
+                    "described by the format".format(start, end, BLOCK_TYPE_NAMES[block_type])
+                )
+            if len(runs) > 0 and runs[-1][1] >= first_index:
+                runs[-1] = (runs[-1][0], max(runs[-1][1], end_index))
+            else:
+                runs.append((first_index, end_index))
+        return runs
+
+    def emit(self, device_name, fdri_payload, address_index, payload_ranges):
+        """
+        Emit a partial bitstream writing the frames holding changes.
+
+        :param str device_name: The name of the targeted device.
+        :param bytes fdri_payload: The modified FDRI payload, or at least its frames.
+        :param XilinxFrameAddressIndex address_index: The frame address index of the payload.
+        :param List[Tuple[int,int]] payload_ranges: The start and end offsets of the changed
+            ranges of the payload, sorted.
+        :rtype: bytes
+        """
+        id_code = self.format.get_register_format_by_name("Idcode").attributes[0]\
+            .get_value_by_name(device_name)
+        if id_code is None:
+            raise ValueError("No Idcode value for the device {}".format(device_name))
+        runs = self.get_frame_runs(address_index, payload_ranges)
+        if len(runs) == 0:
+            raise ValueError("No frame changed, the partial bitstream would be empty")
+
+        builder = self._packet_builder
+        packets = [
+            builder.create_noop(),
+            builder.create_command("RCRC"),
+            builder.create_noop(),
+            builder.create_write("Idcode", [id_code]),
+            builder.create_command("WCFG"),
+        ]
+        for first_index, end_index in runs:
+            address = address_index.get_address(first_index)
+            run_start = address_index.offsets[first_index]
+            run_end = address_index.offsets[end_index - 1] + address_index.sizes[end_index - 1]
+            packets.extend([
+                builder.create_far_writes(address),
+                # The CRC is computed once the whole bitstream is built
+                builder.create_type2_write(
+                    "Fdri",
+                    bytes(fdri_payload[run_start:run_end]) +
+                    b"\x00" * XilinxCrcCalculator.CRC_SIZE
+                ),
+            ])
+        packets.extend([
+            builder.create_write("Crc", [0]),
+            builder.create_noop(),
+            builder.create_command("DESYNC"),
+        ])
+        return builder.create_bitstream(packets)
+
+    def emit_from_diff(self, bitstream_diff, fdri_payload, address_index):
+        """
+        Emit a partial bitstream writing the frames of a diff.
+
+        :param XilinxBitstreamDiff bitstream_diff: The diff between the base bitstream and the
+            modified one.
+        :param bytes fdri_payload: The FDRI payload of the modified bitstream.
+        :param XilinxFrameAddressIndex address_index: The frame address index of the payload.
+        :rtype: bytes
+        """
+        fdri_format = self.format.get_fdri_format(bitstream_diff.device_name)
+        return self.emit(
+            bitstream_diff.device_name,
+            fdri_payload,
+            address_index,
+            get_payload_ranges(fdri_format, bitstream_diff)
+        )
@@ -0,0 +1,111 @@
+import io
+
+from typing import BinaryIO, List, Optional
+
+from bal_xilinx.converters.bitstream_packets_scanner import WRITE_OPCODE
+from bal_xilinx.format import XilinxFormat
+from bal_xilinx.stream import DEFAULT_CHUNK_SIZE, XilinxPacketReader
+
+
+class XilinxProbeResult(object):
+    """
+    The result of a probe.
+
+    :ivar Optional[str] device_name: The name of the device targeted by the bitstream, None if
+        the bitstream does not hold an Idcode write.
+    :ivar Optional[int] id_code: The value of the Idcode write.
+    :ivar bool is_encrypted: True if a Ctl write sets the decryption bit.
+    :ivar int packets_offset: The offset of the packets, right after the sync word.
+    :ivar int packet_count: The number of packets read.
+    :ivar List[int] fdri_payload_sizes: The payload size of each type 2 FDRI packet read.
+    :ivar int scanned_size: The offset of the end of the last packet read, the FDRI payloads
+        included even though they are skipped.
+    :ivar bool is_complete: True if the probe read every packet, up to the DESYNC command or
+        the end of the bitstream.
+    """
+    def __init__(self):
+        self.device_name = None  # type: Optional[str]
+        self.id_code = None  # type: Optional[int]
+        self.is_encrypted = False
+        self.packets_offset = 0
+        self.packet_count = 0
+        self.fdri_payload_sizes = []  # type: List[int]
+        self.scanned_size = 0
+        self.is_complete = False
+
+
+class XilinxBitstreamProbe(object):
+    """
+    Detects the device and the encryption of bitstreams without creating a context or data
+    objects. The packets are read one at a time from the stream, only the payloads of the Idcode
+    and Ctl writes are decoded and the FDRI payloads are skipped. By default, the probe stops at
+    the first FDRI packet once the Idcode is known: the decryption is enabled by a Ctl write
+    before the encrypted frames, and most of the bitstream does not need to be read. The Ctl
+    writes following the first FDRI packet are then missed, unlike
+    :py:class:`~bal_xilinx.analyzers.encryption_analyzer.XilinxEncryptionAnalyzer` which checks
+    all of them: a complete probe reports the same encryption as the analyzer.
+
+    :param XilinxFormat bitstream_format: The Xilinx bitstream format configuration.
+    """
+    def __init__(self, bitstream_format):
+        self.format = bitstream_format
+        self._id_code_format = bitstream_format.get_register_format_by_name("Idcode")\
+            .attributes[0]
+
+    def probe(self, file_object, complete=False, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Probe a bitstream read from a binary file object.
+
+        :param BinaryIO file_object: The stream, positioned at the start of the bitstream.
+        :param bool complete: If True, every packet is read, the Ctl writes following the
+            first FDRI packet included.
+        :param int chunk_size: The size of the reads from the stream.
+        :rtype: XilinxProbeResult
+        """
+        result = XilinxProbeResult()
+        reader = XilinxPacketReader(self.format, file_object, chunk_size)
+        is_stopped = False
+        for packet in reader.iterate_packets():
+            result.packet_count += 1
+            register_name = packet.register_format.name
+            if packet.packet_type == 1 and packet.opcode == WRITE_OPCODE and \
+                    packet.payload_size == packet.register_format.size:
+                if register_name == "Idcode":
+                    result.id_code = packet.decode_attributes()["idcode"]
+                    value_documentation = \
+                        self._id_code_format.get_value_documentation(result.id_code)
+                    if value_documentation is not None:
+                        result.device_name = value_documentation.name
+                elif register_name == "Ctl" and packet.decode_attributes()["dec"] == 1:
+                    result.is_encrypted = True
+            elif packet.packet_type == 2 and register_name == "Fdri":
+                result.fdri_payload_sizes.append(packet.payload_size)
+                if not complete and result.id_code is not None:
+                    is_stopped = True
+            result.scanned_size = reader.get_offset()
+            if is_stopped:
+                break
+        result.packets_offset = reader.packets_offset
+        result.is_complete = not is_stopped
+        return result
+
+    def probe_bytes(self, data, complete=False):
+        """
+        Probe a bitstream held in memory.
+
+        :param bytes data:
+        :param bool complete: If True, every packet is read.
+        :rtype: XilinxProbeResult
+        """
+        return self.probe(io.BytesIO(data), complete)
+
+    def probe_path(self, path, complete=False):
+        """
+        Probe a bitstream file.
+
+        :param str path:
+        :param bool complete: If True, every packet is read.
+        :rtype: XilinxProbeResult
+        """
+        with open(path, "rb") as f:
+            return self.probe(f, complete)
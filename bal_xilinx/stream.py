@@ -0,0 +1,312 @@
+import struct
+from collections import OrderedDict
+
+from typing import BinaryIO, Dict, Iterator, Optional
+
+from bal_xilinx.converters import WORD_SIZE
+from bal_xilinx.converters.bitstream_packets_scanner import TYPE2_WORD_COUNT_SIZE, \
+    XilinxPacketScanner, decode_packet_header
+from bal_xilinx.format import XilinxFormat, XilinxRegisterFormat
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class XilinxStreamPacket(object):
+    """
+    A configuration packet read from a stream. The payload of a type 1 packet is read with its
+    header. The payload of a type 2 packet is only read if :py:meth:`get_payload` is called
+    before the next packet is requested, it is skipped otherwise.
+
+    :ivar int offset: The offset of the packet header in the stream.
+    :ivar int packet_type: The type (0, 1 or 2) of the packet.
+    :ivar int opcode: The opcode of the packet.
+    :ivar int register_address: The register address found in the packet header.
+    :ivar int word_count: The word count of the packet. For type 2 packets, it is the value of the
+        32 bits word count that follows the header.
+    :ivar int payload_size: The size of the payload in bytes.
+    :ivar XilinxRegisterFormat register_format: The format of the register targeted by the
+        packet.
+    """
+    def __init__(
+            self,
+            reader,
+            offset,
+            packet_type,
+            opcode,
+            register_address,
+            word_count,
+            payload_size,
+            register_format,
+            payload=None,
+    ):
+        self.offset = offset
+        self.packet_type = packet_type
+        self.opcode = opcode
+        self.register_address = register_address
+        self.word_count = word_count
+        self.payload_size = payload_size
+        self.register_format = register_format
+        self._reader = reader
+        self._payload = payload
+
+    def get_payload(self):
+        """
+        Get the payload of the packet, reading it from the stream if needed.
+
+        :rtype: bytes
+        """
+        if self._payload is None:
+            self._payload = self._reader._read_payload(self)
+        return self._payload
+
+    def decode_attributes(self):
+        """
+        Decode the attributes of the register payload.
+
+        :rtype: Dict[str,int]
+        :return: The value of each attribute of the register, by name.
+        """
+        values = self.register_format.codec.decode(self.get_payload())
+        return OrderedDict([
+            (attribute.name, value)
+            for attribute, value in zip(self.register_format.attributes, values)
+        ])
+
+
+class XilinxPacketReader(object):
+    """
+    Read the configuration packets of a Xilinx bitstream from a binary file object, one packet
+    at a time. The stream is read in chunks: the memory used is bounded by the chunk size and
+    the largest payload that is actually read. The stream does not need to be seekable (ie a
+    pipe), the skipped payloads are read and discarded in chunks if it is not.
+
+    :param XilinxFormat bitstream_format: The Xilinx bitstream format configuration.
+    :param BinaryIO file_object: The stream, positioned at the start of the bitstream.
+    :param int chunk_size: The size of the reads from the stream.
+
+    :ivar Optional[int] packets_offset: The offset of the packets in the stream, right after
+        the sync word. None until the sync word is found.
+    :ivar Optional[int] tail_offset: The offset of the data following the DESYNC command in the
+        stream. None until the DESYNC command is read.
+    """
+    def __init__(self, bitstream_format, file_object, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.format = bitstream_format
+        self.packets_offset = None  # type: Optional[int]
+        self.tail_offset = None  # type: Optional[int]
+        self._scanner = XilinxPacketScanner(bitstream_format)
+        self._file = file_object
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._buffer_offset = 0
+        self._position = 0
+        self._current_packet = None  # type: Optional[XilinxStreamPacket]
+        self._payload_end = None  # type: Optional[int]
+        try:
+            self._is_seekable = file_object.seekable()
+        except AttributeError:
+            self._is_seekable = False
+
+    def get_offset(self):
+        """
+        :rtype: int
+        :return: The offset in the stream of the data following the current packet, the
+            skipped payloads included.
+        """
+        if self._payload_end is not None:
+            return self._payload_end
+        return self._position
+
+    def _fill(self, size):
+        """
+        Read from the stream until the buffer holds at least `size` bytes after the current
+        position.
+
+        :rtype: bool
+        :return: False if the stream ended before.
+        """
+        available = len(self._buffer) - (self._position - self._buffer_offset)
+        if available >= size:
+            return True
+        # Drop the consumed bytes
+        del self._buffer[:self._position - self._buffer_offset]
+        self._buffer_offset = self._position
+        while len(self._buffer) < size:
+            chunk = self._file.read(max(self._chunk_size, size - len(self._buffer)))
+            if not chunk:
+                return False
+            self._buffer.extend(chunk)
+        return True
+
+    def _read(self, size):
+        """
+        :rtype: bytes
+        :return: The next `size` bytes of the stream, fewer if the stream ended.
+        """
+        self._fill(size)
+        start = self._position - self._buffer_offset
+        data_bytes = bytes(self._buffer[start:start + size])
+        self._position += len(data_bytes)
+        return data_bytes
+
+    def _skip(self, size):
+        """
+        Skip the next `size` bytes of the stream.
+        """
+        buffered = len(self._buffer) - (self._position - self._buffer_offset)
+        if size <= buffered:
+            self._position += size
+            return
+        remaining = size - buffered
+        self._position += buffered
+        del self._buffer[:]
+        self._buffer_offset = self._position
+        if self._is_seekable:
+            self._file.seek(remaining, 1)
+            self._position += remaining
+            self._buffer_offset = self._position
+            return
+        while remaining > 0:
+            chunk = self._file.read(min(self._chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            self._position += len(chunk)
+        self._buffer_offset = self._position
+
+    def _find_sync_word(self):
+        """
+        Consume the stream up to the end of the sync word.
+
+        :rtype: bool
+        :return: False if the stream does not contain the sync word.
+        """
+        sync_word = self.format.sync_word
+        while True:
+            start = self._position - self._buffer_offset
+            index = self._buffer.find(sync_word, start)
+            if index >= 0:
+                self._position = self._buffer_offset + index + len(sync_word)
+                return True
+            # Keep the bytes that could be the start of the sync word
+            self._position = max(
+                self._position,
+                self._buffer_offset + len(self._buffer) - len(sync_word) + 1
+            )
+            if not self._fill(len(sync_word)):
+                return False
+
+    def _read_payload(self, packet):
+        """
+        :param XilinxStreamPacket packet:
+        :rtype: bytes
+        """
+        if packet is not self._current_packet:
+            raise ValueError(
+                "The payload of the packet at offset {} was skipped, it can only be read before "
+                "the next packet".format(packet.offset)
+            )
+        payload = self._read(packet.payload_size)
+        self._payload_end = None
+        return payload
+
+    def iterate_packets(self):
+        """
+        Iterate over the packets, up to the DESYNC command or the end of the stream.
+
+        :rtype: Iterator[XilinxStreamPacket]
+        """
+        if not self._find_sync_word():
+            raise ValueError("The sync marker is not present in the provided bitstream data")
+        self.packets_offset = self._position
+        desync_command = self._scanner._desync_command
+        previous_packet_type = 0
+        while True:
+            if self._payload_end is not None:
+                # The payload of the previous packet was not read
+                self._skip(self._payload_end - self._position)
+                self._payload_end = None
+            self._current_packet = None
+            offset = self._position
+            header_data = self._read(WORD_SIZE)
+            if len(header_data) == 0:
+                return
+            if len(header_data) < WORD_SIZE:
+                raise ValueError(
+                    "Truncated packet header at offset {} while parsing the Xilinx config "
+                    "packets".format(offset)
+                )
+            header_word, = struct.unpack(">H", header_data)
+            packet_type, opcode, register_address, word_count = \
+                decode_packet_header(header_word)
+            register_format = self._scanner.get_register_format(register_address, word_count)
+            if opcode == 3:
+                raise ValueError(
+                    "Unexpected header opcode {} while parsing the Xilinx config packets".format(
+                        opcode
+                    )
+                )
+
+            payload = None
+            is_done = False
+            if packet_type == 0:
+                payload = b""
+            elif packet_type == 1:
+                if word_count != 0 and opcode == 0:
+                    raise ValueError("NOOP Xilinx packets are expected to have a 0 length payload")
+                payload = self._read(word_count * WORD_SIZE)
+                if desync_command is not None and len(payload) >= WORD_SIZE and \
+                        register_format.name == "Cmd" and \
+                        struct.unpack_from(">H", payload)[0] == desync_command:
+                    is_done = True
+            elif packet_type == 2:
+                if previous_packet_type != 1:
+                    raise ValueError(
+                        "Unexpected packet type 2 after a packet type {}".format(
+                            previous_packet_type
+                        )
+                    )
+                word_count_data = self._read(TYPE2_WORD_COUNT_SIZE)
+                if len(word_count_data) < TYPE2_WORD_COUNT_SIZE:
+                    raise ValueError(
+                        "Truncated type 2 word count at offset {} while parsing the Xilinx "
+                        "config packets".format(offset + WORD_SIZE)
+                    )
+                word_count, = struct.unpack(">I", word_count_data)
+                self._payload_end = self._position + (word_count + 2) * WORD_SIZE
+            else:
+                raise ValueError(
+                    "Unexpected packet type {} while parsing the Xilinx bitstream".format(
+                        packet_type
+                    )
+                )
+
+            packet = XilinxStreamPacket(
+                self,
+                offset,
+                packet_type,
+                opcode,
+                register_address,
+                word_count,
+                len(payload) if payload is not None else (word_count + 2) * WORD_SIZE,
+                register_format,
+                payload,
+            )
+            self._current_packet = packet
+            previous_packet_type = packet_type
+            yield packet
+            if is_done:
+                self.tail_offset = self._position
+                return
+
+
+def iterate_packets(bitstream_format, file_object, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Iterate over the configuration packets of a bitstream read from a binary file object. See
+    :py:class:`XilinxPacketReader`.
+
+    :param XilinxFormat bitstream_format: The Xilinx bitstream format configuration.
+    :param BinaryIO file_object: The stream, positioned at the start of the bitstream.
+    :param int chunk_size: The size of the reads from the stream.
+    :rtype: Iterator[XilinxStreamPacket]
+    """
+    return XilinxPacketReader(bitstream_format, file_object, chunk_size).iterate_packets()
@@ -0,0 +1,17 @@
+import os
+
+
+def check_output_path(input_path, output_path):
+    """
+    Verify that the output of a tool does not overwrite its input. The input bitstream is
+    memory-mapped, opening it for writing would truncate the file under the mapping.
+
+    :param str input_path: The path of the input bitstream.
+    :param str output_path: The path of the output bitstream.
+    :raises ValueError: If both paths are the same file.
+    """
+    if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        raise ValueError("The output {} is the input bitstream {}, it cannot be overwritten".format(
+            output_path,
+            input_path
+        ))
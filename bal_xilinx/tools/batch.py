@@ -0,0 +1,350 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from collections import OrderedDict
+
+from typing import Dict, Iterable, Iterator, Optional
+
+BITSTREAM_EXTENSIONS = (".bin", ".bit")
+
+
+class XilinxBatchJob(object):
+    """
+    The work to perform on a single bitstream.
+
+    :param str path: The path to the bitstream.
+    :param Optional[str] output_path: The path of the modified bitstream. Defaults to the
+        bitstream path with a `_repacked` suffix.
+    :param Optional[Dict[str,bool]] pin_states: The pins to modify mapped to their state.
+    :param bool detect_device: If True, report the device targeted by the bitstream.
+    :param bool detect_encryption: If True, report whether the bitstream is encrypted.
+    :param bool fix_crc: If True, update the CRC values after modifying the pins.
+    """
+    def __init__(
+            self,
+            path,
+            output_path=None,
+            pin_states=None,
+            detect_device=False,
+            detect_encryption=False,
+            fix_crc=False,
+    ):
+        self.path = path
+        self.output_path = output_path
+        self.pin_states = pin_states if pin_states is not None else OrderedDict()
+        self.detect_device = detect_device
+        self.detect_encryption = detect_encryption
+        self.fix_crc = fix_crc
+
+    @staticmethod
+    def from_dict(job_config, defaults):
+        """
+        Create a job from an entry of a manifest.
+
+        :param Dict[str,Any] job_config: The manifest entry. It requires a `path` and may
+            override any of the `output`, `pins`, `device`, `encryption` and `fix_crc` values of
+            the defaults. The pin states are either "on" or "off".
+        :param XilinxBatchJob defaults: The job providing the default values.
+        :rtype: XilinxBatchJob
+        """
+        if not isinstance(job_config, dict) or "path" not in job_config:
+            raise ValueError("A manifest entry is expected to be a dict with a path")
+        pin_states = defaults.pin_states
+        if "pins" in job_config:
+            pin_states = OrderedDict([
+                (pin_name, parse_pin_state(state))
+                for pin_name, state in sorted(job_config["pins"].items())
+            ])
+        return XilinxBatchJob(
+            job_config["path"],
+            job_config.get("output"),
+            pin_states,
+            job_config.get("device", defaults.detect_device),
+            job_config.get("encryption", defaults.detect_encryption),
+            job_config.get("fix_crc", defaults.fix_crc),
+        )
+
+    def get_output_path(self, output_directory=None):
+        """
+        :param Optional[str] output_directory: The directory in which the modified bitstreams
+            are written when the job does not set an output path.
+        :rtype: str
+        """
+        if self.output_path is not None:
+            return self.output_path
+        name, extension = os.path.splitext(os.path.basename(self.path))
+        directory = output_directory if output_directory is not None \
+            else os.path.dirname(self.path)
+        return os.path.join(directory, name + "_repacked" + extension)
+
+
+def parse_pin_state(state):
+    """
+    :param str|bool state: "on", "off" or a boolean.
+    :rtype: bool
+    """
+    if isinstance(state, bool):
+        return state
+    if state not in ("on", "off"):
+        raise ValueError("Invalid pin state {}, expected on or off".format(state))
+    return state == "on"
+
+
+def create_xilinx_context_factory():
+    """
+    Create a context factory configured with the default format, loaded from the compiled
+    format cache.
+
+    :rtype: XilinxContextFactory
+    """
+    # The package is imported once the arguments are parsed so that the tool starts fast
+    from bal_xilinx.context import XilinxContextFactory
+    from bal_xilinx.defaults import default_xilinx_context, default_xilinx_format
+    return default_xilinx_context(XilinxContextFactory(
+        default_xilinx_format()
+    ))
+
+
+# The context factory of the current process. It is created in the parent process before the
+# pool is started so that forked workers inherit the built format. Workers that are spawned
+# create it once in their initializer.
+_xilinx_context_factory = None  # type: Optional[bal_xilinx.context.XilinxContextFactory]
+
+
+def _initialize_worker():
+    global _xilinx_context_factory
+    if _xilinx_context_factory is None:
+        _xilinx_context_factory = create_xilinx_context_factory()
+
+
+def process_job(job, output_directory=None):
+    """
+    Run a job in the current process.
+
+    :param XilinxBatchJob job:
+    :param Optional[str] output_directory: See :py:meth:`XilinxBatchJob.get_output_path`
+    :rtype: Dict[str,Any]
+    :return: The summary of the job.
+    """
+    from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+    from bal_xilinx.analyzers.encryption_analyzer import XilinxEncryptionAnalyzer
+    from bal_xilinx.converters import pack_into
+    from bal_xilinx.modifiers.crc_modifier import XilinxCrcModifier
+    from bal_xilinx.modifiers.pin_modifier import XilinxPinModifer
+    from bal_xilinx.probe import XilinxBitstreamProbe
+    from bal_xilinx.tools import check_output_path
+
+    _initialize_worker()
+    start_time = time.time()
+    result = OrderedDict([("path", job.path)])
+    try:
+        if len(job.pin_states) == 0:
+            # Detection only, the bitstream is probed without creating a context. Every Ctl
+            # write is checked for the encryption, as the encryption analyzer does.
+            probe_result = XilinxBitstreamProbe(_xilinx_context_factory.format)\
+                .probe_path(job.path, complete=job.detect_encryption)
+            if job.detect_device:
+                if probe_result.id_code is None:
+                    raise ValueError("An Idcode register packet is expected in the bitstream")
+                if probe_result.device_name is None:
+                    raise ValueError("The Idcode value {:#010x} is not documented".format(
+                        probe_result.id_code
+                    ))
+                result["device"] = probe_result.device_name
+            if job.detect_encryption:
+                result["encrypted"] = probe_result.is_encrypted
+        else:
+            bitstream_context = _xilinx_context_factory.create_from_path(job.path)
+            result["device"] = bitstream_context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+            if job.detect_encryption:
+                result["encrypted"] = bitstream_context.create_analyzer(XilinxEncryptionAnalyzer)\
+                    .analyze()
+            bitstream_context.create_modifier(XilinxPinModifer).modify_many(job.pin_states)
+            if job.fix_crc:
+                bitstream_context.create_modifier(XilinxCrcModifier).modify(incremental=True)
+            bitstream_object = bitstream_context.get_data()
+            bitstream_object.synchronize()
+            output_path = job.get_output_path(output_directory)
+            check_output_path(job.path, output_path)
+            with open(output_path, "wb") as f:
+                pack_into(bitstream_object, f)
+            result["output"] = output_path
+            result["pins"] = OrderedDict([
+                (pin_name, "on" if state else "off")
+                for pin_name, state in job.pin_states.items()
+            ])
+    except Exception as e:
+        result["error"] = "{}: {}".format(type(e).__name__, e)
+        result["traceback"] = traceback.format_exc()
+    result["duration"] = round(time.time() - start_time, 6)
+    return result
+
+
+def _process_job_args(args):
+    return process_job(*args)
+
+
+def iterate_directory_jobs(directory, defaults):
+    """
+    Create a job for each bitstream of a directory, sorted by name.
+
+    :param str directory:
+    :param XilinxBatchJob defaults: The job providing the work to perform on each bitstream.
+    :rtype: Iterator[XilinxBatchJob]
+    """
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path) or not name.lower().endswith(BITSTREAM_EXTENSIONS):
+            continue
+        if os.path.splitext(name)[0].endswith("_repacked"):
+            continue
+        yield XilinxBatchJob(
+            path,
+            None,
+            defaults.pin_states,
+            defaults.detect_device,
+            defaults.detect_encryption,
+            defaults.fix_crc,
+        )
+
+
+def iterate_manifest_jobs(manifest_path, defaults):
+    """
+    Create a job for each line of a JSON lines manifest. Relative bitstream paths are relative
+    to the manifest directory.
+
+    :param str manifest_path:
+    :param XilinxBatchJob defaults: The job providing the default values of the entries.
+    :rtype: Iterator[XilinxBatchJob]
+    """
+    manifest_directory = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            job = XilinxBatchJob.from_dict(json.loads(line), defaults)
+            job.path = os.path.join(manifest_directory, job.path)
+            if job.output_path is not None:
+                job.output_path = os.path.join(manifest_directory, job.output_path)
+            yield job
+
+
+def run_jobs(jobs, results_file, output_directory=None, worker_count=None):
+    """
+    Run jobs on a process pool and write a JSON line summary for each of them as soon as it is
+    done. The summaries are not written in the order of the jobs.
+
+    :param Iterable[XilinxBatchJob] jobs:
+    :param IO results_file: The file the JSON lines are written to.
+    :param Optional[str] output_directory: See :py:meth:`XilinxBatchJob.get_output_path`
+    :param Optional[int] worker_count: The number of worker processes, the number of CPUs by
+        default. The jobs run in the current process if it is 1.
+    :rtype: int
+    :return: The number of jobs that failed.
+    """
+    _initialize_worker()
+    job_args = ((job, output_directory) for job in jobs)
+    if worker_count == 1:
+        results = (_process_job_args(args) for args in job_args)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(worker_count, _initialize_worker)
+        results = pool.imap_unordered(_process_job_args, job_args, chunksize=4)
+
+    error_count = 0
+    try:
+        for result in results:
+            if "error" in result:
+                error_count += 1
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return error_count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bal_xilinx.tools.batch",
+        description='Process a directory or a manifest of Xilinx FPGA bitstreams on a process '
+                    'pool. A JSON line summary is written for each bitstream.'
+    )
+    parser.add_argument(
+        'path',
+        metavar='PATH',
+        help='A directory of bitstreams or a JSON lines manifest. Each line of a manifest is an '
+             'object with a "path" and optional "output", "pins" ({"P134": "on"}), "device", '
+             '"encryption" and "fix_crc" values overriding the command line options.'
+    )
+    parser.add_argument(
+        '--pin',
+        metavar='PIN=STATE',
+        action='append',
+        default=[],
+        help='A pin to modify and its state (on/off), ie P134=off. It can be repeated.'
+    )
+    parser.add_argument(
+        '--device',
+        action='store_true',
+        help='Report the device targeted by each bitstream'
+    )
+    parser.add_argument(
+        '--encryption',
+        action='store_true',
+        help='Report whether each bitstream is encrypted'
+    )
+    parser.add_argument(
+        '--fix-crc',
+        action='store_true',
+        help='Update the CRC values of the modified bitstreams, assuming they were valid'
+    )
+    parser.add_argument(
+        '--output-dir',
+        metavar='DIR',
+        help='The directory the modified bitstreams are written to. By default, they are '
+             'written next to the original ones with a _repacked suffix.'
+    )
+    parser.add_argument(
+        '--results',
+        metavar='FILE',
+        help='The JSON lines file the summaries are written to, stdout by default'
+    )
+    parser.add_argument(
+        '--workers',
+        metavar='N',
+        type=int,
+        help='The number of worker processes, the number of CPUs by default'
+    )
+
+    args = parser.parse_args()
+    default_pin_states = OrderedDict()
+    for pin_arg in args.pin:
+        pin_name, _, pin_state = pin_arg.partition("=")
+        default_pin_states[pin_name] = parse_pin_state(pin_state)
+    default_job = XilinxBatchJob(
+        None,
+        pin_states=default_pin_states,
+        detect_device=args.device,
+        detect_encryption=args.encryption,
+        fix_crc=args.fix_crc,
+    )
+    if os.path.isdir(args.path):
+        batch_jobs = iterate_directory_jobs(args.path, default_job)
+    else:
+        batch_jobs = iterate_manifest_jobs(args.path, default_job)
+    if args.output_dir is not None and not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+
+    if args.results is None:
+        failed_count = run_jobs(batch_jobs, sys.stdout, args.output_dir, args.workers)
+    else:
+        with open(args.results, "w") as results_output:
+            failed_count = run_jobs(batch_jobs, results_output, args.output_dir, args.workers)
+    sys.exit(1 if failed_count > 0 else 0)
@@ -0,0 +1,113 @@
+import argparse
+import os
+
+
+def parse_packet_mix(packet_counts):
+    """
+    :param List[str] packet_counts: Register names and write counts, ie Cor1=3.
+    :rtype: Dict[str,int]
+    """
+    from collections import OrderedDict
+    packet_mix = OrderedDict()
+    for packet_count in packet_counts:
+        register_name, _, count = packet_count.partition("=")
+        packet_mix[register_name] = int(count) if count else 1
+    return packet_mix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="bal_xilinx.tools.generate",
+        description='Generate synthetic Xilinx FPGA bitstreams from the default format, for '
+                    'testing and load generation.'
+    )
+    parser.add_argument(
+        'device',
+        metavar='DEVICE',
+        help='The name of the targeted device (ie LX9) or "all" for every known device'
+    )
+    parser.add_argument(
+        'output',
+        metavar='OUTPUT',
+        help='The path of the bitstream. With "all" devices or several bitstreams, the directory '
+             'the bitstreams are written to.'
+    )
+    parser.add_argument(
+        '--count',
+        type=int,
+        default=1,
+        help='The number of bitstreams to generate per device, each with its own seed'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='The seed of the first bitstream, the next ones use the following seeds'
+    )
+    parser.add_argument(
+        '--fill',
+        default='sparse',
+        choices=['zeros', 'ones', 'random', 'sparse', 'pattern'],
+        help='How the logic and bram blocks are filled'
+    )
+    parser.add_argument(
+        '--density',
+        type=float,
+        default=0.1,
+        help='The fraction of frames filled in sparse mode'
+    )
+    parser.add_argument(
+        '--pattern',
+        default='a5',
+        help='The hex bytes repeated in pattern mode'
+    )
+    parser.add_argument(
+        '--packets',
+        metavar='REGISTER=COUNT',
+        nargs='+',
+        help='The configuration register writes (and NOOP packets) before the FDRI packet, ie '
+             'Cor1=3 NOOP=100. Replaces the default packet mix.'
+    )
+    parser.add_argument(
+        '--encrypted',
+        action='store_true',
+        help='Set the decryption bit of the Ctl register'
+    )
+    parser.add_argument(
+        '--single-fdri',
+        action='store_true',
+        help='Do not write the second, small FDRI packet of the LX45T bitstreams'
+    )
+    args = parser.parse_args()
+
+    # Imported once the arguments are parsed so that the tool starts fast (ie with --help)
+    from bal_xilinx.defaults import default_xilinx_format
+    from bal_xilinx.format import hex_to_bytes
+    from bal_xilinx.generator import XilinxBitstreamGenerator
+
+    xilinx_format = default_xilinx_format()
+    device_names = xilinx_format.get_device_names() if args.device == "all" else [args.device]
+    packet_mix = None if args.packets is None else parse_packet_mix(args.packets)
+    is_directory = len(device_names) > 1 or args.count > 1
+    if is_directory and not os.path.isdir(args.output):
+        os.makedirs(args.output)
+    for device_name in device_names:
+        for seed in range(args.seed, args.seed + args.count):
+            data = XilinxBitstreamGenerator(xilinx_format, seed).generate(
+                device_name,
+                packet_mix,
+                args.fill,
+                args.density,
+                hex_to_bytes(args.pattern),
+                encrypted=args.encrypted,
+                small_fdri_write=False if args.single_fdri else None,
+            )
+            output_path = args.output
+            if is_directory:
+                output_path = os.path.join(
+                    args.output,
+                    "{}_{}.bin".format(device_name.lower(), seed)
+                )
+            with open(output_path, "wb") as f:
+                f.write(data)
+            print("Wrote {} bytes to {}".format(len(data), output_path))
@@ -1,21 +1,31 @@
 import argparse
 import os
+from collections import OrderedDict
 
-from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
-from bal_xilinx.context import XilinxContextFactory
-from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
-from bal_xilinx.format import XilinxFormatBuilder
-from bal_xilinx.modifiers.pin_modifier import XilinxPinModifer
 
+def update_xilinx_pin(
+        bitstream_path,
+        output_bitstream_path,
+        is_on,
+        pins,
+        fix_crc=False,
+        compress=False,
+):
+    # Imported once the arguments are parsed so that the tool starts fast (ie with --help)
+    from bal_xilinx.analyzers.compression_analyzer import XilinxCompressionAnalyzer
+    from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+    from bal_xilinx.context import XilinxContextFactory
+    from bal_xilinx.converters import pack_into
+    from bal_xilinx.defaults import default_xilinx_context, default_xilinx_format
+    from bal_xilinx.modifiers.crc_modifier import XilinxCrcModifier
+    from bal_xilinx.modifiers.pin_modifier import XilinxPinModifer
+    from bal_xilinx.tools import check_output_path
 
-def update_xilinx_pin(bitstream_path, output_bitstream_path, is_on, pins):
+    check_output_path(bitstream_path, output_bitstream_path)
     xilinx_context_factory = default_xilinx_context(XilinxContextFactory(
-        default_xilinx_formats(XilinxFormatBuilder()).build()
+        default_xilinx_format()
     ))
-    with open(bitstream_path, "rb") as f:
-        data = f.read()
-
-    bitstream_context = xilinx_context_factory.create(data)
+    bitstream_context = xilinx_context_factory.create_from_path(bitstream_path)
     bitstream_object = bitstream_context.get_data()
 
     device_type = bitstream_context.create_analyzer(XilinxDeviceAnalyzer) \
@@ -25,15 +35,32 @@ def update_xilinx_pin(bitstream_path, output_bitstream_path, is_on, pins):
 
     print("Modifying the bitstream")
     pin_modifier = bitstream_context.create_modifier(XilinxPinModifer)
-    for pin in pins:
-        pin_modifier.modify(pin, is_on)
+    pin_modifier.modify_many(OrderedDict([(pin, is_on) for pin in pins]))
 
-    bitstream_object.synchronize(True)
-    packed_data = bitstream_object.pack()
-    assert packed_data != data, "The bitstream did not change."
+    # The pins are patched in place in the memory map, only the modified data objects are repacked
+    assert bitstream_context.patch_buffer.is_dirty(), "The bitstream did not change."
+    if fix_crc:
+        print("Updating the CRC values")
+        bitstream_context.create_modifier(XilinxCrcModifier).modify(incremental=True)
+    bitstream_object.synchronize()
+    if compress:
+        print("Compressing the duplicate frames")
+        compressed_data, report = bitstream_context.create_analyzer(XilinxCompressionAnalyzer)\
+            .analyze()
+        print("Wrote {} of {} frames with multiple frame writes, saved {} bytes ({:.1f}%), about "
+              "{:.2f}s of serial configuration at 2 MHz".format(
+                  report.repeated_frame_count,
+                  report.frame_count,
+                  report.get_saved_size(),
+                  100 * (1 - report.get_compression_ratio()),
+                  report.get_load_time_saved(),
+              ))
     print("Writing modified bitstream to {}".format(output_bitstream_path))
     with open(output_bitstream_path, "wb") as f:
-        f.write(packed_data)
+        if compress:
+            f.write(compressed_data)
+        else:
+            pack_into(bitstream_object, f)
     print("Done!")
 
 
@@ -60,7 +87,24 @@ if __name__ == "__main__":
         nargs="+",
         help='The name of the pin to modify (ie P134)'
     )
+    parser.add_argument(
+        '--fix-crc',
+        action='store_true',
+        help='Update the CRC values of the bitstream, assuming they were valid'
+    )
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help='Write the duplicate logic frames once, repeated with multiple frame writes'
+    )
 
     args = parser.parse_args()
     bitstream_output_path = os.path.splitext(args.path)[0] + "_repacked.bin"
-    update_xilinx_pin(args.path, bitstream_output_path, args.state == 'on', args.pins)
\ No newline at end of file
+    update_xilinx_pin(
+        args.path,
+        bitstream_output_path,
+        args.state == 'on',
+        args.pins,
+        args.fix_crc,
+        args.compress,
+    )
\ No newline at end of file
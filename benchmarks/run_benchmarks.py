@@ -0,0 +1,360 @@
+"""
+Benchmarks of the main paths of the bal_xilinx package: unpacking, full FDRI unpacking down to
+the frames, pin modification, synchronize + pack and each analyzer. They run offline against
+synthetic LX9 and LX45T bitstreams generated from the default format, and compare the results
+with a stored baseline.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+from collections import OrderedDict
+
+from typing import Any, Callable, Dict, List, Optional
+
+# Run as a script from a checkout, the package is imported from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bal.analyzers.visualizer_analyzer import VisualizerAnalyzer
+from bal_xilinx.analyzers.crc_analyzer import XilinxCrcAnalyzer
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+from bal_xilinx.analyzers.encryption_analyzer import XilinxEncryptionAnalyzer
+from bal_xilinx.analyzers.frame_matrix_analyzer import XilinxFrameMatrixAnalyzer
+from bal_xilinx.context import XilinxContextFactory
+from bal_xilinx.converters import pack_into
+from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
+from bal_xilinx.format import XilinxFdriFormat, XilinxFormat, XilinxFormatBuilder
+from bal_xilinx.generator import XilinxBitstreamGenerator
+from bal_xilinx.modifiers.pin_modifier import XilinxPinModifer
+from bal_xilinx.probe import XilinxBitstreamProbe
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2, the memory is not measured
+    tracemalloc = None
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEVICE_NAMES = ["LX9", "LX45T"]
+BENCHMARK_SEED = 0
+# The depth of the collapsed nodes of the streamed visualizer config
+VISUALIZER_MAX_DEPTH = 3
+# The durations below it are dominated by the noise of the machine, they are not gated
+MIN_GATED_DURATION = 0.001
+
+
+class XilinxBenchmark(object):
+    """
+    A benchmarked operation.
+
+    :param str name: The name of the benchmark.
+    :param Callable[[],Any] setup: Prepares the state of an iteration, it is not measured.
+    :param Callable[[Any],None] run: The measured operation, called with the state.
+    """
+    def __init__(self, name, setup, run):
+        self.name = name
+        self.setup = setup
+        self.run = run
+
+    def measure(self, repeat):
+        """
+        :param int repeat: The number of measured iterations.
+        :rtype: Dict[str,Any]
+        :return: The fastest and median durations in seconds and the peak of the memory allocated
+            by the operation in bytes.
+        """
+        durations = []
+        for _ in range(repeat):
+            state = self.setup()
+            gc.collect()
+            start_time = time.perf_counter() if hasattr(time, "perf_counter") else time.time()
+            self.run(state)
+            end_time = time.perf_counter() if hasattr(time, "perf_counter") else time.time()
+            durations.append(end_time - start_time)
+        durations.sort()
+
+        peak_memory = None
+        if tracemalloc is not None:
+            # Measured separately, tracing the allocations slows down the operation
+            state = self.setup()
+            gc.collect()
+            tracemalloc.start()
+            self.run(state)
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return OrderedDict([
+            ("min", durations[0]),
+            ("median", durations[len(durations) // 2]),
+            ("peak_memory", peak_memory),
+        ])
+
+
+def create_benchmarks(xilinx_context_factory, fdri_format, data, zero_copy):
+    """
+    :param XilinxContextFactory xilinx_context_factory:
+    :param XilinxFdriFormat fdri_format: The FDRI format of the device.
+    :param bytes data: The bitstream targeting the device.
+    :param bool zero_copy: See :py:meth:`XilinxContextFactory.create`
+    :rtype: List[XilinxBenchmark]
+    """
+    def create_context():
+        return xilinx_context_factory.create(bytearray(data) if zero_copy else data, zero_copy)
+
+    def create_typed_context():
+        bitstream_context = create_context()
+        bitstream_context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+        return bitstream_context
+
+    def create_unpacked_context():
+        bitstream_context = create_typed_context()
+        bitstream_context.get_data().unpack_all()
+        return bitstream_context
+
+    def analyze(Analyzer):
+        return lambda bitstream_context: bitstream_context.create_analyzer(Analyzer).analyze()
+
+    def modify_pin(bitstream_context):
+        bitstream_context.create_modifier(XilinxPinModifer).modify(pin_name, False)
+
+    def create_modified_context():
+        bitstream_context = create_typed_context()
+        modify_pin(bitstream_context)
+        return bitstream_context
+
+    def write_visualizer(bitstream_context):
+        bitstream_context.create_analyzer(VisualizerAnalyzer)\
+            .analyze(max_depth=VISUALIZER_MAX_DEPTH, writer=io.StringIO())
+
+    def pack(bitstream_context):
+        bitstream_object = bitstream_context.get_data()
+        bitstream_object.synchronize()
+        bitstream_object.pack()
+
+    def write(bitstream_context):
+        bitstream_object = bitstream_context.get_data()
+        bitstream_object.synchronize()
+        pack_into(bitstream_object, io.BytesIO())
+
+    benchmarks = [
+        XilinxBenchmark(
+            "unpack",
+            create_context,
+            lambda bitstream_context: bitstream_context.get_data().unpack()
+        ),
+        XilinxBenchmark(
+            "unpack_all",
+            create_typed_context,
+            lambda bitstream_context: bitstream_context.get_data().unpack_all()
+        ),
+        XilinxBenchmark(
+            "probe",
+            lambda: data,
+            lambda bitstream_data: XilinxBitstreamProbe(xilinx_context_factory.format)
+            .probe_bytes(bitstream_data)
+        ),
+        XilinxBenchmark("device_analyzer", create_context, analyze(XilinxDeviceAnalyzer)),
+        XilinxBenchmark("encryption_analyzer", create_context, analyze(XilinxEncryptionAnalyzer)),
+        XilinxBenchmark("crc_analyzer", create_typed_context, analyze(XilinxCrcAnalyzer)),
+        XilinxBenchmark(
+            "frame_matrix_analyzer",
+            create_typed_context,
+            analyze(XilinxFrameMatrixAnalyzer)
+        ),
+        XilinxBenchmark(
+            "visualizer_analyzer",
+            create_unpacked_context,
+            analyze(VisualizerAnalyzer)
+        ),
+        XilinxBenchmark("visualizer_stream", create_typed_context, write_visualizer),
+        XilinxBenchmark("pack_unpacked", create_unpacked_context, pack),
+        XilinxBenchmark("write_unpacked", create_unpacked_context, write),
+    ]
+    if fdri_format.io_block_format is not None:
+        pin_name = fdri_format.io_block_format[0].name
+        benchmarks += [
+            XilinxBenchmark("pin_modifier", create_typed_context, modify_pin),
+            XilinxBenchmark("pack_modified", create_modified_context, pack),
+            XilinxBenchmark("write_modified", create_modified_context, write),
+        ]
+    return benchmarks
+
+
+def run_benchmarks(xilinx_format, repeat, zero_copy=False, name_filter=None):
+    """
+    Run the benchmarks for each device.
+
+    :param XilinxFormat xilinx_format:
+    :param int repeat: The number of measured iterations of each benchmark.
+    :param bool zero_copy: See :py:meth:`XilinxContextFactory.create`
+    :param Optional[str] name_filter: Only run the benchmarks whose name contains the filter.
+    :rtype: Dict[str,Dict[str,Any]]
+    :return: The results of each benchmark, by device and benchmark name (ie LX9/unpack).
+    """
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(xilinx_format))
+    results = OrderedDict()
+    for device_name in DEVICE_NAMES:
+        data = XilinxBitstreamGenerator(xilinx_format, BENCHMARK_SEED).generate(device_name)
+        fdri_format = xilinx_format.get_fdri_format(device_name)
+        for benchmark in create_benchmarks(xilinx_context_factory, fdri_format, data, zero_copy):
+            name = "{}/{}".format(device_name, benchmark.name)
+            if name_filter is not None and name_filter not in name:
+                continue
+            results[name] = benchmark.measure(repeat)
+    return results
+
+
+def compare_results(results, baseline, time_threshold, memory_threshold):
+    """
+    Compare results with a baseline. The peak memory is deterministic, it is gated with a tight
+    threshold. The median duration is gated with a looser one, unless the baseline median is
+    below :py:data:`MIN_GATED_DURATION`.
+
+    :param Dict[str,Dict[str,Any]] results: See :py:func:`run_benchmarks`
+    :param Dict[str,Dict[str,Any]] baseline: Results of a previous run.
+    :param float time_threshold: The ratio to the baseline median above which a duration is a
+        regression.
+    :param float memory_threshold: The ratio to the baseline peak memory above which a memory
+        usage is a regression.
+    :rtype: List[Tuple[str,str,float,Optional[bool]]]
+    :return: The benchmark name, the metric, the ratio to the baseline and whether it is a
+        regression (None if the metric is not gated), for each metric of each benchmark found
+        in the baseline.
+    """
+    comparisons = []
+    for name, result in results.items():
+        baseline_result = baseline.get(name)
+        if baseline_result is None:
+            continue
+        for metric, threshold in (("median", time_threshold), ("peak_memory", memory_threshold)):
+            value = result.get(metric)
+            baseline_value = baseline_result.get(metric)
+            if value is None or not baseline_value:
+                continue
+            ratio = float(value) / baseline_value
+            if metric == "median" and baseline_value < MIN_GATED_DURATION:
+                comparisons.append((name, metric, ratio, None))
+            else:
+                comparisons.append((name, metric, ratio, ratio > threshold))
+    return comparisons
+
+
+def format_result(name, result):
+    peak_memory = result["peak_memory"]
+    return "{:<36} min {:>9.3f} ms  median {:>9.3f} ms  peak {:>10}".format(
+        name,
+        result["min"] * 1000,
+        result["median"] * 1000,
+        "-" if peak_memory is None else "{:.1f} KiB".format(peak_memory / 1024.0),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Benchmark the parsing, modification and packing of synthetic Xilinx '
+                    'bitstreams and compare the results with a baseline.'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=30,
+        help='The number of measured iterations of each benchmark'
+    )
+    parser.add_argument(
+        '--filter',
+        metavar='NAME',
+        help='Only run the benchmarks whose name contains NAME (ie LX9/ or unpack)'
+    )
+    parser.add_argument(
+        '--zero-copy',
+        action='store_true',
+        help='Create the contexts in zero copy mode'
+    )
+    parser.add_argument(
+        '--baseline',
+        metavar='PATH',
+        default=DEFAULT_BASELINE_PATH,
+        help='The baseline results, defaults to benchmarks/baseline.json'
+    )
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Store the results as the new baseline instead of comparing them'
+    )
+    parser.add_argument(
+        '--time-threshold',
+        type=float,
+        default=2.0,
+        help='The ratio to the baseline median duration above which a result is reported as a '
+             'regression'
+    )
+    parser.add_argument(
+        '--memory-threshold',
+        type=float,
+        default=1.25,
+        help='The ratio to the baseline peak memory above which a result is reported as a '
+             'regression'
+    )
+    parser.add_argument(
+        '--output',
+        metavar='PATH',
+        help='Write the results to a JSON file'
+    )
+    args = parser.parse_args()
+
+    benchmark_results = run_benchmarks(
+        default_xilinx_formats(XilinxFormatBuilder()).build(),
+        args.repeat,
+        args.zero_copy,
+        args.filter,
+    )
+    for benchmark_name, benchmark_result in benchmark_results.items():
+        print(format_result(benchmark_name, benchmark_result))
+
+    report = OrderedDict([
+        ("python", platform.python_version()),
+        ("machine", platform.machine()),
+        ("zero_copy", args.zero_copy),
+        ("results", benchmark_results),
+    ])
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print("Saved the baseline to {}".format(args.baseline))
+        sys.exit(0)
+    if not os.path.exists(args.baseline):
+        print("No baseline found at {}".format(args.baseline))
+        sys.exit(0)
+
+    with open(args.baseline, "r") as f:
+        baseline_report = json.load(f)
+    if baseline_report.get("zero_copy") != args.zero_copy:
+        print("The baseline was recorded with zero_copy={}".format(baseline_report["zero_copy"]))
+    regression_count = 0
+    print("\nCompared to {} (time threshold {:.2f}x, memory threshold {:.2f}x):".format(
+        args.baseline,
+        args.time_threshold,
+        args.memory_threshold,
+    ))
+    for benchmark_name, metric, ratio, is_regression in compare_results(
+            benchmark_results,
+            baseline_report["results"],
+            args.time_threshold,
+            args.memory_threshold,
+    ):
+        if is_regression:
+            regression_count += 1
+        print("{:<36} {:<12} {:>6.2f}x{}".format(
+            benchmark_name,
+            metric,
+            ratio,
+            "  REGRESSION" if is_regression else "  (not gated)" if is_regression is None else "",
+        ))
+    sys.exit(1 if regression_count > 0 else 0)
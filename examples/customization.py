@@ -83,11 +83,12 @@ class CustomXilinxHeaderConverter(AbstractConverter):
 
 
 class CustomXilinxPacketsConverter(XilinxPacketsConverter):
-    def _create_type2_payload(self, data_stream, header):
+    def _create_type2_payload(self, word_count_data, payload_data, register_format):
         print("Creating type2 payload!")
         return super(CustomXilinxPacketsConverter, self)._create_type2_payload(
-            data_stream,
-            header,
+            word_count_data,
+            payload_data,
+            register_format,
         )
 
 
@@ -114,9 +115,9 @@ with open(lx9_bin, "rb") as f:
 bitstream_context = xilinx_context_factory.create(data)
 bitstream_object = bitstream_context.get_data()
 
-# In order to index the packets, the bitstream model unpacks them.
-# Therefore our custom converter is called and you should see a bunch of "Creating type2
-# payload!" messages in the console.
+# The packets are only unpacked when they are accessed. Looking up the FDRI packets calls our
+# custom converter and you should see a "Creating type2 payload!" message in the console.
+bitstream_object.unpack().get_packets_by_register_name("Fdri")
 header_object = bitstream_object.unpack().get_header()
 
 # At this point our custom unpacker for the header hasn't been hit yet. We'll get all the info
@@ -0,0 +1,67 @@
+import struct
+
+import pytest
+import six
+
+from bal_xilinx.format_cache import FORMAT_CACHE_DIRECTORY_ENV
+
+LX9_FDRI_PAYLOAD_SIZE = 263640 + 74880 + 1794 + 4
+LX9_IO_BLOCK_OFFSET = 263640 + 74880
+
+# A LX9 bitstream with a zeroed FDRI payload
+LX9_BITSTREAM_DATA = six.b(
+    # Header and sync word
+    "\xff\xff\xff\xff\xaa\x99\x55\x66"
+    # Idcode LX9
+    "\x31\xc2\x04\x00\x10\x93"
+    # Fdri type 2
+    "\x50\x60"
+) + struct.pack(">I", LX9_FDRI_PAYLOAD_SIZE // 2 - 2) + bytes(bytearray(LX9_FDRI_PAYLOAD_SIZE)) + \
+    six.b(
+        # Cmd DESYNC
+        "\x30\xa1\x00\x0d"
+    )
+LX9_FDRI_PAYLOAD_OFFSET = 8 + 6 + 2 + 4
+
+
+@pytest.fixture
+def lx9_bitstream_data():
+    """
+    The bytes of a LX9 bitstream with a zeroed FDRI payload.
+    """
+    return LX9_BITSTREAM_DATA
+
+
+@pytest.fixture
+def lx9_io_block_offset():
+    """
+    The offset of the io block within the LX9 bitstream.
+    """
+    return LX9_FDRI_PAYLOAD_OFFSET + LX9_IO_BLOCK_OFFSET
+
+
+@pytest.fixture
+def lx9_bitstream_path(tmpdir, lx9_bitstream_data):
+    """
+    The path of the LX9 bitstream written as lx9.bin in a temporary directory.
+    """
+    bitstream_path = str(tmpdir.join("lx9.bin"))
+    with open(bitstream_path, "wb") as f:
+        f.write(lx9_bitstream_data)
+    return bitstream_path
+
+
+@pytest.fixture(scope="session")
+def format_cache_directory(tmpdir_factory):
+    """
+    The directory of the compiled format cache used by the tests.
+    """
+    return str(tmpdir_factory.mktemp("format_cache"))
+
+
+@pytest.fixture(autouse=True)
+def use_format_cache_directory(monkeypatch, format_cache_directory):
+    """
+    Keep the tests from writing to the format cache of the user.
+    """
+    monkeypatch.setenv(FORMAT_CACHE_DIRECTORY_ENV, format_cache_directory)
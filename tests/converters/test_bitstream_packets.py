@@ -1,7 +1,17 @@
+import io
+
 import pytest
 import six
 
+from bal_xilinx.analyzers.compression_analyzer import XilinxCompressionAnalyzer
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+from bal_xilinx.context import XilinxContextFactory
+from bal_xilinx.converters import pack_into
 from bal_xilinx.converters.bitstream_packets import XilinxCtypePacketHeader
+from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+from bal_xilinx.generator import XilinxBitstreamGenerator
+from bal_xilinx.modifiers.pin_modifier import XilinxPinModifer
 
 
 class XilinxCtypePacketHeaderTestCase:
@@ -50,3 +60,134 @@ def test_xilinx_ctype_packet_header_(test_case):
     assert header.opcode == test_case.opcode
     assert header.register_address == test_case.register_address
     assert header.word_count == test_case.word_count
+
+
+BITSTREAM_DATA = six.b(
+    # Header and sync word
+    "\xff\xff\xff\xff\xaa\x99\x55\x66"
+    # NOOP
+    "\x20\x00"
+    # Cmd RCRC
+    "\x30\xa1\x00\x07"
+    # Idcode LX9
+    "\x31\xc2\x04\x00\x10\x93"
+    # Ctl
+    "\x30\xc1\x00\x81"
+    # Cmd DESYNC
+    "\x30\xa1\x00\x0d"
+    # Tail
+    "\x20\x00\x20\x00"
+)
+
+
+def test_xilinx_packets_lazy_unpack():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(
+        default_xilinx_formats(XilinxFormatBuilder()).build()
+    ))
+    bitstream = xilinx_context_factory.create(BITSTREAM_DATA).get_data().unpack()
+    packets = bitstream.get_packets().unpack()
+    assert len(packets) == 6
+    assert all(packet_object is None for packet_object in packets._items)
+
+    idcode_packets = bitstream.get_packets_by_register_name("Idcode")
+    assert len(idcode_packets) == 1
+    assert idcode_packets[0].get_payload().unpack().get("idcode").unpack().value_name == "LX9"
+    assert [packet_object is not None for packet_object in packets._items] == \
+        [False, False, True, False, False, False]
+
+    assert packets[-1].get_bytes() == six.b("\x20\x00\x20\x00")
+    assert bitstream.get_packets().pack() == BITSTREAM_DATA[8:]
+
+
+def test_xilinx_packets_zero_copy():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(
+        default_xilinx_formats(XilinxFormatBuilder()).build()
+    ))
+    bitstream_object = xilinx_context_factory.create(BITSTREAM_DATA, zero_copy=True).get_data()
+    bitstream = bitstream_object.unpack()
+    idcode_packet = bitstream.get_packets_by_register_name("Idcode")[0]
+    idcode_payload_bytes = idcode_packet.get_payload().get_bytes()
+    assert isinstance(idcode_payload_bytes, memoryview)
+    assert idcode_payload_bytes.obj is BITSTREAM_DATA
+    assert idcode_payload_bytes == six.b("\x04\x00\x10\x93")
+
+    bitstream_object.unpack_all()
+    bitstream_object.synchronize(True)
+    assert bitstream_object.pack() == BITSTREAM_DATA
+
+
+def test_xilinx_packets_incremental_pack():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(
+        default_xilinx_formats(XilinxFormatBuilder()).build()
+    ))
+    packets_object = xilinx_context_factory.create(BITSTREAM_DATA).get_data().unpack()\
+        .get_packets()
+    packets = packets_object.unpack()
+    ctl_packet_object = packets[3]
+    ctl_packet_object.get_model().get_payload().unpack().get("dec").unpack().set_value(1)
+    ctl_packet_object.synchronize()
+
+    # Only the modified packet is encoded again, the others are spliced from the packets data
+    assert packets_object.converter.pack(packets) == \
+        BITSTREAM_DATA[8:20] + six.b("\x30\xc1\x00\xc1") + BITSTREAM_DATA[24:]
+    assert [packet_object is not None for packet_object in packets._items] == \
+        [False, False, False, True, False, False]
+
+
+def test_xilinx_packets_device_detection():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(
+        default_xilinx_formats(XilinxFormatBuilder()).build()
+    ))
+    data = XilinxBitstreamGenerator(xilinx_context_factory.format, seed=1).generate("LX9")
+    bitstream_context = xilinx_context_factory.create(data)
+    assert bitstream_context.id_code is None
+    fdri_packets = bitstream_context.get_data().unpack().get_packets_by_register_name("Fdri")
+    # The device is set when the packets are unpacked, the FDRI payload is typed in the same pass
+    assert bitstream_context.id_code == "LX9"
+    assert [packet.get_payload().get_model_type() for packet in fdri_packets] == \
+        ["XilinxFdriPayload"]
+    fdri_packets[0].get_payload().unpack_all()
+
+    # The FDRI packets that do not write the whole configuration hold raw payloads
+    compressed_data, _ = bitstream_context.create_analyzer(XilinxCompressionAnalyzer).analyze()
+    compressed_context = xilinx_context_factory.create(compressed_data)
+    compressed_context.get_data().unpack_all()
+    assert compressed_context.id_code == "LX9"
+    fdri_packets = compressed_context.get_data().unpack().get_packets_by_register_name("Fdri")
+    assert max(len(packet.get_payload().get_bytes()) for packet in fdri_packets) > 500
+    assert all(
+        packet.get_payload().get_model_type() == "XilinxType2PayloadInterface"
+        for packet in fdri_packets
+    )
+    assert compressed_context.get_data().pack() == compressed_data
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_xilinx_bitstream_pack_into(zero_copy):
+    xilinx_format = default_xilinx_formats(XilinxFormatBuilder()).build()
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(xilinx_format))
+    data = XilinxBitstreamGenerator(xilinx_format, seed=1).generate("LX9")
+    bitstream_context = xilinx_context_factory.create(
+        bytearray(data) if zero_copy else data,
+        zero_copy
+    )
+    bitstream_context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+    bitstream_object = bitstream_context.get_data()
+
+    # Every data object is out of sync, each converter writes its parts
+    bitstream_object.unpack_all()
+    bitstream_object.synchronize(True)
+    writer = io.BytesIO()
+    pack_into(bitstream_object, writer)
+    assert writer.getvalue() == data
+
+    pin_name = xilinx_format.get_fdri_format("LX9").io_block_format[0].name
+    bitstream_context.create_modifier(XilinxPinModifer).modify(pin_name, True)
+    bitstream = bitstream_object.get_model()
+    ctl_payload = bitstream.get_packets_by_register_name("Ctl")[0].get_payload()
+    ctl_payload.get_model().get("dec").get_model().set_value(1)
+    bitstream_object.synchronize()
+    writer = io.BytesIO()
+    pack_into(bitstream_object, writer)
+    assert writer.getvalue() != data
+    assert writer.getvalue() == bytes(bitstream_object.pack())
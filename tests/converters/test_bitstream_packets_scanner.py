@@ -0,0 +1,85 @@
+import pytest
+import six
+
+from bal_xilinx.converters.bitstream_packets_scanner import XilinxPacketScanner, \
+    decode_packet_header, encode_packet_header
+from bal_xilinx.defaults import default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+
+XILINX_FORMAT = default_xilinx_formats(XilinxFormatBuilder()).build()
+
+
+class XilinxPacketHeaderWordTestCase:
+    def __init__(self, header_word, type_arg, opcode, register_address, word_count):
+        # type: (int, int, int, int, int) -> None
+        self.header_word = header_word
+        self.type = type_arg
+        self.opcode = opcode
+        self.register_address = register_address
+        self.word_count = word_count
+
+
+XILINX_PACKET_HEADER_WORD_TEST_CASES = [
+    XilinxPacketHeaderWordTestCase(0x30a1, 1, 2, 5, 1),
+    XilinxPacketHeaderWordTestCase(0x2000, 1, 0, 0, 0),
+    XilinxPacketHeaderWordTestCase(0x31c2, 1, 2, 14, 2),
+    XilinxPacketHeaderWordTestCase(0x5060, 2, 2, 3, 0),
+]
+
+
+@pytest.mark.parametrize("test_case", XILINX_PACKET_HEADER_WORD_TEST_CASES)
+def test_decode_packet_header(test_case):
+    # type: (XilinxPacketHeaderWordTestCase) -> None
+    assert decode_packet_header(test_case.header_word) == (
+        test_case.type,
+        test_case.opcode,
+        test_case.register_address,
+        test_case.word_count,
+    )
+
+
+@pytest.mark.parametrize("test_case", XILINX_PACKET_HEADER_WORD_TEST_CASES)
+def test_encode_packet_header(test_case):
+    # type: (XilinxPacketHeaderWordTestCase) -> None
+    assert encode_packet_header(
+        test_case.type,
+        test_case.opcode,
+        test_case.register_address,
+        test_case.word_count,
+    ) == test_case.header_word
+
+
+PACKETS_DATA = six.b(
+    # NOOP
+    "\x20\x00"
+    # Cmd RCRC
+    "\x30\xa1\x00\x07"
+    # Idcode LX9
+    "\x31\xc2\x04\x00\x10\x93"
+    # Fdri type 2 packet with a word count of 1
+    "\x50\x60\x00\x00\x00\x01\x01\x02\x03\x04\x05\x06"
+    # Cmd DESYNC
+    "\x30\xa1\x00\x0d"
+    # Tail
+    "\x20\x00\x20\x00"
+)
+
+
+def test_xilinx_packet_scanner_scan():
+    table = XilinxPacketScanner(XILINX_FORMAT).scan(PACKETS_DATA)
+    assert len(table) == 5
+    assert list(table.offsets) == [0, 2, 6, 12, 24]
+    assert list(table.packet_types) == [1, 1, 1, 2, 1]
+    assert list(table.opcodes) == [0, 2, 2, 2, 2]
+    assert list(table.register_addresses) == [0, 5, 14, 3, 5]
+    assert list(table.word_counts) == [0, 1, 2, 1, 1]
+    assert list(table.payload_sizes) == [0, 2, 4, 6, 2]
+    assert [f.name for f in table.register_formats] == ["Crc", "Cmd", "Idcode", "Fdri", "Cmd"]
+    assert table.get_packet_span(3) == (12, 24)
+    assert table.get_payload_span(3) == (18, 24)
+    assert table.tail_offset == 28
+
+
+def test_xilinx_packet_scanner_type2_after_noop():
+    with pytest.raises(ValueError):
+        XilinxPacketScanner(XILINX_FORMAT).scan(six.b("\x00\x00\x50\x60\x00\x00\x00\x00"))
@@ -0,0 +1,86 @@
+import struct
+from collections import OrderedDict
+
+import pytest
+import six
+
+from bal_xilinx.context import XilinxContextFactory
+from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+from bal_xilinx.modifiers.pin_modifier import XilinxPinModifer
+
+
+def create_context(bitstream_data, zero_copy):
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(
+        default_xilinx_formats(XilinxFormatBuilder()).build()
+    ))
+    if zero_copy:
+        bitstream_context = xilinx_context_factory.create(bytearray(bitstream_data), True)
+    else:
+        bitstream_context = xilinx_context_factory.create(bitstream_data)
+    bitstream_context.id_code = "LX9"
+    return bitstream_context
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_xilinx_pin_modifier_modify_many(zero_copy, lx9_bitstream_data, lx9_io_block_offset):
+    bitstream_context = create_context(lx9_bitstream_data, zero_copy)
+    bitstream_context.create_modifier(XilinxPinModifer).modify_many(OrderedDict([
+        ("P70", True),
+        ("P67", False),
+    ]))
+    bitstream_object = bitstream_context.get_data()
+    bitstream_object.synchronize()
+    packed_data = bitstream_object.pack()
+
+    io_block_offset = lx9_io_block_offset
+    assert packed_data[:io_block_offset] == lx9_bitstream_data[:io_block_offset]
+    assert packed_data[io_block_offset:io_block_offset + 24] == six.b(
+        "\x80\x01\x00\x00\x00\x11\x00\x01"
+        "\x00\x00\x00\x00\x00\x00\x00\x00"
+        "\x80\x00\x00\x00\x00\x24\x00\x0b"
+    )
+    assert packed_data[io_block_offset + 24:] == lx9_bitstream_data[io_block_offset + 24:]
+
+
+def test_xilinx_pin_modifier_modify_many_invalid_pin(lx9_bitstream_data):
+    bitstream_context = create_context(lx9_bitstream_data, True)
+    with pytest.raises(ValueError):
+        bitstream_context.create_modifier(XilinxPinModifer).modify_many(OrderedDict([
+            ("P70", True),
+            ("P0", True),
+        ]))
+    # The pins are validated before any of them is modified
+    assert bitstream_context.patch_buffer.is_dirty() is False
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_xilinx_pin_modifier_modify_many_small_fdri_write(
+        zero_copy,
+        lx9_bitstream_data,
+        lx9_io_block_offset
+):
+    # A second Fdri packet writing a single frame and its CRC, before the Cmd DESYNC packet. The
+    # type 2 packet follows an empty type 1 Fdri packet.
+    small_fdri_payload_size = 130 + 4
+    bitstream_data = lx9_bitstream_data[:-4] + six.b("\x30\x40\x50\x60") + \
+        struct.pack(">I", small_fdri_payload_size // 2 - 2) + \
+        six.b("\x5a") * small_fdri_payload_size + lx9_bitstream_data[-4:]
+    bitstream_context = create_context(bitstream_data, zero_copy)
+    bitstream_context.create_modifier(XilinxPinModifer).modify_many(OrderedDict([
+        ("P70", True),
+        ("P67", False),
+    ]))
+    bitstream_object = bitstream_context.get_data()
+    bitstream_object.synchronize()
+    packed_data = bitstream_object.pack()
+
+    io_block_offset = lx9_io_block_offset
+    assert packed_data[:io_block_offset] == bitstream_data[:io_block_offset]
+    assert packed_data[io_block_offset:io_block_offset + 24] == six.b(
+        "\x80\x01\x00\x00\x00\x11\x00\x01"
+        "\x00\x00\x00\x00\x00\x00\x00\x00"
+        "\x80\x00\x00\x00\x00\x24\x00\x0b"
+    )
+    # The small Fdri packet is left untouched
+    assert packed_data[io_block_offset + 24:] == bitstream_data[io_block_offset + 24:]
@@ -0,0 +1,43 @@
+import pytest
+import six
+
+from bal_xilinx.buffer import XilinxPatchBuffer
+
+
+def test_xilinx_patch_buffer_dirty_ranges():
+    patch_buffer = XilinxPatchBuffer(memoryview(bytearray(32)))
+    assert patch_buffer.patch(4, six.b("\x00\x00")) is False
+    assert patch_buffer.is_dirty() is False
+
+    assert patch_buffer.patch(20, six.b("\x01\x01")) is True
+    assert patch_buffer.patch(4, six.b("\x01\x01")) is True
+    assert patch_buffer.patch(8, six.b("\x01")) is True
+    assert patch_buffer.get_dirty_ranges() == [(4, 6), (8, 9), (20, 22)]
+
+    # Adjacent and overlapping ranges are merged
+    assert patch_buffer.patch(6, six.b("\x02\x02")) is True
+    assert patch_buffer.patch(18, six.b("\x02\x02\x02")) is True
+    assert patch_buffer.get_dirty_ranges() == [(4, 9), (18, 22)]
+    assert patch_buffer.get_bytes()[4:9] == six.b("\x01\x01\x02\x02\x01")
+
+    with pytest.raises(ValueError):
+        patch_buffer.patch(31, six.b("\x01\x01"))
+
+
+def test_xilinx_patch_buffer_get_offset():
+    data = memoryview(bytearray(32))
+    patch_buffer = XilinxPatchBuffer(data)
+    assert patch_buffer.get_offset(data[10:20][5:]) == 15
+    assert patch_buffer.get_offset(memoryview(bytearray(4))) is None
+    assert patch_buffer.get_offset(six.b("\x00")) is None
+
+
+def test_xilinx_patch_buffer_pop_patches():
+    patch_buffer = XilinxPatchBuffer(memoryview(bytearray(32)))
+    for index in range(100):
+        patch_buffer.patch(8, six.b(chr(index % 2 + 1) * 2))
+    patch_buffer.patch(8, six.b("\x04"))
+    patch_buffer.patch(16, six.b("\x01"))
+    patch_buffer.patch(16, six.b("\x00"))
+    assert patch_buffer.pop_patches() == [(8, six.b("\x04\x02"))]
+    assert patch_buffer.pop_patches() == []
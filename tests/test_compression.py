@@ -0,0 +1,124 @@
+from bal_xilinx.analyzers.compression_analyzer import XilinxCompressionAnalyzer
+from bal_xilinx.analyzers.frame_address_analyzer import XilinxFrameAddressAnalyzer
+from bal_xilinx.context import XilinxContextFactory
+from bal_xilinx.converters.bitstream_packets_scanner import XilinxPacketScanner
+from bal_xilinx.crc import XilinxCrcCalculator
+from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+from bal_xilinx.frames import XilinxFrameAddress
+from bal_xilinx.generator import XilinxBitstreamGenerator
+
+XILINX_FORMAT = default_xilinx_formats(XilinxFormatBuilder()).build()
+
+
+def load_frames(address_index, payload, packets_data):
+    """
+    Write the frames of a compressed bitstream to a FDRI payload, the multiple frame writes
+    repeat the last frame written. The FDRI writes are checked to be made of whole frames, but
+    the one reaching the end of the payload, and the multiple frame writes to target full
+    frames.
+    """
+    frame_size = address_index.frame_size
+    table = XilinxPacketScanner(XILINX_FORMAT).scan(packets_data)
+    mfw_command = XILINX_FORMAT.get_register_format_by_name("Cmd").attributes[0]\
+        .get_value_by_name("MFW")
+    far_values = {}
+    last_frame = None
+    is_mfw = False
+    for index in range(len(table)):
+        register_format = table.register_formats[index]
+        payload_start, payload_end = table.get_payload_span(index)
+        values = None
+        if table.packet_types[index] == 1 and payload_end - payload_start == register_format.size:
+            values = register_format.codec.decode(packets_data[payload_start:payload_end])
+        if register_format.name in ("FarMaj", "FarMin"):
+            for attribute_format, value in zip(register_format.attributes, values):
+                far_values[attribute_format.name.lower()] = value
+            continue
+        address = XilinxFrameAddress(
+            far_values.get("blk"),
+            far_values.get("row"),
+            far_values.get("major"),
+            far_values.get("minor")
+        )
+        if register_format.name == "Cmd":
+            is_mfw = values[0] == mfw_command
+        elif register_format.name == "Mfwr":
+            assert is_mfw
+            offset, size = address_index.get_frame_span(address)
+            assert size == frame_size == len(last_frame)
+            assert offset % frame_size == 0
+            payload[offset:offset + size] = last_frame
+        elif register_format.name == "Fdri" and table.packet_types[index] == 2:
+            offset, _ = address_index.get_frame_span(address)
+            frames_data = packets_data[payload_start:payload_end - XilinxCrcCalculator.CRC_SIZE]
+            assert offset % frame_size == 0
+            assert len(frames_data) % frame_size == 0 or \
+                offset + len(frames_data) == address_index.size
+            payload[offset:offset + len(frames_data)] = frames_data
+            end_index = address_index.get_index_by_offset(offset + len(frames_data) - 1)
+            last_offset = address_index.offsets[end_index]
+            last_frame = payload[last_offset:last_offset + address_index.sizes[end_index]]
+
+
+def test_xilinx_compression_analyzer():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(XILINX_FORMAT))
+    data = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate("LX9", density=0.2)
+    bitstream_context = xilinx_context_factory.create(data)
+    address_index = bitstream_context.create_analyzer(XilinxFrameAddressAnalyzer).analyze()
+
+    compressed_data, report = bitstream_context.create_analyzer(XilinxCompressionAnalyzer)\
+        .analyze()
+    assert report.original_size == len(data)
+    assert report.compressed_size == len(compressed_data)
+    assert report.get_saved_size() > len(data) // 3
+    assert report.group_count == 1
+    assert report.frame_count > report.repeated_frame_count > report.frame_count // 2
+    assert report.get_load_time_saved(bus_width=8) == report.get_load_time_saved() / 8
+
+    packets_offset = compressed_data.find(XILINX_FORMAT.sync_word) + \
+        len(XILINX_FORMAT.sync_word)
+    packets_data = compressed_data[packets_offset:]
+    checks = XilinxCrcCalculator(XILINX_FORMAT).get_checks(packets_data)
+    assert len(checks) > 0
+    assert all(check.is_valid() for check in checks)
+
+    payload_start = data.find(XILINX_FORMAT.sync_word) + len(XILINX_FORMAT.sync_word) + \
+        address_index.payload_offset
+    expected_payload = data[payload_start:payload_start + address_index.size]
+    payload = bytearray(len(expected_payload))
+    load_frames(address_index, payload, packets_data)
+    assert payload == expected_payload
+
+    # Without duplicate groups, the frames are written by a single FDRI write
+    _, report = bitstream_context.create_analyzer(XilinxCompressionAnalyzer)\
+        .analyze(min_count=len(address_index))
+    assert report.repeated_frame_count == 0
+    assert report.get_saved_size() < 0
+
+
+def test_xilinx_compression_padding_frames():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(XILINX_FORMAT))
+    # The LX45T bitstreams have a second, small FDRI packet
+    data = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate("LX45T", density=0.2)
+    bitstream_context = xilinx_context_factory.create(data)
+    address_index = bitstream_context.create_analyzer(XilinxFrameAddressAnalyzer).analyze()
+    compressed_data, report = bitstream_context.create_analyzer(XilinxCompressionAnalyzer)\
+        .analyze()
+    assert report.repeated_frame_count > 0
+
+    packets_offset = compressed_data.find(XILINX_FORMAT.sync_word) + \
+        len(XILINX_FORMAT.sync_word)
+    packets_data = compressed_data[packets_offset:]
+    checks = XilinxCrcCalculator(XILINX_FORMAT).get_checks(packets_data)
+    # The small FDRI packet follows the Crc write
+    assert [check.name for check in checks[-2:]] == ["Crc", "FdriTail"]
+    assert all(check.is_valid() for check in checks)
+
+    # The small FDRI packet is loaded after the frames of the compressed one
+    original_packets_offset = data.find(XILINX_FORMAT.sync_word) + len(XILINX_FORMAT.sync_word)
+    expected_payload = bytearray(address_index.size)
+    load_frames(address_index, expected_payload, data[original_packets_offset:])
+    payload = bytearray(address_index.size)
+    load_frames(address_index, payload, packets_data)
+    assert payload == expected_payload
@@ -0,0 +1,63 @@
+import six
+
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+from bal_xilinx.analyzers.encryption_analyzer import XilinxEncryptionAnalyzer
+from bal_xilinx.context import XilinxContextFactory, get_class_name, import_by_name
+from bal_xilinx.defaults import DEFAULT_XILINX_ANALYZERS, DEFAULT_XILINX_CONVERTERS, \
+    DEFAULT_XILINX_MODIFIERS, default_xilinx_context, default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+
+BITSTREAM_DATA = six.b(
+    # Header and sync word
+    "\xff\xff\xff\xff\xaa\x99\x55\x66"
+    # NOOP
+    "\x20\x00"
+    # Idcode LX9
+    "\x31\xc2\x04\x00\x10\x93"
+    # Cmd DESYNC
+    "\x30\xa1\x00\x0d"
+    # Tail
+    "\x20\x00"
+)
+
+
+def test_xilinx_context_factory_create_from_path(tmpdir):
+    bitstream_path = tmpdir.join("bitstream.bin")
+    bitstream_path.write_binary(BITSTREAM_DATA)
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(
+        default_xilinx_formats(XilinxFormatBuilder()).build()
+    ))
+
+    bitstream_context = xilinx_context_factory.create_from_path(str(bitstream_path))
+    assert bitstream_context.zero_copy is True
+    assert bitstream_context.get_data().get_bytes() == BITSTREAM_DATA
+    assert bitstream_context.create_analyzer(XilinxDeviceAnalyzer).analyze() == "LX9"
+
+    idcode_packet = bitstream_context.get_data().unpack().get_packets_by_register_name("Idcode")[0]
+    idcode_packet.get_payload().unpack().get("idcode").unpack().set_value(0x04001093 + 1)
+    bitstream_context.get_data().synchronize()
+    assert bitstream_context.get_data().pack() != BITSTREAM_DATA
+    assert bitstream_path.read_binary() == BITSTREAM_DATA
+
+
+def test_xilinx_context_factory_default_registrations():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(
+        default_xilinx_formats(XilinxFormatBuilder()).build()
+    ))
+    bitstream_context = xilinx_context_factory.create(BITSTREAM_DATA)
+    for data_model_interface_name, converter_name in DEFAULT_XILINX_CONVERTERS:
+        assert import_by_name(data_model_interface_name) is not None
+        assert import_by_name(converter_name) is not None
+    registrations = [
+        (bitstream_context.create_analyzer, DEFAULT_XILINX_ANALYZERS),
+        (bitstream_context.create_modifier, DEFAULT_XILINX_MODIFIERS),
+    ]
+    for create_implementation, implementation_names in registrations:
+        for interface_name, implementation_name in implementation_names:
+            implementation = create_implementation(import_by_name(interface_name))
+            assert get_class_name(type(implementation)) == implementation_name
+
+    # Classes registered as usual take precedence over the lazy registrations
+    xilinx_context_factory.register_analyzer(XilinxDeviceAnalyzer, XilinxEncryptionAnalyzer)
+    analyzer = xilinx_context_factory.create(BITSTREAM_DATA).create_analyzer(XilinxDeviceAnalyzer)
+    assert isinstance(analyzer, XilinxEncryptionAnalyzer)
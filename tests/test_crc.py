@@ -0,0 +1,60 @@
+import struct
+
+import six
+
+from bal_xilinx.crc import XilinxCrcEngine, XilinxCrcCalculator, CRC32C_POLYNOMIAL
+from bal_xilinx.defaults import default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+
+PACKETS_DATA = six.b(
+    # Cmd RCRC
+    "\x30\xa1\x00\x07"
+    # Idcode LX9
+    "\x31\xc2\x04\x00\x10\x93"
+    # Crc
+    "\x30\x02\x00\x00\x00\x00"
+    # Cmd DESYNC
+    "\x30\xa1\x00\x0d"
+)
+
+
+def crc_bitwise(crc, register_address, words):
+    for word in words:
+        value = (register_address << 16) | word
+        for bit_index in range(22):
+            if ((value >> bit_index) ^ crc) & 1:
+                crc = (crc >> 1) ^ CRC32C_POLYNOMIAL
+            else:
+                crc >>= 1
+    return crc
+
+
+def test_xilinx_crc_engine():
+    engine = XilinxCrcEngine()
+    words = [0x0400, 0x1093, 0xffff, 0x0000, 0x1234]
+    assert engine.update(0, 14, words) == crc_bitwise(0, 14, words)
+    assert engine.update(0x5a5a5a5a, 3, words) == crc_bitwise(0x5a5a5a5a, 3, words)
+
+    # The CRC can be updated from a single modified word
+    modified_words = list(words)
+    modified_words[1] ^= 0x8001
+    assert engine.update(0, 3, words) ^ engine.get_word_delta(0x8001, 3) == \
+        engine.update(0, 3, modified_words)
+
+
+def test_xilinx_crc_calculator():
+    calculator = XilinxCrcCalculator(default_xilinx_formats(XilinxFormatBuilder()).build())
+    checks = calculator.get_checks(PACKETS_DATA)
+    assert len(checks) == 1
+    assert checks[0].name == "Crc"
+    assert checks[0].offset == 12
+    assert checks[0].stored_value == 0
+    assert checks[0].computed_value == crc_bitwise(0, 14, [0x0400, 0x1093])
+
+    # Patch the Idcode and update the stored CRC from the patch only
+    valid_packets_data = bytearray(PACKETS_DATA)
+    valid_packets_data[12:16] = struct.pack(">I", checks[0].computed_value)
+    patched_packets_data = bytearray(valid_packets_data)
+    patched_packets_data[9] ^= 0x01
+    checks = calculator.update_checks(bytes(patched_packets_data), [(9, six.b("\x01"))])
+    assert checks[0].computed_value == crc_bitwise(0, 14, [0x0400, 0x1092])
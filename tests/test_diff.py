@@ -0,0 +1,96 @@
+import pytest
+
+from bal_xilinx.analyzers.frame_diff_analyzer import XilinxFrameDiffAnalyzer
+from bal_xilinx.analyzers.frame_matrix_analyzer import XilinxFrameMatrixAnalyzer
+from bal_xilinx.context import XilinxContextFactory
+from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
+from bal_xilinx.converters.bitstream_packets_scanner import XilinxPacketScanner
+from bal_xilinx.diff import XilinxBitstreamDiffer, get_changed_ranges
+from bal_xilinx.format import XilinxFormatBuilder
+from bal_xilinx.generator import XilinxBitstreamGenerator
+from bal_xilinx.modifiers.pin_modifier import XilinxPinModifer
+
+XILINX_FORMAT = default_xilinx_formats(XilinxFormatBuilder()).build()
+
+
+@pytest.mark.parametrize("old_bytes,new_bytes,expected_ranges", [
+    (b"\x00" * 8, b"\x00" * 8, []),
+    (b"\x00" * 8, b"\x00\x01\x00\x00\x00\x00\x01\x00", [(0, 2), (6, 2)]),
+    (b"\x00" * 8, b"\x00\x00\x01\x01\x01\x00\x00\x00", [(2, 4)]),
+    (b"\xff" * 6, b"\xff\xff\xff\xff\xff\xfe", [(4, 2)]),
+])
+def test_get_changed_ranges(old_bytes, new_bytes, expected_ranges):
+    assert get_changed_ranges(old_bytes, new_bytes) == expected_ranges
+
+
+def test_xilinx_frame_diff_analyzer():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(XILINX_FORMAT))
+    data = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate("LX9")
+    old_context = xilinx_context_factory.create(data)
+    new_context = xilinx_context_factory.create(data)
+    assert old_context.create_analyzer(XilinxFrameDiffAnalyzer).analyze(new_context).is_empty()
+
+    frame_matrix = new_context.create_analyzer(XilinxFrameMatrixAnalyzer).analyze()
+    frame_table = frame_matrix.frame_table
+    for index in [10, 11, len(frame_table) - 1]:
+        frame = bytearray(frame_matrix.get_frame(index))
+        frame[-1] ^= 0x01
+        frame_matrix.set_frame(index, bytes(frame))
+    fdri_format = XILINX_FORMAT.get_fdri_format("LX9")
+    pin_format = fdri_format.io_block_format[0]
+    old_pin_on = old_context.get_data().unpack().get_packets_by_register_name("Fdri")[0]\
+        .get_payload().unpack().get_io_block().pack()[pin_format.offset] == \
+        bytearray(pin_format.on_value)[0]
+    new_context.create_modifier(XilinxPinModifer).modify(pin_format.name, not old_pin_on)
+    ctl_payload = new_context.get_data().unpack().get_packets_by_register_name("Ctl")[0]\
+        .get_payload()
+    ctl_payload.unpack().get("dec").unpack().set_value(1)
+
+    bitstream_diff = old_context.create_analyzer(XilinxFrameDiffAnalyzer).analyze(new_context)
+    assert [frame.index for frame in bitstream_diff.frames] == [10, 11, len(frame_table) - 1]
+    frame = bitstream_diff.frames[0]
+    assert (frame.row, frame.major, frame.minor) == frame_table.get_frame_coordinates(10)
+    assert frame.major_name == frame_table.major_formats[10].name
+    assert bitstream_diff.bram_ranges == []
+    assert pin_format.name in bitstream_diff.pins
+    assert [register.register_name for register in bitstream_diff.registers] == ["Ctl"]
+    assert bitstream_diff.registers[0].old_values["dec"] == 0
+    assert bitstream_diff.registers[0].new_values["dec"] == 1
+
+
+def test_xilinx_frame_diff_analyzer_device_mismatch():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(XILINX_FORMAT))
+    generator = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1)
+    old_context = xilinx_context_factory.create(generator.generate("LX9"))
+    new_context = xilinx_context_factory.create(generator.generate("LX45T"))
+    with pytest.raises(ValueError):
+        old_context.create_analyzer(XilinxFrameDiffAnalyzer).analyze(new_context)
+
+
+def test_xilinx_bitstream_differ_small_fdri_write():
+    data = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate("LX45T")
+    packets_offset = data.find(XILINX_FORMAT.sync_word) + len(XILINX_FORMAT.sync_word)
+    old_packets_data = data[packets_offset:]
+    table = XilinxPacketScanner(XILINX_FORMAT).scan(old_packets_data)
+    fdri_indexes = table.get_packet_indexes_by_register_name("Fdri")
+    # The second, small FDRI packet follows the one writing the device
+    assert len(fdri_indexes) == 2
+    fdri_index = table.get_fdri_packet_index(
+        XILINX_FORMAT.get_fdri_format("LX45T").get_payload_size()
+    )
+    payload_start, _ = table.get_payload_span(fdri_index)
+    small_payload_start, _ = table.get_payload_span(fdri_indexes[-1])
+    assert fdri_index != fdri_indexes[-1]
+
+    new_packets_data = bytearray(old_packets_data)
+    new_packets_data[payload_start + 5] ^= 0x01
+    new_packets_data[small_payload_start] ^= 0x01
+    bitstream_diff = XilinxBitstreamDiffer(XILINX_FORMAT).diff(
+        "LX45T",
+        old_packets_data,
+        bytes(new_packets_data)
+    )
+    # The ranges are aligned on words
+    assert bitstream_diff.logic_ranges == [(4, 2)]
+    assert [frame.index for frame in bitstream_diff.frames] == [0]
+    assert bitstream_diff.registers == []
@@ -3,7 +3,9 @@ import ctypes
 import pytest
 import six
 
-from bal_xilinx.format import XilinxRegisterFormatCtype
+from bal_xilinx.data_model import XilinxType1Payload, XilinxFdriLogicMajor, XilinxFdriLogicFrame
+from bal_xilinx.defaults import default_xilinx_formats
+from bal_xilinx.format import XilinxRegisterFormatCtype, XilinxFormatBuilder, XilinxRegisterCodec
 
 
 class XilinxRegisterFormatCtypeTestCase:
@@ -78,5 +80,43 @@ def test_xilinx_register_format_ctype_class(test_case):
 def test_xilinx_register_format_ctype_class_from_buffer_copy(test_case):
     class_definition = XilinxRegisterFormatCtype(test_case.name, test_case.fields)
     xilinx_register_format_ctype = class_definition.from_buffer_copy(test_case.raw_bytes)
-    import ipdb; ipdb.set_trace()
     assert xilinx_register_format_ctype.values == test_case.values
+
+
+def test_xilinx_format_model_classes():
+    xilinx_format = default_xilinx_formats(XilinxFormatBuilder()).build()
+
+    idcode_format = xilinx_format.get_register_format_by_name("Idcode")
+    assert issubclass(idcode_format.payload_model, XilinxType1Payload)
+    assert idcode_format.payload_model.__name__ == "XilinxIdcodePayload"
+    assert idcode_format.payload_model.__doc__ == idcode_format.description
+    assert [m.__name__ for m in idcode_format.attribute_models] == ["IdcodeValue"]
+
+    lx9_fdri_format = xilinx_format.get_fdri_format("LX9")
+    for row_format in lx9_fdri_format.logic_block_format:
+        for major_format in row_format:
+            assert issubclass(major_format.major_model, XilinxFdriLogicMajor)
+            assert len(major_format.frame_models) == major_format.frame_count
+            for frame_index, frame_model in enumerate(major_format.frame_models):
+                assert issubclass(frame_model, XilinxFdriLogicFrame)
+                if frame_index < len(major_format.frame_descriptions):
+                    assert frame_model.__doc__ == major_format.frame_descriptions[frame_index]
+
+
+@pytest.mark.parametrize("test_case", XILINX_REGISTER_FORMAT_CTYPE_TEST_CASES)
+def test_xilinx_register_codec(test_case):
+    codec = XilinxRegisterCodec([bit_size for _, _, bit_size in test_case.fields])
+    raw_bytes = test_case.raw_bytes[:codec.size]
+    assert codec.decode(raw_bytes) == tuple(test_case.values)
+    assert codec.encode(*test_case.values) == raw_bytes
+
+    attributes_values = codec.decode_many([raw_bytes, raw_bytes, raw_bytes])
+    assert len(attributes_values) == len(test_case.fields)
+    for attribute_values, value in zip(attributes_values, test_case.values):
+        assert list(attribute_values) == [value, value, value]
+
+
+def test_xilinx_register_codec_value_overflow():
+    codec = XilinxRegisterCodec([4, 12])
+    with pytest.raises(ValueError):
+        codec.encode(16, 0)
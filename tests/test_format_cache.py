@@ -0,0 +1,70 @@
+import os
+
+from bal_xilinx.defaults import DEFAULT_XILINX_CONFIGS, default_xilinx_format, \
+    get_default_xilinx_config_path
+from bal_xilinx import format_cache as format_cache_module
+from bal_xilinx.format import XilinxFormat
+from bal_xilinx.format_cache import XilinxFormatCache, get_default_format_cache_directory
+
+
+def test_xilinx_format_cache(tmpdir):
+    format_cache = XilinxFormatCache(str(tmpdir))
+    xilinx_format = default_xilinx_format(format_cache)
+    assert len(os.listdir(str(tmpdir))) == 1
+
+    cached_format = default_xilinx_format(format_cache)
+    assert cached_format is not xilinx_format
+    assert cached_format.sync_word == xilinx_format.sync_word
+    lx9_format = cached_format.get_fdri_format("LX9")
+    assert lx9_format.get_io_pin_by_name("P70").on_value == \
+        xilinx_format.get_fdri_format("LX9").get_io_pin_by_name("P70").on_value
+    assert list(lx9_format.frame_table.offsets) == \
+        list(xilinx_format.get_fdri_format("LX9").frame_table.offsets)
+    # The model classes are created again
+    idcode_format = cached_format.get_register_format_by_name("Idcode")
+    assert idcode_format.payload_model.__name__ == "XilinxIdcodePayload"
+    assert len(lx9_format.logic_block_format[0][0].frame_models) == \
+        lx9_format.logic_block_format[0][0].frame_count
+
+
+def test_xilinx_format_cache_key(tmpdir):
+    format_cache = XilinxFormatCache(str(tmpdir))
+    config_path = str(tmpdir.join("registers.json"))
+    with open(config_path, "w") as f:
+        f.write("[]")
+    key = format_cache.get_key([config_path])
+    assert format_cache.get_key([config_path]) == key
+    with open(config_path, "w") as f:
+        f.write("[ ]")
+    assert format_cache.get_key([config_path]) != key
+
+    default_config_paths = [
+        get_default_xilinx_config_path(name) for name, _ in DEFAULT_XILINX_CONFIGS
+    ]
+    assert format_cache.load(format_cache.get_key(default_config_paths)) is None
+
+
+def test_xilinx_format_cache_outdated(tmpdir, monkeypatch):
+    format_cache = XilinxFormatCache(str(tmpdir))
+    default_xilinx_format(format_cache)
+    key, = [
+        file_name[len("xilinx_format_"):-len(".pickle")] for file_name in os.listdir(str(tmpdir))
+    ]
+    tmpdir.join("unrelated.pickle").write("")
+
+    monkeypatch.setattr(format_cache_module, "__version__", "0.0")
+    default_xilinx_format(format_cache)
+    file_names = os.listdir(str(tmpdir))
+    assert len(file_names) == 2
+    assert "unrelated.pickle" in file_names
+    assert "xilinx_format_{}.pickle".format(key) not in file_names
+
+
+def test_xilinx_format_cache_directory(format_cache_directory):
+    assert get_default_format_cache_directory() == format_cache_directory
+
+
+def test_xilinx_format_cache_disabled():
+    format_cache = XilinxFormatCache(None)
+    assert isinstance(default_xilinx_format(format_cache), XilinxFormat)
+    assert not format_cache.store("key", None)
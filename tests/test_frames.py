@@ -0,0 +1,165 @@
+import struct
+
+import pytest
+import six
+
+from bal.data_object import DataObject
+from bal_xilinx.analyzers.frame_address_analyzer import XilinxFrameAddressAnalyzer
+from bal_xilinx.analyzers.frame_matrix_analyzer import XilinxFrameMatrixAnalyzer
+from bal_xilinx.context import XilinxContextFactory
+from bal_xilinx.data_model import XilinxFdriPayload, XilinxFdriLogicBlock, \
+    XilinxFdriRAMBlockInterface, XilinxFdriIOBlockInterface, XilinxFdriCRCInterface
+from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder, XilinxFdriFormat, XilinxFdriMajorFormat, \
+    XilinxFdriFrameTable
+from bal_xilinx.frames import BLOCK_TYPE_BRAM, BLOCK_TYPE_IO, BLOCK_TYPE_LOGIC, \
+    XilinxFdriFrameMatrix, XilinxFrameAddress, XilinxFrameAddressIndex
+from bal_xilinx.generator import XilinxBitstreamGenerator
+
+LOGIC_BLOCK_FORMAT = [
+    [
+        XilinxFdriMajorFormat("CLB", 4, 2, []),
+        XilinxFdriMajorFormat("SPL_BLK_PAD", 1, 1, []),
+        XilinxFdriMajorFormat("RIGHT_PADDING", 3, 1, []),
+    ],
+    [
+        XilinxFdriMajorFormat("CLB", 4, 2, []),
+    ],
+]
+LOGIC_BLOCK_DATA = six.b("".join([chr(i) for i in range(20)]))
+
+
+def test_xilinx_fdri_frame_table():
+    frame_table = XilinxFdriFrameTable(LOGIC_BLOCK_FORMAT)
+    assert len(frame_table) == 6
+    assert frame_table.frame_size == 4
+    assert frame_table.size == 20
+    assert list(frame_table.offsets) == [0, 4, 8, 9, 12, 16]
+    assert frame_table.get_frame_coordinates(3) == (0, 2, 0)
+    assert frame_table.get_frame_index(1, 0, 1) == 5
+    assert frame_table.get_frame_index_by_offset(10) == 3
+
+
+def test_xilinx_fdri_frame_matrix():
+    context = default_xilinx_context(XilinxContextFactory(
+        default_xilinx_formats(XilinxFormatBuilder()).build()
+    )).create(six.b("\x00"))
+    logic_block_object = DataObject.create_packed(context, LOGIC_BLOCK_DATA, XilinxFdriLogicBlock)
+    fdri_payload_object = DataObject.create_unpacked(context, XilinxFdriPayload(
+        logic_block_object,
+        DataObject.create_packed(context, six.b("\x01"), XilinxFdriRAMBlockInterface),
+        DataObject.create_packed(context, six.b("\x02"), XilinxFdriIOBlockInterface),
+        DataObject.create_packed(context, six.b("\x03"), XilinxFdriCRCInterface),
+    ))
+    fdri_payload_object.pack()
+
+    frame_matrix = XilinxFdriFrameMatrix(
+        context,
+        fdri_payload_object.get_model(),
+        XilinxFdriFrameTable(LOGIC_BLOCK_FORMAT)
+    )
+    assert len(frame_matrix) == 6
+    assert frame_matrix.get_row(1) == six.b("\x04\x05\x06\x07")
+    assert frame_matrix.get_row(2) == six.b("\x08\x00\x00\x00")
+    assert frame_matrix.get_column(0) == six.b("\x00\x04\x08\x09\x0c\x10")
+    assert frame_matrix.get_column(3) == six.b("\x03\x07\x00\x00\x0f\x13")
+    assert frame_matrix.get_frame(3) == six.b("\x09\x0a\x0b")
+    with pytest.raises(ValueError):
+        frame_matrix.set_row(2, six.b("\x08\x00\x00\x01"))
+
+    frame_matrix.set_column(0, six.b("\xff" * 6))
+    frame_matrix.set_frame(3, six.b("\xee" * 3))
+    assert fdri_payload_object.synchronize() is False
+    assert fdri_payload_object.pack() == six.b(
+        "\xff\x01\x02\x03\xff\x05\x06\x07\xff\xee\xee\xee\xff\x0d\x0e\x0f\xff\x11\x12\x13"
+        "\x01\x02\x03"
+    )
+
+
+def test_xilinx_fdri_frame_matrix_rows():
+    xilinx_format = default_xilinx_formats(XilinxFormatBuilder()).build()
+    # The LX45T bitstreams have a second, small FDRI packet
+    data = XilinxBitstreamGenerator(xilinx_format, seed=1).generate("LX45T")
+    bitstream_context = default_xilinx_context(XilinxContextFactory(xilinx_format)).create(data)
+    frame_matrix = bitstream_context.create_analyzer(XilinxFrameMatrixAnalyzer).analyze()
+    frame_table = frame_matrix.frame_table
+    assert len(frame_matrix) == len(frame_table)
+    assert len(set(frame_table.sizes)) > 1
+    for index in range(len(frame_matrix)):
+        frame = frame_matrix.get_frame(index)
+        assert frame_matrix.get_row(index) == \
+            frame + six.b("\x00") * (frame_matrix.frame_size - len(frame))
+    column = frame_matrix.get_column(20)
+    for index in range(len(frame_matrix)):
+        assert six.indexbytes(column, index) == \
+            six.indexbytes(frame_matrix.get_row(index), 20)
+
+
+def test_xilinx_frame_address_index():
+    fdri_format = XilinxFdriFormat("TEST", 20, 8, 2, 4, LOGIC_BLOCK_FORMAT, None)
+    address_index = XilinxFrameAddressIndex(fdri_format)
+    assert len(address_index) == 8
+    assert address_index.size == 30
+    assert address_index.get_frame_span(XilinxFrameAddress(BLOCK_TYPE_LOGIC, 0, 2, 0)) == (9, 3)
+    assert address_index.get_address_by_offset(8) == XilinxFrameAddress(BLOCK_TYPE_LOGIC, 0, 1, 0)
+    assert address_index.get_address_by_offset(11) == \
+        XilinxFrameAddress(BLOCK_TYPE_LOGIC, 0, 2, 0)
+    # The bram and io blocks are indexed as spans without a frame address
+    assert address_index.get_index_by_offset(27) == 6
+    assert address_index.block_types[6] == BLOCK_TYPE_BRAM
+    assert (address_index.offsets[7], address_index.sizes[7]) == (28, 2)
+    assert address_index.block_types[7] == BLOCK_TYPE_IO
+    with pytest.raises(ValueError):
+        address_index.get_address(6)
+    with pytest.raises(ValueError):
+        address_index.get_frame_span(XilinxFrameAddress(BLOCK_TYPE_BRAM, 0, 0, 0))
+    with pytest.raises(ValueError):
+        XilinxFrameAddressIndex(fdri_format, XilinxFrameAddress(BLOCK_TYPE_IO, 0, 0, 0))
+    for offset in range(address_index.size):
+        index = address_index.get_index_by_offset(offset)
+        assert address_index.offsets[index] <= offset < \
+            address_index.offsets[index] + address_index.sizes[index]
+
+    # A payload written from the second row
+    address_index = XilinxFrameAddressIndex(
+        fdri_format,
+        XilinxFrameAddress(BLOCK_TYPE_LOGIC, 1, 0, 0),
+        payload_size=17
+    )
+    assert len(address_index) == 3
+    assert XilinxFrameAddress(BLOCK_TYPE_LOGIC, 0, 0, 0) not in address_index
+    assert address_index.get_frame_span(XilinxFrameAddress(BLOCK_TYPE_LOGIC, 1, 0, 1)) == (4, 4)
+    assert address_index.block_types[2] == BLOCK_TYPE_BRAM
+    assert address_index.size == 16
+
+
+def test_xilinx_frame_address_analyzer():
+    xilinx_format = default_xilinx_formats(XilinxFormatBuilder()).build()
+    data = XilinxBitstreamGenerator(xilinx_format, seed=1).generate("LX9")
+    bitstream_context = default_xilinx_context(XilinxContextFactory(xilinx_format)).create(data)
+    address_index = bitstream_context.create_analyzer(XilinxFrameAddressAnalyzer).analyze()
+    frame_table = xilinx_format.get_fdri_format("LX9").frame_table
+    assert list(address_index.offsets[:len(frame_table)]) == list(frame_table.offsets)
+
+    address = XilinxFrameAddress(BLOCK_TYPE_LOGIC, *frame_table.get_frame_coordinates(100))
+    offset, size = address_index.get_frame_span(address)
+    payload_offset = data.find(xilinx_format.sync_word) + len(xilinx_format.sync_word) + \
+        address_index.payload_offset
+    frame_matrix = bitstream_context.create_analyzer(XilinxFrameMatrixAnalyzer).analyze()
+    assert data[payload_offset + offset:payload_offset + offset + size] == \
+        frame_matrix.get_frame(100)
+
+
+def test_xilinx_frame_address_analyzer_small_fdri_write():
+    xilinx_format = default_xilinx_formats(XilinxFormatBuilder()).build()
+    data = XilinxBitstreamGenerator(xilinx_format, seed=1).generate("LX45T")
+    bitstream_context = default_xilinx_context(XilinxContextFactory(xilinx_format)).create(data)
+    address_index = bitstream_context.create_analyzer(XilinxFrameAddressAnalyzer).analyze()
+    fdri_format = xilinx_format.get_fdri_format("LX45T")
+    # The second, small FDRI packet is ignored
+    assert address_index.get_address(0) == XilinxFrameAddress(BLOCK_TYPE_LOGIC, 0, 0, 0)
+    assert address_index.size == fdri_format.get_payload_size() - fdri_format.crc_size
+    packets_offset = data.find(xilinx_format.sync_word) + len(xilinx_format.sync_word)
+    payload_size = fdri_format.get_payload_size()
+    assert data[packets_offset + address_index.payload_offset - 4:][:4] == \
+        struct.pack(">I", payload_size // 2 - 2)
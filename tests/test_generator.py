@@ -0,0 +1,61 @@
+import pytest
+
+from bal_xilinx.analyzers.crc_analyzer import XilinxCrcAnalyzer
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+from bal_xilinx.analyzers.encryption_analyzer import XilinxEncryptionAnalyzer
+from bal_xilinx.context import XilinxContextFactory
+from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+from bal_xilinx.generator import FILL_PATTERN, SMALL_FDRI_WRITE_DEVICE_NAMES, \
+    XilinxBitstreamGenerator
+
+XILINX_FORMAT = default_xilinx_formats(XilinxFormatBuilder()).build()
+
+
+@pytest.mark.parametrize("device_name", XILINX_FORMAT.get_device_names())
+def test_xilinx_bitstream_generator(device_name):
+    generator = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1)
+    data = generator.generate(device_name, encrypted=True)
+    assert XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate(device_name, encrypted=True) \
+        == data
+
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(XILINX_FORMAT))
+    bitstream_context = xilinx_context_factory.create(data)
+    assert bitstream_context.create_analyzer(XilinxDeviceAnalyzer).analyze() == device_name
+    assert bitstream_context.create_analyzer(XilinxEncryptionAnalyzer).analyze() is True
+    checks = bitstream_context.create_analyzer(XilinxCrcAnalyzer).analyze()
+    expected_names = ["FdriTail", "Crc"]
+    if device_name in SMALL_FDRI_WRITE_DEVICE_NAMES:
+        # The second, small FDRI packet
+        expected_names.append("FdriTail")
+    assert [check.name for check in checks] == expected_names
+    assert all(check.is_valid() for check in checks)
+
+    bitstream_object = bitstream_context.get_data()
+    bitstream_object.unpack_all()
+    bitstream_object.synchronize()
+    assert bitstream_object.pack() == data
+
+
+def test_xilinx_bitstream_generator_packet_mix():
+    generator = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1)
+    data = generator.generate("LX9", packet_mix={"NOOP": 100, "General5": 10})
+    small_data = generator.generate("LX9", packet_mix={})
+    assert len(data) - len(small_data) == 100 * 2 + 10 * 4
+
+    fdri_format = XILINX_FORMAT.get_fdri_format("LX9")
+    data = generator.generate("LX9", fill=FILL_PATTERN, pattern=b"\x12\x34")
+    assert b"\x12\x34" * (fdri_format.logic_block_size // 2) in data
+
+    with pytest.raises(ValueError):
+        generator.generate("LX9", packet_mix={"Fdri": 1})
+
+
+def test_xilinx_bitstream_generator_small_fdri_write():
+    generator = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1)
+    data = generator.generate("LX45T")
+    generator = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1)
+    single_fdri_data = generator.generate("LX45T", small_fdri_write=False)
+    frame_size = XILINX_FORMAT.get_fdri_format("LX45T").frame_table.frame_size
+    # The FarMaj and FarMin writes and the type 2 FDRI packet
+    assert len(data) - len(single_fdri_data) == 2 * 4 + 6 + frame_size + 4
@@ -0,0 +1,123 @@
+import pytest
+
+from bal_xilinx.analyzers.frame_address_analyzer import XilinxFrameAddressAnalyzer
+from bal_xilinx.analyzers.frame_matrix_analyzer import XilinxFrameMatrixAnalyzer
+from bal_xilinx.analyzers.partial_bitstream_analyzer import XilinxPartialBitstreamAnalyzer
+from bal_xilinx.context import XilinxContextFactory
+from bal_xilinx.converters.bitstream_packets_scanner import XilinxPacketScanner
+from bal_xilinx.crc import XilinxCrcCalculator
+from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+from bal_xilinx.frames import BLOCK_TYPE_LOGIC, XilinxFrameAddress
+from bal_xilinx.generator import XilinxBitstreamGenerator
+from bal_xilinx.modifiers.pin_modifier import XilinxPinModifer
+
+XILINX_FORMAT = default_xilinx_formats(XilinxFormatBuilder()).build()
+PIN_NAMES = [
+    pin_format.name for pin_format in XILINX_FORMAT.get_fdri_format("LX9").io_block_format[:3]
+]
+
+
+def apply_partial_bitstream(address_index, payload, partial_data):
+    """
+    Write the frames of a partial bitstream to a FDRI payload.
+    """
+    packets_offset = partial_data.find(XILINX_FORMAT.sync_word) + len(XILINX_FORMAT.sync_word)
+    packets_data = partial_data[packets_offset:]
+    table = XilinxPacketScanner(XILINX_FORMAT).scan(packets_data)
+    far_values = {}
+    written_frames = []
+    for index in range(len(table)):
+        register_format = table.register_formats[index]
+        payload_start, payload_end = table.get_payload_span(index)
+        if register_format.name in ("FarMaj", "FarMin"):
+            values = register_format.codec.decode(packets_data[payload_start:payload_end])
+            for attribute_format, value in zip(register_format.attributes, values):
+                far_values[attribute_format.name.lower()] = value
+        elif register_format.name == "Fdri":
+            address = XilinxFrameAddress(
+                far_values["blk"],
+                far_values["row"],
+                far_values["major"],
+                far_values["minor"]
+            )
+            offset, _ = address_index.get_frame_span(address)
+            frames_data = packets_data[payload_start:payload_end - XilinxCrcCalculator.CRC_SIZE]
+            payload[offset:offset + len(frames_data)] = frames_data
+            written_frames.append((address, len(frames_data)))
+    return written_frames
+
+
+def get_fdri_payload(bitstream_context):
+    address_index = bitstream_context.create_analyzer(XilinxFrameAddressAnalyzer).analyze()
+    data = bytes(bitstream_context.get_data().pack())
+    payload_offset = data.find(XILINX_FORMAT.sync_word) + len(XILINX_FORMAT.sync_word) + \
+        address_index.payload_offset
+    return address_index, bytearray(data[payload_offset:payload_offset + address_index.size])
+
+
+def test_xilinx_partial_bitstream_analyzer():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(XILINX_FORMAT))
+    data = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate("LX9", pin_states={
+        pin_name: False for pin_name in PIN_NAMES
+    })
+    base_context = xilinx_context_factory.create(data)
+    bitstream_context = xilinx_context_factory.create(data)
+    with pytest.raises(ValueError):
+        bitstream_context.create_analyzer(XilinxPartialBitstreamAnalyzer).analyze(base_context)
+
+    frame_matrix = bitstream_context.create_analyzer(XilinxFrameMatrixAnalyzer).analyze()
+    for index in [5, 6, 7, 300]:
+        frame_matrix.set_frame(index, b"\x5a" * frame_matrix.frame_table.sizes[index])
+    bitstream_context.get_data().synchronize()
+
+    partial_data = bitstream_context.create_analyzer(XilinxPartialBitstreamAnalyzer)\
+        .analyze(base_context)
+    assert len(partial_data) < len(data) // 10
+    packets_offset = partial_data.find(XILINX_FORMAT.sync_word) + len(XILINX_FORMAT.sync_word)
+    checks = XilinxCrcCalculator(XILINX_FORMAT).get_checks(partial_data[packets_offset:])
+    assert len(checks) > 0
+    assert all(check.is_valid() for check in checks)
+
+    address_index, payload = get_fdri_payload(base_context)
+    _, expected_payload = get_fdri_payload(bitstream_context)
+    written_frames = apply_partial_bitstream(address_index, payload, partial_data)
+    assert payload == expected_payload
+    assert len(written_frames) == 2
+    assert all(address.block_type == BLOCK_TYPE_LOGIC for address, _ in written_frames)
+
+    # The frame addresses of the io block are unknown, the pins cannot be written
+    bitstream_context.create_modifier(XilinxPinModifer).modify(PIN_NAMES[0], True)
+    with pytest.raises(ValueError):
+        bitstream_context.create_analyzer(XilinxPartialBitstreamAnalyzer).analyze(base_context)
+
+
+def test_xilinx_partial_bitstream_analyzer_patch_buffer():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(XILINX_FORMAT))
+    data = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate("LX9", pin_states={
+        pin_name: False for pin_name in PIN_NAMES
+    })
+    bitstream_context = xilinx_context_factory.create(bytearray(data), zero_copy=True)
+    with pytest.raises(ValueError):
+        bitstream_context.create_analyzer(XilinxPartialBitstreamAnalyzer).analyze()
+
+    address_index, payload = get_fdri_payload(xilinx_context_factory.create(data))
+    payload_offset = data.find(XILINX_FORMAT.sync_word) + len(XILINX_FORMAT.sync_word) + \
+        address_index.payload_offset
+    for index in [10, 11]:
+        bitstream_context.patch_buffer.patch(
+            payload_offset + address_index.offsets[index] + 3,
+            b"\xa5\xa5"
+        )
+    partial_data = bitstream_context.create_analyzer(XilinxPartialBitstreamAnalyzer).analyze()
+
+    _, expected_payload = get_fdri_payload(bitstream_context)
+    written_frames = apply_partial_bitstream(address_index, payload, partial_data)
+    assert payload == expected_payload
+    assert written_frames == [(address_index.get_address(10), 2 * address_index.sizes[10])]
+
+    bitstream_context.create_modifier(XilinxPinModifer).modify_many({
+        pin_name: True for pin_name in PIN_NAMES
+    })
+    with pytest.raises(ValueError):
+        bitstream_context.create_analyzer(XilinxPartialBitstreamAnalyzer).analyze()
@@ -0,0 +1,66 @@
+import pytest
+
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+from bal_xilinx.analyzers.encryption_analyzer import XilinxEncryptionAnalyzer
+from bal_xilinx.context import XilinxContextFactory
+from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+from bal_xilinx.generator import XilinxBitstreamGenerator, XilinxPacketBuilder
+from bal_xilinx.probe import XilinxBitstreamProbe
+
+XILINX_FORMAT = default_xilinx_formats(XilinxFormatBuilder()).build()
+
+
+@pytest.mark.parametrize("device_name", ["LX9", "LX45T"])
+@pytest.mark.parametrize("encrypted", [False, True])
+def test_xilinx_bitstream_probe(device_name, encrypted):
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(XILINX_FORMAT))
+    data = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate(
+        device_name,
+        encrypted=encrypted
+    )
+    bitstream_context = xilinx_context_factory.create(data)
+    fdri_format = XILINX_FORMAT.get_fdri_format(device_name)
+
+    probe = XilinxBitstreamProbe(XILINX_FORMAT)
+    result = probe.probe_bytes(data)
+    assert result.device_name == bitstream_context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+    assert result.is_encrypted == \
+        bitstream_context.create_analyzer(XilinxEncryptionAnalyzer).analyze()
+    assert result.packets_offset == data.find(XILINX_FORMAT.sync_word) + \
+        len(XILINX_FORMAT.sync_word)
+    assert result.fdri_payload_sizes == [
+        fdri_format.logic_block_size + fdri_format.bram_block_size +
+        fdri_format.io_block_size + fdri_format.crc_size
+    ]
+    assert not result.is_complete
+    assert result.scanned_size < len(data)
+
+    complete_result = probe.probe_bytes(data, complete=True)
+    assert complete_result.is_complete
+    assert complete_result.device_name == device_name
+    assert complete_result.packet_count > result.packet_count
+    assert complete_result.scanned_size == len(data) - 8
+
+
+def test_xilinx_bitstream_probe_late_ctl_write():
+    builder = XilinxPacketBuilder(XILINX_FORMAT)
+    ctl_values = [
+        int(attribute.name == "dec")
+        for attribute in XILINX_FORMAT.get_register_format_by_name("Ctl").attributes
+    ]
+    id_code = XILINX_FORMAT.get_register_format_by_name("Idcode").attributes[0]\
+        .get_value_by_name("LX9")
+    data = builder.create_bitstream([
+        builder.create_write("Idcode", [id_code]),
+        builder.create_type2_write("Fdri", bytes(bytearray(16))),
+        builder.create_write("Ctl", ctl_values),
+        builder.create_command("DESYNC"),
+    ])
+    bitstream_context = default_xilinx_context(XilinxContextFactory(XILINX_FORMAT)).create(data)
+    assert bitstream_context.create_analyzer(XilinxEncryptionAnalyzer).analyze() is True
+
+    # The Ctl write following the FDRI packet is only read by a complete probe
+    probe = XilinxBitstreamProbe(XILINX_FORMAT)
+    assert probe.probe_bytes(data).is_encrypted is False
+    assert probe.probe_bytes(data, complete=True).is_encrypted is True
@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+from bal_xilinx.converters.bitstream_packets_scanner import XilinxPacketScanner
+from bal_xilinx.defaults import default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+from bal_xilinx.generator import XilinxBitstreamGenerator
+from bal_xilinx.stream import XilinxPacketReader, iterate_packets
+
+XILINX_FORMAT = default_xilinx_formats(XilinxFormatBuilder()).build()
+
+
+class UnseekableStream(io.RawIOBase):
+    """
+    A pipe like stream.
+    """
+    def __init__(self, data_bytes):
+        self._stream = io.BytesIO(data_bytes)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data_bytes = self._stream.read(len(buffer))
+        buffer[:len(data_bytes)] = data_bytes
+        return len(data_bytes)
+
+
+@pytest.mark.parametrize("chunk_size,is_seekable", [(3, False), (4096, True), (4096, False)])
+def test_xilinx_packet_reader(chunk_size, is_seekable):
+    data = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate("LX9")
+    packets_offset = data.find(XILINX_FORMAT.sync_word) + len(XILINX_FORMAT.sync_word)
+    table = XilinxPacketScanner(XILINX_FORMAT).scan(data[packets_offset:])
+
+    file_object = io.BytesIO(data) if is_seekable else UnseekableStream(data)
+    reader = XilinxPacketReader(XILINX_FORMAT, file_object, chunk_size)
+    packets = []
+    for packet in reader.iterate_packets():
+        if packet.register_format.name != "Fdri":
+            # The FDRI payload is skipped
+            packet.get_payload()
+        packets.append(packet)
+    assert reader.packets_offset == packets_offset
+    assert reader.tail_offset == packets_offset + table.tail_offset
+
+    assert len(packets) == len(table)
+    for index, packet in enumerate(packets):
+        assert packet.offset == packets_offset + table.offsets[index]
+        assert packet.packet_type == table.packet_types[index]
+        assert packet.register_format is table.register_formats[index]
+        assert packet.word_count == table.word_counts[index]
+        assert packet.payload_size == table.payload_sizes[index]
+        if packet.register_format.name == "Fdri":
+            with pytest.raises(ValueError):
+                packet.get_payload()
+        else:
+            payload_start, payload_end = table.get_payload_span(index)
+            payload_data = data[packets_offset + payload_start:packets_offset + payload_end]
+            assert packet.get_payload() == payload_data
+
+
+def test_xilinx_packet_reader_attributes():
+    data = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate("LX45T", encrypted=True)
+    register_writes = [
+        (packet.register_format.name, packet.decode_attributes())
+        for packet in iterate_packets(XILINX_FORMAT, io.BytesIO(data))
+        if packet.packet_type == 1 and packet.payload_size > 0 and
+        packet.register_format.name != "Fdri"
+    ]
+    id_codes = [values for name, values in register_writes if name == "Idcode"]
+    id_code_format = XILINX_FORMAT.get_register_format_by_name("Idcode").attributes[0]
+    assert len(id_codes) == 1
+    assert list(id_codes[0].values()) == [id_code_format.get_value_by_name("LX45T")]
+    ctl_values = [values for name, values in register_writes if name == "Ctl"]
+    assert ctl_values[0]["dec"] == 1
+
+
+def test_xilinx_packet_reader_no_sync_word():
+    with pytest.raises(ValueError):
+        list(iterate_packets(XILINX_FORMAT, io.BytesIO(b"\xff" * 100)))
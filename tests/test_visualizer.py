@@ -0,0 +1,68 @@
+import base64
+import io
+import json
+
+import pytest
+
+from bal.analyzers.visualizer_analyzer import VisualizerAnalyzer
+from bal_xilinx.analyzers.device_analyzer import XilinxDeviceAnalyzer
+from bal_xilinx.analyzers.visualizer_analyzer import Base64Writer
+from bal_xilinx.context import XilinxContextFactory
+from bal_xilinx.defaults import default_xilinx_context, default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+from bal_xilinx.generator import XilinxBitstreamGenerator
+
+XILINX_FORMAT = default_xilinx_formats(XilinxFormatBuilder()).build()
+
+
+def find_collapsed_node(node):
+    if node.get("collapsed"):
+        return node
+    for child in node.get("children", []):
+        collapsed_node = find_collapsed_node(child)
+        if collapsed_node is not None:
+            return collapsed_node
+    return None
+
+
+def test_base64_writer():
+    data = bytes(bytearray(range(256))) * 3
+    output = io.StringIO()
+    base64_writer = Base64Writer(output)
+    for start, end in [(0, 1), (1, 2), (2, 7), (7, 500), (500, 501), (501, len(data) - 1)]:
+        base64_writer.write(data[start:end])
+    base64_writer.close()
+    assert output.getvalue() == base64.b64encode(data[:-1]).decode('ascii')
+
+
+def test_xilinx_visualizer_analyzer_stream():
+    xilinx_context_factory = default_xilinx_context(XilinxContextFactory(XILINX_FORMAT))
+    data = XilinxBitstreamGenerator(XILINX_FORMAT, seed=1).generate("LX9")
+    bitstream_context = xilinx_context_factory.create(data)
+    bitstream_context.create_analyzer(XilinxDeviceAnalyzer).analyze()
+    visualizer_analyzer = bitstream_context.create_analyzer(VisualizerAnalyzer)
+
+    output = io.StringIO()
+    assert visualizer_analyzer.analyze(max_depth=2, writer=output) is None
+    visualizer_config = json.loads(output.getvalue())
+    assert visualizer_config == visualizer_analyzer.analyze(max_depth=2)
+    assert base64.b64decode(visualizer_config["bytes"]) == data
+
+    collapsed_node = find_collapsed_node(visualizer_config["data"])
+    assert len(collapsed_node["path"]) == 2
+    assert "children" not in collapsed_node
+    expanded_node = visualizer_analyzer.analyze(path=collapsed_node["path"], max_depth=1)
+    assert expanded_node["type"] == collapsed_node["type"]
+    assert len(expanded_node["children"]) > 0
+    assert all(
+        child["path"] == collapsed_node["path"] + [index]
+        for index, child in enumerate(expanded_node["children"])
+        if child.get("collapsed")
+    )
+    output = io.StringIO()
+    visualizer_analyzer.analyze(path=collapsed_node["path"], max_depth=1, writer=output)
+    assert json.loads(output.getvalue()) == \
+        visualizer_analyzer.analyze(path=collapsed_node["path"], max_depth=1)
+
+    with pytest.raises(ValueError):
+        visualizer_analyzer.analyze(path=[len(visualizer_config["data"]["children"])])
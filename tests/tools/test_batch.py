@@ -0,0 +1,74 @@
+import json
+import os
+
+import six
+
+from bal_xilinx.defaults import default_xilinx_formats
+from bal_xilinx.format import XilinxFormatBuilder
+from bal_xilinx.generator import XilinxPacketBuilder
+from bal_xilinx.tools.batch import XilinxBatchJob, iterate_manifest_jobs, run_jobs
+
+
+def test_xilinx_batch_run_jobs(tmpdir, lx9_bitstream_path, lx9_bitstream_data,
+                               lx9_io_block_offset):
+    manifest_path = str(tmpdir.join("manifest.jsonl"))
+    with open(manifest_path, "w") as f:
+        f.write(json.dumps({"path": "lx9.bin", "output": "out.bin", "pins": {"P70": "on"}}) + "\n")
+        f.write(json.dumps({"path": "missing.bin"}) + "\n")
+
+    results_file = six.StringIO()
+    jobs = iterate_manifest_jobs(manifest_path, XilinxBatchJob(None, detect_encryption=True))
+    assert run_jobs(jobs, results_file, worker_count=1) == 1
+
+    results = [json.loads(line) for line in results_file.getvalue().splitlines()]
+    assert results[0]["device"] == "LX9"
+    assert results[0]["encrypted"] is False
+    assert results[0]["pins"] == {"P70": "on"}
+    assert "error" in results[1]
+
+    with open(os.path.join(str(tmpdir), "out.bin"), "rb") as f:
+        packed_data = f.read()
+    assert packed_data[lx9_io_block_offset:lx9_io_block_offset + 8] == \
+        b"\x80\x01\x00\x00\x00\x11\x00\x01"
+    assert packed_data[lx9_io_block_offset + 8:] == lx9_bitstream_data[lx9_io_block_offset + 8:]
+
+
+def test_xilinx_batch_output_is_input(lx9_bitstream_path, lx9_bitstream_data):
+    job = XilinxBatchJob(lx9_bitstream_path, lx9_bitstream_path, {"P70": True})
+
+    results_file = six.StringIO()
+    assert run_jobs([job], results_file, worker_count=1) == 1
+    result = json.loads(results_file.getvalue())
+    assert "cannot be overwritten" in result["error"]
+    with open(lx9_bitstream_path, "rb") as f:
+        assert f.read() == lx9_bitstream_data
+
+
+def test_xilinx_batch_probe(tmpdir):
+    xilinx_format = default_xilinx_formats(XilinxFormatBuilder()).build()
+    builder = XilinxPacketBuilder(xilinx_format)
+    ctl_values = [
+        int(attribute.name == "dec")
+        for attribute in xilinx_format.get_register_format_by_name("Ctl").attributes
+    ]
+    id_code = xilinx_format.get_register_format_by_name("Idcode").attributes[0]\
+        .get_value_by_name("LX9")
+    jobs = []
+    for name, id_code in [("late_ctl.bin", id_code), ("unknown.bin", 0x12345678)]:
+        bitstream_path = str(tmpdir.join(name))
+        with open(bitstream_path, "wb") as f:
+            f.write(builder.create_bitstream([
+                builder.create_write("Idcode", [id_code]),
+                builder.create_type2_write("Fdri", bytes(bytearray(16))),
+                builder.create_write("Ctl", ctl_values),
+                builder.create_command("DESYNC"),
+            ]))
+        jobs.append(XilinxBatchJob(bitstream_path, detect_device=True, detect_encryption=True))
+
+    results_file = six.StringIO()
+    assert run_jobs(jobs, results_file, worker_count=1) == 1
+    results = [json.loads(line) for line in results_file.getvalue().splitlines()]
+    # The Ctl write following the FDRI packet is read, as the encryption analyzer does
+    assert results[0]["device"] == "LX9"
+    assert results[0]["encrypted"] is True
+    assert "0x12345678" in results[1]["error"]